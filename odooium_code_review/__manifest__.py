@@ -37,6 +37,7 @@
         'views/pull_request_views.xml',
         'views/review_views.xml',
         'views/review_comment_views.xml',
+        'views/review_batch_views.xml',
         'data/ir_cron_data.xml',
         'data/mail_template_data.xml',
     ],
@@ -3,3 +3,4 @@
 from . import auth_controller
 from . import webhook_controller
 from . import api_controller
+from . import batch_stand_in_controller
@@ -19,6 +19,22 @@ class OdooiumAPIController(http.Controller):
             _logger.error('Error getting stats: %s', e)
             return {'success': False, 'error': str(e)}
     
+    @http.route('/odooium/api/metrics', type='json', auth='user')
+    def get_metrics(self):
+        """Get GitHub/AI client metrics of the serving worker"""
+        try:
+            github_service = request.env['odooium.github_service']
+            return {'success': True, 'data': {
+                'connections': github_service.get_connection_stats(),
+                'cache': github_service.get_cache_stats(),
+                'breakers': github_service.get_breaker_stats(),
+                'ai_clients': request.env['odooium.ai_review_service'].get_client_stats(),
+                'ai_latency': request.env['odooium.ai_review_service'].get_latency_stats(),
+            }}
+        except Exception as e:
+            _logger.error('Error getting metrics: %s', e)
+            return {'success': False, 'error': str(e)}
+    
     @http.route('/odooium/api/pull_requests', type='json', auth='user', methods=['GET'])
     def get_pull_requests(self, status=None, limit=50, **kwargs):
         """Get pull requests list"""
@@ -99,6 +115,7 @@ class OdooiumAPIController(http.Controller):
                     'rule': c.rule,
                     'rule_category': c.rule_category,
                     'is_ai': c.is_ai,
+                    'is_lint': c.is_lint,
                     'is_resolved': c.is_resolved,
                     'created_at': c.created_at,
                 } for c in pr.comment_ids[:50]]  # Limit to 50 comments
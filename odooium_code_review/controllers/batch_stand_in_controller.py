@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.http import request
+from datetime import datetime, timedelta, timezone
+import hmac
+import json
+import re
+import time
+
+STAND_IN_PREFIX = '/odooium/batch_stand_in'
+RESULTS_NAME = 'odooium-batch-stand-in.jsonl'
+RESULTS_MODEL = 'odooium.review_batch'
+TRAILING_ID_RE = re.compile(r'(\d+)$')
+
+
+class OdooiumBatchStandInController(http.Controller):
+    """Local stand-in for the OpenAI Batch and Anthropic Message Batches APIs.
+
+    Enabled by ``odooium.ai.batch.stand_in``; point ``odooium.ai.batch.base_url``
+    at ``<web.base.url>/odooium/batch_stand_in`` to run the batch pipeline
+    end to end without a provider. Like the providers, every call must
+    carry the configured API key of the provider, as a bearer token or in
+    ``x-api-key``. Every job ends at once with a clean review per request.
+    Results are kept as attachments, so any worker can serve them.
+    """
+
+    def _enabled(self):
+        enabled = request.env['ir.config_parameter'].sudo().get_param('odooium.ai.batch.stand_in', 'False')
+        return enabled not in ('False', '0', '')
+
+    def _authorized(self, provider):
+        """Check the request carries the API key configured for ``provider``"""
+        api_key = request.env['ir.config_parameter'].sudo().get_param(f'odooium.{provider}.api_key')
+        headers = request.httprequest.headers
+        sent = headers.get('x-api-key') or ''
+        authorization = headers.get('Authorization') or ''
+        if not sent and authorization.startswith('Bearer '):
+            sent = authorization[len('Bearer '):]
+        return bool(api_key) and hmac.compare_digest(sent.encode('utf-8'), api_key.encode('utf-8'))
+
+    def _reject(self, provider):
+        """Get the error response of a request the stand-in must not serve, or None"""
+        if not self._enabled():
+            return self._not_found()
+        if not self._authorized(provider):
+            return self._json({'error': {'type': 'authentication_error', 'message': 'Invalid API key'}}, status=401)
+        return None
+
+    def _json(self, data, status=200):
+        return request.make_json_response(data, status=status)
+
+    def _not_found(self):
+        return self._json({'error': {'type': 'not_found_error', 'message': 'Not found'}}, status=404)
+
+    def _review(self, custom_id):
+        return {'score': 100, 'summary': f'Stand-in review of {custom_id}', 'comments': []}
+
+    def _store_results(self, provider, entries):
+        attachment = request.env['ir.attachment'].sudo().create({
+            'name': RESULTS_NAME,
+            'res_model': RESULTS_MODEL,
+            'description': provider,
+            'raw': '\n'.join(json.dumps(entry) for entry in entries).encode('utf-8'),
+            'mimetype': 'application/jsonl',
+        })
+        return attachment.id
+
+    def _load_results(self, provider, object_id):
+        """Get the stored results behind a stand-in file or batch id of ``provider``, or None"""
+        match = TRAILING_ID_RE.search(object_id or '')
+        if not match:
+            return None
+        attachment = request.env['ir.attachment'].sudo().browse(int(match.group(1))).exists()
+        if not attachment or attachment.res_model != RESULTS_MODEL or attachment.name != RESULTS_NAME \
+                or attachment.description != provider:
+            return None
+        return attachment.raw
+
+    # OpenAI: the uploaded input file is answered right away and stands for its own output
+
+    @http.route(f'{STAND_IN_PREFIX}/v1/files', type='http', auth='public', methods=['POST'], csrf=False)
+    def openai_upload_file(self, **kwargs):
+        rejected = self._reject('openai')
+        if rejected:
+            return rejected
+        upload = request.httprequest.files.get('file')
+        if upload is None:
+            return self._not_found()
+
+        entries = []
+        for line in upload.read().decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            custom_id = entry.get('custom_id')
+            body = entry.get('body') or {}
+            text = json.dumps(self._review(custom_id))
+            prompt_tokens = sum(len(message.get('content') or '') for message in body.get('messages') or []) // 4
+            entries.append({
+                'id': f'batch_req_{custom_id}',
+                'custom_id': custom_id,
+                'response': {
+                    'status_code': 200,
+                    'request_id': f'req_{custom_id}',
+                    'body': {
+                        'id': f'chatcmpl-{custom_id}',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': body.get('model'),
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': text},
+                            'finish_reason': 'stop',
+                            'logprobs': None,
+                        }],
+                        'usage': {
+                            'prompt_tokens': prompt_tokens,
+                            'completion_tokens': len(text) // 4,
+                            'total_tokens': prompt_tokens + len(text) // 4,
+                        },
+                    },
+                },
+                'error': None,
+            })
+        attachment_id = self._store_results('openai', entries)
+        return self._json({
+            'id': f'file-standin-{attachment_id}',
+            'object': 'file',
+            'bytes': sum(len(json.dumps(entry)) for entry in entries),
+            'created_at': int(time.time()),
+            'filename': upload.filename,
+            'purpose': 'batch',
+            'status': 'processed',
+        })
+
+    def _openai_batch(self, object_id):
+        raw = self._load_results('openai', object_id)
+        if raw is None:
+            return None
+        attachment_id = TRAILING_ID_RE.search(object_id).group(1)
+        count = len(raw.splitlines())
+        now = int(time.time())
+        return {
+            'id': f'batch_standin_{attachment_id}',
+            'object': 'batch',
+            'endpoint': '/v1/chat/completions',
+            'errors': None,
+            'input_file_id': f'file-standin-{attachment_id}',
+            'completion_window': '24h',
+            'status': 'completed',
+            'output_file_id': f'file-standin-{attachment_id}',
+            'error_file_id': None,
+            'created_at': now,
+            'completed_at': now,
+            'request_counts': {'total': count, 'completed': count, 'failed': 0},
+            'metadata': None,
+        }
+
+    @http.route(f'{STAND_IN_PREFIX}/v1/batches', type='http', auth='public', methods=['POST'], csrf=False)
+    def openai_create_batch(self, **kwargs):
+        rejected = self._reject('openai')
+        if rejected:
+            return rejected
+        data = json.loads(request.httprequest.get_data() or b'{}')
+        batch = self._openai_batch(data.get('input_file_id'))
+        return self._json(batch) if batch else self._not_found()
+
+    @http.route(f'{STAND_IN_PREFIX}/v1/batches/<string:batch_id>', type='http', auth='public', methods=['GET'], csrf=False)
+    def openai_get_batch(self, batch_id, **kwargs):
+        rejected = self._reject('openai')
+        if rejected:
+            return rejected
+        batch = self._openai_batch(batch_id)
+        return self._json(batch) if batch else self._not_found()
+
+    @http.route(f'{STAND_IN_PREFIX}/v1/files/<string:file_id>/content', type='http', auth='public', methods=['GET'], csrf=False)
+    def openai_file_content(self, file_id, **kwargs):
+        rejected = self._reject('openai')
+        if rejected:
+            return rejected
+        raw = self._load_results('openai', file_id)
+        if raw is None:
+            return self._not_found()
+        return request.make_response(raw, headers=[('Content-Type', 'application/jsonl')])
+
+    # Anthropic
+
+    def _anthropic_batch(self, object_id):
+        raw = self._load_results('anthropic', object_id)
+        if raw is None:
+            return None
+        attachment_id = TRAILING_ID_RE.search(object_id).group(1)
+        count = len(raw.splitlines())
+        now = datetime.now(timezone.utc)
+        return {
+            'id': f'msgbatch_standin_{attachment_id}',
+            'type': 'message_batch',
+            'processing_status': 'ended',
+            'request_counts': {'processing': 0, 'succeeded': count, 'errored': 0, 'canceled': 0, 'expired': 0},
+            'created_at': now.isoformat(),
+            'ended_at': now.isoformat(),
+            'expires_at': (now + timedelta(days=1)).isoformat(),
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f'{request.httprequest.url_root.rstrip("/")}{STAND_IN_PREFIX}/v1/messages/batches/{attachment_id}/results',
+        }
+
+    @http.route(f'{STAND_IN_PREFIX}/v1/messages/batches', type='http', auth='public', methods=['POST'], csrf=False)
+    def anthropic_create_batch(self, **kwargs):
+        rejected = self._reject('anthropic')
+        if rejected:
+            return rejected
+
+        data = json.loads(request.httprequest.get_data() or b'{}')
+        entries = []
+        for batch_request in data.get('requests') or []:
+            custom_id = batch_request.get('custom_id')
+            params = batch_request.get('params') or {}
+            review = self._review(custom_id)
+            entries.append({
+                'custom_id': custom_id,
+                'result': {
+                    'type': 'succeeded',
+                    'message': {
+                        'id': f'msg_{custom_id}',
+                        'type': 'message',
+                        'role': 'assistant',
+                        'model': params.get('model'),
+                        'content': [{'type': 'tool_use', 'id': f'toolu_{custom_id}', 'name': 'submit_review', 'input': review}],
+                        'stop_reason': 'tool_use',
+                        'stop_sequence': None,
+                        'usage': {
+                            'input_tokens': len(json.dumps(params.get('messages') or [])) // 4,
+                            'output_tokens': len(json.dumps(review)) // 4,
+                        },
+                    },
+                },
+            })
+        return self._json(self._anthropic_batch(str(self._store_results('anthropic', entries))))
+
+    @http.route(f'{STAND_IN_PREFIX}/v1/messages/batches/<string:batch_id>', type='http', auth='public', methods=['GET'], csrf=False)
+    def anthropic_get_batch(self, batch_id, **kwargs):
+        rejected = self._reject('anthropic')
+        if rejected:
+            return rejected
+        batch = self._anthropic_batch(batch_id)
+        return self._json(batch) if batch else self._not_found()
+
+    @http.route(f'{STAND_IN_PREFIX}/v1/messages/batches/<string:batch_id>/results', type='http', auth='public', methods=['GET'], csrf=False)
+    def anthropic_batch_results(self, batch_id, **kwargs):
+        rejected = self._reject('anthropic')
+        if rejected:
+            return rejected
+        raw = self._load_results('anthropic', batch_id)
+        if raw is None:
+            return self._not_found()
+        return request.make_response(raw, headers=[('Content-Type', 'application/binary')])
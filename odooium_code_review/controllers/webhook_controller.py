@@ -106,6 +106,7 @@ class OdooiumWebhookController(http.Controller):
             'branch': pr_data.get('head', {}).get('ref'),
             'base_branch': pr_data.get('base', {}).get('ref'),
             'commit_sha': pr_data.get('head', {}).get('sha'),
+            'base_commit_sha': pr_data.get('base', {}).get('sha'),
             'repository_id': repo.id,
             'state': state,
             'created_at': pr_data.get('created_at'),
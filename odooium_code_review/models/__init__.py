@@ -4,5 +4,9 @@ from . import github_repository
 from . import github_user
 from . import pull_request
 from . import code_review
+from . import hunk_review_cache
 from . import review_comment
+from . import review_batch
+from . import review_batch_item
 from . import odooium_config
+from . import ai_usage_report
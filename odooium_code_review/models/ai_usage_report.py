@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, tools
+
+
+class AIUsageReport(models.Model):
+    _name = 'odooium.ai_usage_report'
+    _description = 'AI Usage Report'
+    _auto = False
+    _order = 'date desc'
+
+    date = fields.Date('Date', readonly=True)
+    repository_id = fields.Many2one('odooium.github_repository', string='Repository', readonly=True)
+    ai_model = fields.Char('AI Model', readonly=True)
+    review_count = fields.Integer('Reviews', readonly=True)
+    llm_calls = fields.Integer('AI Requests', readonly=True)
+    input_tokens = fields.Integer('Input Tokens', readonly=True)
+    cached_tokens = fields.Integer('Cached Input Tokens', readonly=True)
+    output_tokens = fields.Integer('Output Tokens', readonly=True)
+    cost = fields.Float('Cost (USD)', digits=(12, 4), readonly=True)
+    fetch_duration = fields.Float('GitHub Fetch Time (seconds)', readonly=True, aggregator='avg')
+    llm_duration = fields.Float('AI Time (seconds)', readonly=True, aggregator='avg')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW %s AS (
+                SELECT
+                    MIN(r.id) AS id,
+                    r.completed_at::date AS date,
+                    pr.repository_id AS repository_id,
+                    r.ai_model AS ai_model,
+                    COUNT(*) AS review_count,
+                    SUM(COALESCE(r.llm_calls, 0)) AS llm_calls,
+                    SUM(COALESCE(r.input_tokens, 0)) AS input_tokens,
+                    SUM(COALESCE(r.cached_tokens, 0)) AS cached_tokens,
+                    SUM(COALESCE(r.output_tokens, 0)) AS output_tokens,
+                    SUM(COALESCE(r.cost, 0)) AS cost,
+                    AVG(r.fetch_duration) AS fetch_duration,
+                    AVG(r.llm_duration) AS llm_duration
+                FROM odooium_code_review r
+                JOIN odooium_pull_request pr ON pr.id = r.pr_id
+                WHERE r.reviewer_type = 'ai' AND r.status = 'completed'
+                GROUP BY r.completed_at::date, pr.repository_id, r.ai_model
+            )
+        """ % self._table)
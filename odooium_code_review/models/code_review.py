@@ -35,6 +35,29 @@ class CodeReview(models.Model):
     score = fields.Integer('Score (0-100)', help='Overall quality score')
     summary = fields.Html('Summary')
     
+    # Reviewed Diff
+    commit_sha = fields.Char('Reviewed Commit', help='Head commit of the PR when it was reviewed')
+    incremental_base_sha = fields.Char('Incremental From', help='Set when only the commits after this SHA were reviewed')
+    diff_lines = fields.Integer('Diff Lines Reviewed')
+    diff_truncated = fields.Boolean('Diff Truncated', help='The diff exceeded the size ceiling and was cut before review')
+    diff_truncated_reason = fields.Char('Truncation Reason')
+    skipped_files = fields.Text('Skipped Files', help='Changed files left out of the review by the repository file filters')
+    
+    # Token Usage
+    input_tokens = fields.Integer('Input Tokens')
+    cached_tokens = fields.Integer('Cached Input Tokens', help='Input tokens served from the provider prompt cache')
+    cache_write_tokens = fields.Integer('Cache Write Tokens', help='Input tokens written to the provider prompt cache')
+    output_tokens = fields.Integer('Output Tokens')
+    cost = fields.Float('Cost (USD)', digits=(12, 4), help='Estimated from the list prices of the model')
+    answered_model = fields.Char('Answered By', help='Model version reported by the provider')
+    llm_calls = fields.Integer('AI Requests')
+    model_routing = fields.Text('Model Routing', help='Model each changed file was routed to, and why')
+    batch_id = fields.Many2one('odooium.review_batch', string='Provider Batch', ondelete='set null', readonly=True, help='Set when the review was run through a provider batch job')
+    
+    # Latency
+    fetch_duration = fields.Float('GitHub Fetch Time (seconds)', digits=(8, 2))
+    llm_duration = fields.Float('AI Time (seconds)', digits=(8, 2))
+    
     # Statistics
     critical_count = fields.Integer('Critical Issues', compute='_compute_comment_stats', store=True)
     high_count = fields.Integer('High Issues', compute='_compute_comment_stats', store=True)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+
+from ..services import diff_parser
 
 
 class GitHubRepository(models.Model):
@@ -29,6 +31,11 @@ class GitHubRepository(models.Model):
         ('claude-3.5', 'Claude 3.5'),
     ], string='AI Model', default='gpt-4', required=True)
     
+    # Review File Filters
+    review_include_globs = fields.Text('Review Only Files', help='Glob patterns, one per line; when set only matching files are reviewed')
+    review_exclude_globs = fields.Text('Skip Files', help='Glob patterns, one per line, of files never sent for review')
+    use_default_excludes = fields.Boolean('Skip Generated Files', default=True, help='Skip translations, vendored static/lib, minified assets and binaries')
+    
     # Odoo Integration
     project_id = fields.Many2one('project.project', string='Project')
     create_tasks = fields.Boolean('Create Odoo Tasks', default=True, help='Create task for each PR')
@@ -56,11 +63,22 @@ class GitHubRepository(models.Model):
             else:
                 repo.avg_score = 0
     
+    def _get_review_globs(self):
+        """Get (include, exclude) glob lists applied to changed files before review"""
+        self.ensure_one()
+        exclude = diff_parser.parse_globs(self.review_exclude_globs)
+        if self.use_default_excludes:
+            exclude = list(diff_parser.DEFAULT_EXCLUDE_GLOBS) + exclude
+        return diff_parser.parse_globs(self.review_include_globs), exclude
+    
     def action_sync_pull_requests(self):
         """Sync PRs from GitHub"""
-        self.ensure_one()
         github_service = self.env['odooium.github_service']
-        github_service.sync_repository_prs(self)
+        if len(self) > 1:
+            github_service.sync_repositories_concurrent(self)
+        else:
+            self.ensure_one()
+            github_service.sync_repository_prs(self)
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
@@ -71,6 +89,17 @@ class GitHubRepository(models.Model):
             }
         }
     
+    def _sync_pull_requests_incremental(self):
+        """Sync PRs updated since the last sync (queued job)"""
+        self.ensure_one()
+        return self.env['odooium.github_service'].sync_repository_prs(self, incremental=True)
+    
+    @api.model
+    def _cron_sync_pull_requests(self):
+        """Fan out incremental PR sync jobs for every active repository"""
+        for repo in self.search([('is_active', '=', True)]):
+            repo.with_delay(description=f'Incremental PR sync {repo.full_name}')._sync_pull_requests_incremental()
+    
     def action_test_webhook(self):
         """Test GitHub webhook"""
         self.ensure_one()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from datetime import timedelta
+import hashlib
+import json
+import logging
+
+import psycopg2
+
+from ..services import diff_parser
+
+_logger = logging.getLogger(__name__)
+
+
+class HunkReviewCache(models.Model):
+    _name = 'odooium.hunk_review_cache'
+    _description = 'Hunk Review Cache'
+    _order = 'last_used_at desc'
+
+    key = fields.Char('Key', required=True, index=True, help='Hash of the hunk content, model, prompt and rules versions')
+    file_path = fields.Char('File Path')
+    ai_model = fields.Char('AI Model')
+    score = fields.Integer('Score (0-100)')
+    findings = fields.Text('Findings', help='JSON list of findings, line numbers relative to the hunk start')
+    created_at = fields.Datetime('Created', default=fields.Datetime.now)
+    last_used_at = fields.Datetime('Last Used', default=fields.Datetime.now)
+
+    _sql_constraints = [
+        ('key_unique', 'UNIQUE(key)', 'Hunk cache key must be unique'),
+    ]
+
+    @api.model
+    def make_key(self, unit, model, prompt_version, rules_version):
+        """Build cache key of a hunk unit, or None for text without a hunk"""
+        if not unit.get('path') or not unit.get('body'):
+            return None
+        raw = '\0'.join([
+            unit['path'],
+            diff_parser.normalize_hunk(unit['body']),
+            model or '',
+            prompt_version,
+            rules_version,
+        ])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    @api.model
+    def lookup(self, keys):
+        """Get cached {key: {'score', 'findings'}} for the given keys"""
+        keys = [key for key in set(keys) if key]
+        if not keys:
+            return {}
+        entries = self.search([('key', 'in', keys)])
+        if entries:
+            entries.write({'last_used_at': fields.Datetime.now()})
+        return {
+            entry.key: {'score': entry.score, 'findings': json.loads(entry.findings or '[]')}
+            for entry in entries
+        }
+
+    @api.model
+    def store(self, entries, model):
+        """Store findings of freshly reviewed hunks.
+
+        ``entries`` is a list of (key, unit, score, findings); finding line
+        numbers are stored relative to the hunk start.
+        """
+        vals_list = []
+        seen = set(self.search([('key', 'in', [entry[0] for entry in entries])]).mapped('key'))
+        for key, unit, score, findings in entries:
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            relative = []
+            for finding in findings:
+                finding = dict(finding)
+                finding['line_offset'] = (finding.get('line_number') or unit['new_start']) - unit['new_start']
+                finding.pop('line_number', None)
+                relative.append(finding)
+            vals_list.append({
+                'key': key,
+                'file_path': unit['path'],
+                'ai_model': model,
+                'score': score,
+                'findings': json.dumps(relative),
+            })
+        for vals in vals_list:
+            # Another worker may have cached the same hunk meanwhile; keep the others
+            try:
+                with self.env.cr.savepoint():
+                    self.create(vals)
+            except psycopg2.IntegrityError as e:
+                _logger.info('Hunk review of %s already cached: %s', vals['file_path'], e)
+
+    @api.model
+    def rebase_findings(self, findings, unit):
+        """Turn cached findings back into findings of a hunk at its current position"""
+        result = []
+        for finding in findings:
+            finding = dict(finding)
+            finding['line_number'] = unit['new_start'] + (finding.pop('line_offset', 0) or 0)
+            finding['file_path'] = unit['path']
+            result.append(finding)
+        return result
+
+    @api.model
+    def _gc_stale_entries(self, days=30):
+        """Remove entries not used for a while"""
+        limit = fields.Datetime.now() - timedelta(days=days)
+        self.search([('last_used_at', '<', limit)]).unlink()
@@ -2,6 +2,8 @@
 
 from odoo import models, fields, api
 
+from ..services import ai_clients
+
 
 class OdooiumConfig(models.Model):
     _name = 'odooium.config'
@@ -14,6 +16,21 @@ class OdooiumConfig(models.Model):
     github_webhook_secret = fields.Char('GitHub Webhook Secret', config_parameter='odooium.github.webhook_secret')
     github_redirect_uri = fields.Char('GitHub OAuth Redirect URI', config_parameter='odooium.github.redirect_uri', default='http://localhost:8069/auth/github/callback')
     
+    # GitHub HTTP Settings
+    github_pool_size = fields.Integer('GitHub HTTP Pool Size', default=10, config_parameter='odooium.github.pool_size', help='Maximum number of pooled keep-alive connections per worker')
+    github_keep_alive = fields.Boolean('GitHub Keep-Alive', default=True, config_parameter='odooium.github.keep_alive', help='Reuse TCP/TLS connections to the GitHub API')
+    github_connect_timeout = fields.Float('GitHub Connect Timeout (seconds)', default=5.0, config_parameter='odooium.github.connect_timeout')
+    github_read_timeout = fields.Float('GitHub Read Timeout (seconds)', default=30.0, config_parameter='odooium.github.read_timeout')
+    github_rate_limit_reserve = fields.Integer('GitHub Rate Limit Reserve', default=100, config_parameter='odooium.github.rate_limit_reserve', help='Below this many remaining requests, calls are paced until the rate limit window resets')
+    github_max_retries = fields.Integer('GitHub Max Retries', default=3, config_parameter='odooium.github.max_retries', help='Retries for rate limited (429/403) responses')
+    github_max_rate_wait = fields.Float('GitHub Max Rate Limit Wait (seconds)', default=60.0, config_parameter='odooium.github.max_rate_wait', help='Longest a caller is throttled before the request is given up')
+    github_sync_concurrency = fields.Integer('GitHub Sync Concurrency', default=8, config_parameter='odooium.github.sync_concurrency', help='Maximum number of in-flight GitHub requests when syncing many repositories at once')
+    github_api_mode = fields.Selection([
+        ('rest', 'REST'),
+        ('graphql', 'GraphQL (bulk)'),
+    ], string='GitHub API Mode', default='rest', config_parameter='odooium.github.api_mode', help='GraphQL fetches many PRs with their files and reviews per request')
+    github_cache_max_mb = fields.Integer('GitHub Response Cache Size (MB)', default=32, config_parameter='odooium.github.cache_max_mb', help='Total size of the ETag-validated GET responses kept per worker (0 disables the cache)')
+    
     # AI Configuration
     openai_api_key = fields.Char('OpenAI API Key', config_parameter='odooium.openai.api_key')
     anthropic_api_key = fields.Char('Anthropic API Key', config_parameter='odooium.anthropic.api_key')
@@ -24,10 +41,63 @@ class OdooiumConfig(models.Model):
         ('claude-3.5', 'Claude 3.5'),
     ], string='Default AI Model', default='gpt-4', config_parameter='odooium.default_ai_model')
     
+    # AI Clients
+    ai_pool_size = fields.Integer('AI HTTP Pool Size', default=10, config_parameter='odooium.ai.pool_size', help='Keep-alive connections per AI provider and worker')
+    ai_timeout = fields.Float('AI Request Timeout (seconds)', default=120.0, config_parameter='odooium.ai.timeout')
+    
+    # Resilience Settings
+    breaker_failure_threshold = fields.Integer('Circuit Breaker Threshold', default=5, config_parameter='odooium.breaker.failure_threshold', help='Consecutive transient failures before calls to an endpoint fail fast')
+    breaker_reset_timeout = fields.Float('Circuit Breaker Reset (seconds)', default=60.0, config_parameter='odooium.breaker.reset_timeout', help='How long an open circuit rejects calls before a trial call')
+    ai_max_retries = fields.Integer('AI Max Retries', default=2, config_parameter='odooium.ai.max_retries', help='Retries for AI provider timeouts and server errors')
+    
+    # Streaming
+    ai_streaming = fields.Boolean('Stream AI Findings', default=True, config_parameter='odooium.ai.streaming', help='Store and show findings while the AI is still writing its review')
+    
+    # Model Routing
+    routing_small_model = fields.Char('Model for Trivial Changes', config_parameter='odooium.routing.small_model', help='Small, fast model for docs and tiny diffs, e.g. gpt-4o-mini; empty disables this tier')
+    routing_strong_model = fields.Char('Model for Risky Changes', config_parameter='odooium.routing.strong_model', help='Strongest model for controllers, access rights, raw SQL and large changes; empty disables this tier')
+    routing_trivial_lines = fields.Integer('Trivial Change Size (lines)', default=10, config_parameter='odooium.routing.trivial_lines')
+    routing_large_lines = fields.Integer('Large Change Size (lines)', default=400, config_parameter='odooium.routing.large_lines', help='Files with this many changed lines go to the strongest model')
+    
+    # AI Budget
+    ai_monthly_budget = fields.Float('Monthly AI Budget (USD)', default=0.0, config_parameter='odooium.ai.monthly_budget', help='Estimated AI spend per calendar month; 0 means no limit')
+    ai_budget_threshold = fields.Integer('Budget Guard Threshold (%)', default=90, config_parameter='odooium.ai.budget_threshold', help='Share of the monthly budget from which reviews are downgraded or deferred')
+    ai_budget_action = fields.Selection([
+        ('downgrade', 'Use Fallback Model'),
+        ('defer', 'Defer Reviews'),
+    ], string='Near Budget', default='downgrade', config_parameter='odooium.ai.budget_action')
+    ai_budget_fallback_model = fields.Char('Budget Fallback Model', config_parameter='odooium.ai.budget_fallback_model', help='Cheaper model used near the budget, e.g. gpt-4o-mini')
+    
+    # Batch Reviews
+    ai_batch_enabled = fields.Boolean('Batch Backfill Reviews', default=False, config_parameter='odooium.ai.batch.enabled', help='Repository backfills are reviewed through the provider batch APIs at half price; results arrive within 24 hours')
+    ai_batch_max_requests = fields.Integer('Max Requests per Batch', default=1000, config_parameter='odooium.ai.batch.max_requests')
+    ai_batch_base_url = fields.Char('Batch API Endpoint', config_parameter='odooium.ai.batch.base_url', help='Send batch jobs to another endpoint, e.g. the local stand-in at <base url>/odooium/batch_stand_in; empty uses the providers')
+    ai_batch_stand_in = fields.Boolean('Enable Batch Stand-In', default=False, config_parameter='odooium.ai.batch.stand_in', help='Serve a local stand-in of the provider batch APIs for testing; it only accepts the configured provider API keys')
+    
+    # Provider Hedging
+    ai_hedge_mode = fields.Selection([
+        ('off', 'Off'),
+        ('fallback', 'Fall Back on Errors'),
+        ('hedge', 'Fall Back and Hedge Slow Requests'),
+    ], string='Secondary Provider', default='off', config_parameter='odooium.ai.hedge.mode', help='Send a review request to the secondary model when the primary fails, or also when it is unusually slow')
+    ai_hedge_model = fields.Char('Secondary Model', config_parameter='odooium.ai.hedge.model', help='Model of the other provider, e.g. claude-sonnet-4-5 when reviewing with gpt-4o')
+    ai_hedge_percentile = fields.Integer('Hedge After Latency Percentile', default=95, config_parameter='odooium.ai.hedge.percentile', help='A request is hedged once the primary model is slower than this percentile of its recent latencies')
+    ai_hedge_delay = fields.Float('Default Hedge Delay (seconds)', default=30.0, config_parameter='odooium.ai.hedge.delay', help='Used until enough latencies of the primary model were seen')
+    
     # Review Settings
     auto_review_enabled = fields.Boolean('Auto-Start Reviews', default=True, config_parameter='odooium.auto_review.enabled', help='Automatically start AI review when PR is opened')
     review_timeout_minutes = fields.Integer('Review Timeout (minutes)', default=30, config_parameter='odooium.review_timeout')
     max_diff_lines = fields.Integer('Max Diff Lines', default=5000, config_parameter='odooium.max_diff_lines', help='Maximum number of diff lines to review')
+    chunk_max_tokens = fields.Integer('Chunk Size (tokens)', default=12000, config_parameter='odooium.chunk_max_tokens', help='Large diffs are split along file and hunk boundaries into chunks of this size')
+    chunk_concurrency = fields.Integer('Parallel Chunk Reviews', default=4, config_parameter='odooium.chunk_concurrency', help='Number of diff chunks reviewed at the same time')
+    incremental_review_enabled = fields.Boolean('Incremental Re-Reviews', default=True, config_parameter='odooium.incremental_review.enabled', help='Re-reviews only look at the commits pushed since the last review')
+    hunk_cache_enabled = fields.Boolean('Reuse Hunk Reviews', default=True, config_parameter='odooium.hunk_cache.enabled', help='Findings of unchanged hunks are taken from earlier reviews instead of being sent to the AI again')
+    diff_cache_max_mb = fields.Integer('Diff Cache Size (MB)', default=512, config_parameter='odooium.diff_cache.max_mb', help='On-disk cache of fetched diffs keyed by commit SHA (0 disables it)')
+    max_diff_bytes = fields.Integer('Max Diff Size (bytes)', default=10485760, config_parameter='odooium.max_diff_bytes', help='Diff downloads are aborted beyond this size')
+    
+    # Static Lint
+    lint_enabled = fields.Boolean('Static Pre-Review Lint', default=True, config_parameter='odooium.lint.enabled', help='Mechanically checkable Odoo rules are reported by a local linter before the AI review')
+    lint_max_files = fields.Integer('Max Linted Files', default=50, config_parameter='odooium.lint.max_files', help='Changed Python and XML files linted per review')
     
     # Notification Settings
     enable_notifications = fields.Boolean('Enable Notifications', default=True, config_parameter='odooium.notifications.enabled')
@@ -48,6 +118,15 @@ class OdooiumConfig(models.Model):
     # Status
     is_configured = fields.Boolean('Is Configured', compute='_compute_is_configured', store=False)
     
+    def write(self, vals):
+        result = super().write(vals)
+        # Drop pooled clients still authenticated with the old key
+        if 'openai_api_key' in vals:
+            ai_clients.invalidate('openai')
+        if 'anthropic_api_key' in vals:
+            ai_clients.invalidate('anthropic')
+        return result
+    
     @api.depends('github_oauth_client_id', 'openai_api_key')
     def _compute_is_configured(self):
         for config in self:
@@ -2,6 +2,19 @@
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+import json
+import logging
+import time
+
+from ..services import ai_usage
+from ..services import diff_parser
+from ..services import odoo_linter
+from ..services.resilience import CircuitOpenError
+
+_logger = logging.getLogger(__name__)
+
+# Bus channel the dashboard listens on
+DASHBOARD_CHANNEL = 'odooium_dashboard'
 
 
 class PullRequest(models.Model):
@@ -21,6 +34,9 @@ class PullRequest(models.Model):
     branch = fields.Char('Branch')
     base_branch = fields.Char('Base Branch')
     commit_sha = fields.Char('Commit SHA')
+    base_commit_sha = fields.Char('Base Commit SHA')
+    last_reviewed_sha = fields.Char('Last Reviewed SHA', copy=False, help='Head commit covered by the last completed review; later reviews only look at newer commits')
+    github_summary_comment_id = fields.Char('GitHub Summary Comment ID', copy=False, help='Odooium summary comment, edited in place on re-review')
     
     # Repository
     repository_id = fields.Many2one('odooium.github_repository', string='Repository', required=True, ondelete='cascade')
@@ -75,6 +91,8 @@ class PullRequest(models.Model):
     last_review_id = fields.Many2one('odooium.code_review', compute='_compute_last_review', store=True)
     last_review_summary = fields.Text('Last Review Summary', related='last_review_id.summary', store=False)
     review_count = fields.Integer('Review Count', compute='_compute_review_stats', store=True)
+    ai_cost = fields.Float('AI Cost (USD)', compute='_compute_ai_usage', store=True, digits=(12, 4))
+    ai_tokens = fields.Integer('AI Tokens', compute='_compute_ai_usage', store=True)
     
     @api.depends('repository_id.full_name', 'number')
     def _compute_url(self):
@@ -96,6 +114,12 @@ class PullRequest(models.Model):
             pr.info_count = len(all_comments.filtered(lambda c: c.severity == 'info'))
             pr.review_count = len(pr.review_ids)
     
+    @api.depends('review_ids.cost', 'review_ids.input_tokens', 'review_ids.output_tokens')
+    def _compute_ai_usage(self):
+        for pr in self:
+            pr.ai_cost = sum(pr.review_ids.mapped('cost'))
+            pr.ai_tokens = sum(pr.review_ids.mapped('input_tokens')) + sum(pr.review_ids.mapped('output_tokens'))
+    
     @api.depends('review_ids')
     def _compute_last_review(self):
         for pr in self:
@@ -146,14 +170,85 @@ class PullRequest(models.Model):
             }
         }
     
+    def _start_ai_review_batch(self):
+        """Start AI review for many PRs at once (queued job)"""
+        prs = self.filtered(lambda pr: pr.review_status == 'pending')
+        if not prs:
+            return
+        
+        prs.write({
+            'review_status': 'reviewing',
+            'ai_review_started_at': fields.Datetime.now()
+        })
+        
+        # Backfills do not need interactive latency: batch jobs cost half
+        if self._is_batch_enabled():
+            self.env['odooium.review_batch']._submit_reviews(prs)
+            return
+        
+        for pr in prs:
+            pr.with_delay(priority=5, description=f'AI Review PR #{pr.number}')._run_ai_review()
+    
+    def action_batch_review(self):
+        """Review (or re-review) the selected PRs through a provider batch job"""
+        prs = self.filtered(lambda pr: pr.review_status in ('pending', 'completed', 'failed'))
+        if not prs:
+            raise UserError(_('None of the selected PRs can be reviewed now'))
+        
+        prs.write({
+            'review_status': 'reviewing',
+            'ai_review_started_at': fields.Datetime.now()
+        })
+        self.env['odooium.review_batch'].with_delay(
+            priority=20, description=f'Submit batch review of {len(prs)} PRs')._submit_reviews(prs)
+        
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Batch Review Queued'),
+                'message': _('%s PR(s) will be reviewed through a provider batch job, results arrive within 24 hours') % len(prs),
+                'type': 'info',
+            }
+        }
+    
+    def _is_batch_enabled(self):
+        enabled = self.env['ir.config_parameter'].sudo().get_param('odooium.ai.batch.enabled', 'False')
+        return enabled not in ('False', '0', '')
+    
     def _run_ai_review(self):
         """Run AI review (queued job)"""
         self.ensure_one()
         
+        github_service = self.env['odooium.github_service']
+        http_stats_before = github_service.get_connection_stats()
+        token = self.repository_id.access_token
+        
+        # Postpone the job instead of stalling a worker on an exhausted budget
+        budget = github_service.get_rate_limit_budget(token)
+        if budget.get('remaining') is not None and budget['remaining'] < 1 and budget.get('reset_in'):
+            _logger.info('GitHub budget exhausted, postponing review of PR #%s by %ss', self.number, budget['reset_in'])
+            self.with_delay(priority=5, eta=int(budget['reset_in']) + 1, description=f'AI Review PR #{self.number}')._run_ai_review()
+            return
+        
+        # Keep within the monthly AI budget: downgrade the model or defer
+        ai_service = self.env['odooium.ai_review_service']
+        budget = ai_service.check_budget(self.ai_model_used or self.repository_id.ai_model)
+        if budget['defer_until']:
+            _logger.info('AI budget reached, deferring review of PR #%s to %s', self.number, budget['defer_until'])
+            self.with_delay(priority=5, eta=budget['defer_until'], description=f'AI Review PR #{self.number}')._run_ai_review()
+            return
+        ai_model = budget['model']
+        
+        head_sha = self.commit_sha
+        review = None
+        streamed = {}
         try:
-            # Fetch PR code diff from GitHub
-            github_service = self.env['odooium.github_service']
-            code_diff = github_service.get_pr_diff(self.repository_id, self.number)
+            # Fetch PR code diff from GitHub, only the new commits when possible
+            fetch_started = time.monotonic()
+            diff_result, since_sha = self._fetch_review_diff(github_service, token, head_sha)
+            fetch_duration = time.monotonic() - fetch_started
+            code_diff = diff_result and diff_result['diff']
             
             if not code_diff:
                 self.write({
@@ -162,62 +257,65 @@ class PullRequest(models.Model):
                 })
                 return
             
-            # Run AI review
-            ai_service = self.env['odooium.ai_review_service']
-            review_result = ai_service.review_code(
-                code_diff,
-                self.repository_id,
-                self.ai_model_used or self.repository_id.ai_model
-            )
-            
-            # Create review record
+            # Reviewed diff, known before the AI call
             review_vals = {
                 'pr_id': self.id,
                 'reviewer': 'AI',
                 'reviewer_type': 'ai',
-                'status': 'completed',
                 'started_at': self.ai_review_started_at,
-                'completed_at': fields.Datetime.now(),
-                'score': review_result.get('score', 0),
-                'summary': review_result.get('summary', ''),
-                'ai_model': self.ai_model_used or self.repository_id.ai_model,
+                'ai_model': ai_model,
+                'fetch_duration': fetch_duration,
+                'commit_sha': head_sha,
+                'incremental_base_sha': since_sha,
+                'diff_lines': diff_result['lines'],
+                'diff_truncated': diff_result['truncated'],
+                'diff_truncated_reason': diff_result['truncated_reason'],
+                'skipped_files': '\n'.join(diff_result.get('skipped_files') or []),
             }
-            review = self.env['odooium.code_review'].create(review_vals)
             
-            # Create review comments
-            for comment_data in review_result.get('comments', []):
-                self.env['odooium.review_comment'].create({
-                    'review_id': review.id,
-                    'pr_id': self.id,
-                    'file_path': comment_data.get('file_path'),
-                    'line_number': comment_data.get('line_number'),
-                    'comment': comment_data.get('comment'),
-                    'severity': comment_data.get('severity', 'medium'),
-                    'rule': comment_data.get('rule', ''),
-                    'is_ai': True,
-                })
+            # Mechanical checks first; the AI is told not to repeat them
+            lint_findings = self._run_pre_lint(github_service, token, head_sha, code_diff)
+            
+            # Stream findings into an in-progress review as they arrive
+            on_finding = None
+            if self._is_streaming_enabled():
+                review = self._create_streaming_review(review_vals)
+                on_finding = lambda finding: self._persist_streamed_finding(review, finding, streamed)
+                for finding in lint_findings:
+                    on_finding(finding)
             
-            # Post review to GitHub
-            github_service.post_review_comment(
-                self.repository_id, 
-                self.number, 
-                review_result.get('summary', ''),
-                review_result.get('comments', [])
+            # Run AI review
+            review_result = ai_service.review_code(
+                code_diff,
+                self.repository_id,
+                ai_model,
+                on_finding=on_finding,
+                known_findings=lint_findings,
             )
+            if lint_findings:
+                review_result['comments'] = lint_findings + review_result.get('comments', [])
             
-            # Update PR status
-            self.write({
-                'review_status': 'completed',
-                'ai_review_completed_at': fields.Datetime.now(),
-                'ai_score': review_result.get('score', 0)
-            })
+            if since_sha:
+                self._merge_open_findings(review_result, diff_result, since_sha, exclude_review=review)
+            
+            skipped_note = self._format_skipped_files(diff_result)
+            if skipped_note:
+                review_result['summary'] = f"{review_result.get('summary', '')}\n\n{skipped_note}"
             
-            # Update Odoo task
-            self._update_task_after_review(review_result)
+            self._complete_review(review, review_vals, review_result, streamed, head_sha)
+            
+            self._log_connection_reuse(http_stats_before, github_service.get_connection_stats())
+            
+        except CircuitOpenError as e:
+            # Provider outage: fail fast and try again once the breaker may close
+            _logger.warning('Postponing review of PR #%s: %s', self.number, e)
+            self._drop_streaming_review(review)
+            self.with_delay(priority=5, eta=int(e.retry_in) + 1, description=f'AI Review PR #{self.number}')._run_ai_review()
             
         except Exception as e:
             import traceback
             traceback.print_exc()
+            self._drop_streaming_review(review)
             self.write({
                 'review_status': 'failed',
                 'ai_review_completed_at': fields.Datetime.now()
@@ -227,6 +325,406 @@ class PullRequest(models.Model):
                 message_type='comment'
             )
     
+    def _complete_review(self, review, review_vals, review_result, streamed, head_sha):
+        """Record a finished AI review, post it to GitHub and update the PR.
+
+        The last reviewed SHA only moves to ``head_sha`` when the review
+        result is marked ``complete``, so failed parts are looked at again.
+        """
+        self.ensure_one()
+        github_service = self.env['odooium.github_service']
+        
+        # Create or complete review record
+        review_vals = dict(review_vals, **(review_result.get('usage') or {}))
+        review_vals.update({
+            'status': 'completed',
+            'completed_at': fields.Datetime.now(),
+            'score': review_result.get('score', 0),
+            'summary': review_result.get('summary', ''),
+        })
+        if review:
+            review.write(review_vals)
+        else:
+            review = self.env['odooium.code_review'].create(review_vals)
+        
+        # Create review comments, reusing the streamed ones
+        comments = self._save_review_comments(review, review_result.get('comments', []), streamed)
+        
+        # Post review to GitHub as one batched inline review
+        post_result = github_service.post_review_comment(
+            self.repository_id, 
+            self.number, 
+            review_result.get('summary', ''),
+            review_result.get('comments', []),
+            token=self.repository_id.access_token,
+            commit_sha=head_sha,
+            base_sha=self.base_commit_sha,
+            summary_comment_id=self.github_summary_comment_id,
+        )
+        if post_result.get('success'):
+            self._store_github_review_ids(review, comments, post_result)
+        
+        # Update PR status; a partial review keeps the last fully reviewed head
+        pr_vals = {
+            'review_status': 'completed',
+            'ai_review_completed_at': fields.Datetime.now(),
+            'ai_score': review_result.get('score', 0),
+        }
+        if review_result.get('complete'):
+            pr_vals['last_reviewed_sha'] = head_sha
+        else:
+            _logger.info('Review of PR #%s is incomplete, keeping last reviewed SHA %s', self.number, self.last_reviewed_sha)
+        self.write(pr_vals)
+        
+        # Update Odoo task
+        self._update_task_after_review(review_result)
+        return review
+    
+    def _prepare_batch_requests(self, github_service, ai_service):
+        """Build the batch requests reviewing the full diff of this PR.
+
+        Returns (batch item values, prompt) pairs, one per diff chunk, or an
+        empty list when there is no diff. Batch reviews are never
+        incremental: they are meant for backfills and re-reviews after rule
+        changes, which look at the whole PR.
+        """
+        self.ensure_one()
+        token = self.repository_id.access_token
+        head_sha = self.commit_sha
+        include_globs, exclude_globs = self.repository_id._get_review_globs()
+        diff_result = github_service.get_pr_diff_bounded(
+            self.repository_id, self.number, token=token,
+            base_sha=self.base_commit_sha, head_sha=head_sha,
+            include_globs=include_globs, exclude_globs=exclude_globs)
+        code_diff = diff_result and diff_result['diff']
+        if not code_diff:
+            return []
+        
+        lint_findings = self._run_pre_lint(github_service, token, head_sha, code_diff)
+        chunks = diff_parser.split_chunks(code_diff, ai_service._get_chunk_max_chars())
+        requests = []
+        for index, text in enumerate(chunks):
+            paths = diff_parser.changed_files(text)
+            known = [finding for finding in lint_findings if finding['file_path'] in paths]
+            prompt = ai_service._build_review_prompt(
+                text, self.repository_id, part=index + 1, parts=len(chunks), known_findings=known)
+            requests.append(({
+                'pr_id': self.id,
+                'custom_id': f'pr-{self.id}-{(head_sha or "head")[:12]}-{index + 1}',
+                'part': index + 1,
+                'parts': len(chunks),
+                'weight': len(text),
+                'commit_sha': head_sha,
+                'diff_lines': diff_result['lines'],
+                'diff_truncated': diff_result['truncated'],
+                'diff_truncated_reason': diff_result['truncated_reason'],
+                'skipped_files': '\n'.join(diff_result.get('skipped_files') or []),
+                'known_findings': json.dumps(known),
+            }, prompt))
+        return requests
+    
+    def _complete_batch_review(self, batch, items):
+        """Record the review of this PR from the results of its batch requests.
+
+        When every request of the PR failed, it is reviewed interactively.
+        """
+        self.ensure_one()
+        ai_service = self.env['odooium.ai_review_service']
+        items = items.sorted('part')
+        parsed_results = [
+            ai_service._parse_review_result(item.result) if item.state == 'done' else None
+            for item in items
+        ]
+        if all(result is None for result in parsed_results):
+            _logger.warning('Batch review of PR #%s failed (%s), reviewing it interactively', self.number, items[:1].error)
+            self.with_delay(priority=5, description=f'AI Review PR #{self.number}')._run_ai_review()
+            return
+        
+        review_result = ai_service._merge_review_results(
+            parsed_results, items.mapped('weight'), [item.error for item in items])
+        review_result['complete'] = all(
+            result is not None and not result.get('error') and not result.get('truncated')
+            for result in parsed_results
+        )
+        
+        lint_findings = []
+        seen = set()
+        for item in items:
+            for finding in json.loads(item.known_findings or '[]'):
+                key = ai_service._comment_key(finding)
+                if key not in seen:
+                    seen.add(key)
+                    lint_findings.append(finding)
+        if lint_findings:
+            review_result['comments'] = lint_findings + ai_service._drop_known_findings(
+                review_result.get('comments', []), lint_findings)
+        
+        first = items[0]
+        skipped_note = self._format_skipped_files({'skipped_files': (first.skipped_files or '').splitlines()})
+        if skipped_note:
+            review_result['summary'] = f"{review_result.get('summary', '')}\n\n{skipped_note}"
+        
+        usage = ai_service._sum_usage([item._get_usage() for item in items])
+        usage.update({
+            'llm_calls': len(items),
+            'llm_duration': (batch.completed_at - batch.submitted_at).total_seconds(),
+            'answered_model': ', '.join(sorted(set(items.filtered('answered_model').mapped('answered_model')))),
+            'cost': ai_usage.estimate_cost(batch.ai_model, usage, batch=True),
+        })
+        review_result['usage'] = usage
+        
+        review_vals = {
+            'pr_id': self.id,
+            'reviewer': 'AI',
+            'reviewer_type': 'ai',
+            'started_at': self.ai_review_started_at,
+            'ai_model': batch.ai_model,
+            'batch_id': batch.id,
+            'commit_sha': first.commit_sha,
+            'diff_lines': first.diff_lines,
+            'diff_truncated': first.diff_truncated,
+            'diff_truncated_reason': first.diff_truncated_reason,
+            'skipped_files': first.skipped_files,
+        }
+        self._complete_review(None, review_vals, review_result, {}, first.commit_sha)
+    
+    def _fetch_review_diff(self, github_service, token, head_sha):
+        """Get the diff to review and the SHA it starts from.
+
+        When the PR was reviewed before and its head only moved forward,
+        only the commits since the last reviewed SHA are fetched through the
+        compare API. Otherwise (first review, force push, rebase) the full PR
+        diff is fetched and the returned SHA is None.
+        """
+        include_globs, exclude_globs = self.repository_id._get_review_globs()
+        since_sha = self._get_incremental_base_sha(github_service, token, head_sha)
+        if since_sha:
+            diff_result = github_service.get_compare_diff_bounded(
+                self.repository_id, since_sha, head_sha, token=token,
+                include_globs=include_globs, exclude_globs=exclude_globs)
+            if diff_result and diff_result['diff']:
+                _logger.info('Reviewing PR #%s incrementally from %s', self.number, since_sha[:7])
+                return diff_result, since_sha
+        
+        diff_result = github_service.get_pr_diff_bounded(
+            self.repository_id, self.number, token=token,
+            base_sha=self.base_commit_sha, head_sha=head_sha,
+            include_globs=include_globs, exclude_globs=exclude_globs)
+        return diff_result, None
+    
+    def _get_incremental_base_sha(self, github_service, token, head_sha):
+        """Get the last reviewed SHA if an incremental review is possible"""
+        self.ensure_one()
+        enabled = self.env['ir.config_parameter'].sudo().get_param('odooium.incremental_review.enabled', 'True')
+        if enabled in ('False', '0', ''):
+            return None
+        if not self.last_reviewed_sha or not head_sha or self.last_reviewed_sha == head_sha:
+            return None
+        # Anything but a fast-forward means earlier findings may not map onto the new head
+        status = github_service.get_compare_status(self.repository_id, self.last_reviewed_sha, head_sha, token=token)
+        if status != 'ahead':
+            return None
+        return self.last_reviewed_sha
+    
+    def _merge_open_findings(self, review_result, diff_result, since_sha, exclude_review=None):
+        """Merge the open findings of earlier reviews into an incremental review.
+
+        Open findings on lines the new commits did not touch still apply and
+        are moved to their new position; findings on changed lines or deleted
+        files are marked resolved, the new review covers that code. The score
+        is the size-weighted average of the previous and the new review.
+        """
+        self.ensure_one()
+        files = diff_parser.changed_files(diff_result['diff'])
+        by_old_path = {change['old_path']: (path, change) for path, change in files.items()}
+        domain = [
+            ('pr_id', '=', self.id),
+            '|', ('is_ai', '=', True), ('is_lint', '=', True),
+            ('is_resolved', '=', False),
+        ]
+        if exclude_review:
+            # Findings streamed into the running review are not earlier findings
+            domain.append(('review_id', '!=', exclude_review.id))
+        open_findings = self.env['odooium.review_comment'].search(domain)
+        
+        outdated = self.env['odooium.review_comment']
+        kept = 0
+        for finding in open_findings:
+            if finding.file_path not in by_old_path:
+                kept += 1
+                continue
+            path, change = by_old_path[finding.file_path]
+            line = None if change['deleted'] else diff_parser.remap_line(change['hunks'], finding.line_number or 0)
+            if line is None:
+                outdated |= finding
+                continue
+            if line != finding.line_number or path != finding.file_path:
+                finding.write({'file_path': path, 'line_number': line})
+            kept += 1
+        if outdated:
+            outdated.write({'is_resolved': True, 'resolved_at': fields.Datetime.now()})
+        
+        previous = self.review_ids.filtered(
+            lambda review: review.status == 'completed' and review != exclude_review
+        ).sorted('created_at', reverse=True)[:1]
+        if previous and previous.diff_lines:
+            new_lines = diff_result['lines'] or 1
+            review_result['score'] = int(round(
+                (previous.score * previous.diff_lines + (review_result.get('score') or 0) * new_lines)
+                / float(previous.diff_lines + new_lines)))
+        
+        note = _('Reviewed the changes since %s; %s open finding(s) from earlier reviews still apply, %s outdated.') % (
+            since_sha[:7], kept, len(outdated))
+        review_result['summary'] = f"{review_result.get('summary', '')}\n\n{note}"
+    
+    def _run_pre_lint(self, github_service, token, head_sha, code_diff):
+        """Lint the changed Python and XML files at the reviewed head.
+
+        Only findings on lines added by the diff are returned, flagged with
+        ``is_lint``. Files are fetched from GitHub (cached by SHA) and linted
+        in the job itself. Failures never block the AI review.
+        """
+        self.ensure_one()
+        params = self.env['ir.config_parameter'].sudo()
+        if params.get_param('odooium.lint.enabled', 'True') in ('False', '0', '') or not head_sha:
+            return []
+        max_files = int(params.get_param('odooium.lint.max_files', 50))
+        
+        added = diff_parser.added_lines(code_diff)
+        paths = [path for path, lines in added.items() if lines and path.endswith(('.py', '.xml'))][:max_files]
+        files = []
+        for path in paths:
+            content = github_service.get_file_content(
+                self.repository_id, path, head_sha, token=token, max_bytes=odoo_linter.MAX_FILE_BYTES)
+            if content is not None:
+                files.append((path, content))
+        if not files:
+            return []
+        
+        started = time.monotonic()
+        try:
+            findings = odoo_linter.lint_files(files)
+        except Exception as e:
+            _logger.warning('Static lint of PR #%s failed: %s', self.number, e)
+            return []
+        findings = [finding for finding in findings if finding['line_number'] in added[finding['file_path']]]
+        for finding in findings:
+            finding['is_lint'] = True
+        _logger.info('PR #%s: linted %s file(s) in %.2fs, %s finding(s)',
+                     self.number, len(files), time.monotonic() - started, len(findings))
+        return findings
+    
+    def _is_streaming_enabled(self):
+        enabled = self.env['ir.config_parameter'].sudo().get_param('odooium.ai.streaming', 'True')
+        return enabled not in ('False', '0', '')
+    
+    def _create_streaming_review(self, review_vals):
+        """Create the review findings are streamed into"""
+        review = self.env['odooium.code_review'].create(dict(review_vals, status='in_progress'))
+        # Commit so that streamed findings can be committed one by one
+        self.env.cr.commit()
+        return review
+    
+    def _prepare_comment_vals(self, review, comment_data):
+        return {
+            'review_id': review.id,
+            'pr_id': self.id,
+            'file_path': comment_data.get('file_path'),
+            'line_number': comment_data.get('line_number'),
+            'comment': comment_data.get('comment'),
+            'severity': comment_data.get('severity', 'medium'),
+            'rule': comment_data.get('rule', ''),
+            'rule_category': comment_data.get('rule_category') or 'best_practice',
+            'is_ai': not comment_data.get('is_lint'),
+            'is_lint': bool(comment_data.get('is_lint')),
+        }
+    
+    def _persist_streamed_finding(self, review, finding, streamed):
+        """Store a streamed finding and push it to the dashboard right away"""
+        key = self.env['odooium.ai_review_service']._comment_key(finding)
+        if key in streamed or not finding.get('comment'):
+            return
+        try:
+            with self.env.cr.savepoint():
+                comment = self.env['odooium.review_comment'].create(self._prepare_comment_vals(review, finding))
+        except Exception as e:
+            # Malformed finding; the final result decides whether it is kept
+            _logger.warning('Could not store streamed finding of PR #%s: %s', self.number, e)
+            return
+        streamed[key] = comment
+        self.env['bus.bus']._sendone(DASHBOARD_CHANNEL, 'odooium_pr_update', {
+            'pr_id': self.id,
+            'review_id': review.id,
+            'comment_id': comment.id,
+            'severity': comment.severity,
+            'file_path': comment.file_path,
+            'line_number': comment.line_number,
+        })
+        self.env.cr.commit()
+    
+    def _save_review_comments(self, review, comments_data, streamed):
+        """Create the comments of a finished review, in result order.
+
+        Streamed comments matching a final finding are kept; those dropped
+        by the final merge (duplicates, failed chunks) are removed.
+        """
+        ai_service = self.env['odooium.ai_review_service']
+        Comment = self.env['odooium.review_comment']
+        slots = []
+        vals_list = []
+        for comment_data in comments_data:
+            comment = streamed.pop(ai_service._comment_key(comment_data), None)
+            if comment is None:
+                vals_list.append(self._prepare_comment_vals(review, comment_data))
+            slots.append(comment)
+        
+        created = iter(Comment.create(vals_list))
+        comments = Comment.browse([(slot or next(created)).id for slot in slots])
+        
+        leftovers = Comment.browse([comment.id for comment in streamed.values()])
+        if leftovers:
+            leftovers.unlink()
+        streamed.clear()
+        return comments
+    
+    def _drop_streaming_review(self, review):
+        """Remove a review left unfinished by an error, with its streamed findings"""
+        if review and review.exists() and review.status == 'in_progress':
+            review.unlink()
+    
+    def _format_skipped_files(self, diff_result):
+        """Describe files left out of the review by the file filters"""
+        skipped = diff_result.get('skipped_files') or []
+        if not skipped:
+            return ''
+        count = diff_result.get('skipped_count') or len(skipped)
+        listed = ', '.join(f'`{path}`' for path in skipped[:10])
+        more = f' and {count - 10} more' if count > 10 else ''
+        return _('Skipped %s generated/vendored file(s): %s%s') % (count, listed, more)
+    
+    def _store_github_review_ids(self, review, comments, post_result):
+        """Store GitHub ids returned when posting a review"""
+        self.ensure_one()
+        if post_result.get('comment_id'):
+            self.github_summary_comment_id = str(post_result['comment_id'])
+        if post_result.get('review_id'):
+            review.github_review_id = post_result['review_id']
+        for comment, github_comment_id in zip(comments, post_result.get('comment_ids') or []):
+            if github_comment_id:
+                comment.github_comment_id = github_comment_id
+    
+    def _log_connection_reuse(self, stats_before, stats_after):
+        """Log GitHub connection reuse for this review"""
+        requests_made = stats_after.get('requests', 0) - stats_before.get('requests', 0)
+        connections_opened = max(stats_after.get('connections', 0) - stats_before.get('connections', 0), 0)
+        if requests_made <= 0:
+            return
+        reuse_ratio = max(requests_made - connections_opened, 0) / float(requests_made)
+        _logger.info(
+            'PR #%s review: %s GitHub requests, %s new connections (reuse ratio %.2f)',
+            self.number, requests_made, connections_opened, reuse_ratio
+        )
+    
     def _update_task_after_review(self, review_result):
         """Update Odoo task after AI review"""
         self.ensure_one()
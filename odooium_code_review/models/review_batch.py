@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Provider limit is far higher; smaller jobs finish sooner
+DEFAULT_MAX_REQUESTS = 1000
+
+
+class ReviewBatch(models.Model):
+    _name = 'odooium.review_batch'
+    _description = 'AI Review Batch'
+    _order = 'submitted_at desc'
+
+    name = fields.Char('Name', required=True)
+    provider = fields.Selection([
+        ('openai', 'OpenAI'),
+        ('anthropic', 'Anthropic'),
+    ], string='Provider', required=True)
+    ai_model = fields.Char('AI Model', required=True)
+    provider_batch_id = fields.Char('Provider Batch ID', index=True, readonly=True)
+    state = fields.Selection([
+        ('submitted', 'Submitted'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ], string='State', default='submitted', required=True)
+    error = fields.Text('Error')
+
+    # Requests and results
+    item_ids = fields.One2many('odooium.review_batch_item', 'batch_id', string='Requests')
+    review_ids = fields.One2many('odooium.code_review', 'batch_id', string='Reviews')
+    request_count = fields.Integer('Requests', compute='_compute_counts')
+    pr_count = fields.Integer('Pull Requests', compute='_compute_counts')
+    failed_count = fields.Integer('Failed Requests', compute='_compute_counts')
+    cost = fields.Float('Cost (USD)', digits=(12, 4), compute='_compute_counts')
+
+    # Timing
+    submitted_at = fields.Datetime('Submitted', default=fields.Datetime.now)
+    last_polled_at = fields.Datetime('Last Polled')
+    completed_at = fields.Datetime('Completed')
+
+    @api.depends('item_ids.state', 'review_ids.cost')
+    def _compute_counts(self):
+        for batch in self:
+            batch.request_count = len(batch.item_ids)
+            batch.pr_count = len(batch.item_ids.pr_id)
+            batch.failed_count = len(batch.item_ids.filtered(lambda item: item.state == 'failed'))
+            batch.cost = sum(batch.review_ids.mapped('cost'))
+
+    @api.model
+    def _submit_reviews(self, prs):
+        """Pack the reviews of many PRs into provider batch jobs, one per model.
+
+        All requests of a PR go into the same job. PRs whose job cannot be
+        submitted fall back to an interactive review. Returns the batches.
+        """
+        ai_service = self.env['odooium.ai_review_service']
+        github_service = self.env['odooium.github_service']
+        max_requests = int(self.env['ir.config_parameter'].sudo().get_param(
+            'odooium.ai.batch.max_requests', DEFAULT_MAX_REQUESTS))
+
+        by_model = {}
+        for pr in prs:
+            budget = ai_service.check_budget(pr.ai_model_used or pr.repository_id.ai_model)
+            if budget['defer_until']:
+                pr.with_delay(priority=5, eta=budget['defer_until'], description=f'AI Review PR #{pr.number}')._run_ai_review()
+                continue
+            requests = pr._prepare_batch_requests(github_service, ai_service)
+            if not requests:
+                pr.write({'review_status': 'failed', 'ai_review_completed_at': fields.Datetime.now()})
+                continue
+            by_model.setdefault(budget['model'], []).append((pr, requests))
+
+        batches = self.browse()
+        for model, pr_requests in by_model.items():
+            group = []
+            for pr, requests in pr_requests:
+                if group and sum(len(entry[1]) for entry in group) + len(requests) > max_requests:
+                    batches |= self._submit_group(model, group)
+                    group = []
+                group.append((pr, requests))
+            if group:
+                batches |= self._submit_group(model, group)
+        return batches
+
+    @api.model
+    def _submit_group(self, model, group):
+        """Submit the requests of some PRs as one provider batch job"""
+        ai_service = self.env['odooium.ai_review_service']
+        requests = [request for _pr, pr_requests in group for request in pr_requests]
+        try:
+            provider_batch_id = ai_service.submit_batch(
+                model, [(vals['custom_id'], prompt) for vals, prompt in requests])
+        except Exception as e:
+            _logger.error('Failed to submit review batch of %s requests for %s: %s', len(requests), model, e)
+            for pr, _requests in group:
+                pr.with_delay(priority=5, description=f'AI Review PR #{pr.number}')._run_ai_review()
+            return self.browse()
+
+        batch = self.create({
+            'name': _('%s reviews of %s PRs') % (model, len(group)),
+            'provider': ai_service.get_ai_provider(model),
+            'ai_model': model,
+            'provider_batch_id': provider_batch_id,
+            'item_ids': [(0, 0, vals) for vals, _prompt in requests],
+        })
+        _logger.info('Submitted review batch %s (%s) with %s requests', batch.id, provider_batch_id, len(requests))
+        return batch
+
+    @api.model
+    def _cron_poll_batches(self):
+        """Collect the results of submitted batch jobs"""
+        for batch in self.search([('state', '=', 'submitted')], order='submitted_at'):
+            try:
+                batch._poll()
+                self.env.cr.commit()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.warning('Polling review batch %s failed: %s', batch.id, e)
+
+    def _poll(self):
+        """Check a submitted batch job and record its reviews once it ended"""
+        self.ensure_one()
+        status = self.env['odooium.ai_review_service'].poll_batch(self.ai_model, self.provider_batch_id)
+        if status['state'] == 'running':
+            self.last_polled_at = fields.Datetime.now()
+            return
+
+        if status['state'] == 'failed':
+            _logger.warning('Review batch %s failed: %s', self.id, status['error'])
+            self.write({'state': 'failed', 'error': status['error'], 'completed_at': fields.Datetime.now()})
+            self.item_ids.write({'state': 'failed', 'error': status['error']})
+            for pr in self.item_ids.pr_id:
+                pr.with_delay(priority=5, description=f'AI Review PR #{pr.number}')._run_ai_review()
+            return
+
+        results = status['results']
+        for item in self.item_ids:
+            item._set_result(results.get(item.custom_id, 'No result returned (expired)'))
+        self.write({'state': 'completed', 'completed_at': fields.Datetime.now()})
+
+        for pr in self.item_ids.pr_id:
+            try:
+                with self.env.cr.savepoint():
+                    pr._complete_batch_review(self, self.item_ids.filtered(lambda item: item.pr_id == pr))
+            except Exception as e:
+                _logger.exception('Recording batch review of PR #%s failed', pr.number)
+                pr.write({'review_status': 'failed', 'ai_review_completed_at': fields.Datetime.now()})
+                pr.message_post(body=_('AI batch review failed: %s') % str(e), message_type='comment')
+
+    def action_poll(self):
+        for batch in self.filtered(lambda batch: batch.state == 'submitted'):
+            batch._poll()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class ReviewBatchItem(models.Model):
+    _name = 'odooium.review_batch_item'
+    _description = 'AI Review Batch Request'
+    _order = 'batch_id, pr_id, part'
+
+    batch_id = fields.Many2one('odooium.review_batch', string='Batch', required=True, ondelete='cascade', index=True)
+    pr_id = fields.Many2one('odooium.pull_request', string='Pull Request', required=True, ondelete='cascade', index=True)
+    custom_id = fields.Char('Request ID', required=True, help='Identifies the request in the provider batch job')
+    part = fields.Integer('Part', default=1)
+    parts = fields.Integer('Parts', default=1)
+    weight = fields.Integer('Diff Size (chars)', help='Weight of the part in the PR score')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='State', default='pending', required=True)
+
+    # Reviewed diff
+    commit_sha = fields.Char('Reviewed Commit')
+    diff_lines = fields.Integer('Diff Lines')
+    diff_truncated = fields.Boolean('Diff Truncated')
+    diff_truncated_reason = fields.Char('Truncation Reason')
+    skipped_files = fields.Text('Skipped Files')
+    known_findings = fields.Text('Lint Findings', help='JSON list of the static lint findings of this part')
+
+    # Result
+    result = fields.Text('Response')
+    error = fields.Char('Error')
+    answered_model = fields.Char('Answered By')
+    input_tokens = fields.Integer('Input Tokens')
+    cached_tokens = fields.Integer('Cached Input Tokens')
+    cache_write_tokens = fields.Integer('Cache Write Tokens')
+    output_tokens = fields.Integer('Output Tokens')
+
+    def _set_result(self, result):
+        """Store a completion dict, or an error message, returned for this request"""
+        self.ensure_one()
+        if not isinstance(result, dict):
+            self.write({'state': 'failed', 'error': str(result)})
+            return
+        self.write({
+            'state': 'done',
+            'result': result.get('text'),
+            'answered_model': result.get('model'),
+            'input_tokens': result.get('input_tokens') or 0,
+            'cached_tokens': result.get('cached_tokens') or 0,
+            'cache_write_tokens': result.get('cache_write_tokens') or 0,
+            'output_tokens': result.get('output_tokens') or 0,
+        })
+
+    def _get_usage(self):
+        self.ensure_one()
+        return {
+            'input_tokens': self.input_tokens,
+            'cached_tokens': self.cached_tokens,
+            'cache_write_tokens': self.cache_write_tokens,
+            'output_tokens': self.output_tokens,
+        }
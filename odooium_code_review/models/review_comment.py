@@ -41,6 +41,7 @@ class ReviewComment(models.Model):
     
     # Metadata
     is_ai = fields.Boolean('AI Generated', default=True)
+    is_lint = fields.Boolean('Static Check', default=False, help='Reported by the static linter that runs before the AI review')
     is_resolved = fields.Boolean('Resolved', default=False)
     resolved_at = fields.Datetime('Resolved At')
     resolved_by = fields.Many2one('res.users', string='Resolved By', ondelete='set null')
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 120.0
+
+
+def _key_hash(api_key):
+    return hashlib.sha256((api_key or '').encode()).hexdigest()
+
+
+def _open_connections(http_client):
+    """Count connections held by an httpx client pool (best effort)"""
+    pool = getattr(getattr(http_client, '_transport', None), '_pool', None)
+    return len(getattr(pool, 'connections', None) or [])
+
+
+class PooledClient(object):
+    """SDK client of one provider and API key, with its own keep-alive pool"""
+
+    def __init__(self, provider, api_key, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, base_url=None):
+        import httpx
+
+        self.provider = provider
+        self.key_hash = _key_hash(api_key)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.base_url = base_url
+        self.created_at = time.time()
+        self.uses = 0
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+        )
+        # Retries are handled by resilience.call_with_retry
+        if provider == 'openai':
+            import openai
+            self.client = openai.OpenAI(api_key=api_key, http_client=self._http_client, max_retries=0, base_url=base_url)
+        elif provider == 'anthropic':
+            import anthropic
+            self.client = anthropic.Anthropic(api_key=api_key, http_client=self._http_client, max_retries=0, base_url=base_url)
+        else:
+            self._http_client.close()
+            raise ValueError('Unknown AI provider: %s' % provider)
+
+    def matches(self, api_key, pool_size, timeout):
+        return self.key_hash == _key_hash(api_key) and self.pool_size == pool_size and self.timeout == timeout
+
+    def stats(self):
+        return {
+            'uses': self.uses,
+            'open_connections': _open_connections(self._http_client),
+            'pool_size': self.pool_size,
+            'age': round(time.time() - self.created_at, 1),
+        }
+
+    def close(self):
+        try:
+            self._http_client.close()
+        except Exception as e:
+            _logger.debug('Error closing %s client: %s', self.provider, e)
+
+
+class ClientRegistry(object):
+    """Per-process AI clients, one per provider and endpoint.
+
+    A client is rebuilt when the API key or pool settings of its provider
+    change, so connections opened with a revoked key are not kept around.
+    Clients of another ``base_url`` (a local stand-in) are kept apart.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._created = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider, api_key, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, base_url=None):
+        name = f'{provider}@{base_url}' if base_url else provider
+        with self._lock:
+            pooled = self._clients.get(name)
+            if pooled is None or not pooled.matches(api_key, pool_size, timeout):
+                if pooled is not None:
+                    _logger.info('%s API key or client settings changed, rebuilding client', name)
+                    pooled.close()
+                pooled = self._clients[name] = PooledClient(provider, api_key, pool_size, timeout, base_url=base_url)
+                self._created[name] = self._created.get(name, 0) + 1
+            pooled.uses += 1
+            return pooled.client
+
+    def invalidate(self, provider=None):
+        """Drop the client of a provider, or of every provider"""
+        with self._lock:
+            names = [
+                name for name in self._clients
+                if not provider or name == provider or name.startswith(provider + '@')
+            ]
+            for name in names:
+                pooled = self._clients.pop(name, None)
+                if pooled is not None:
+                    pooled.close()
+
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for provider, created in self._created.items():
+                pooled = self._clients.get(provider)
+                stats[provider] = dict(pooled.stats() if pooled else {}, clients_created=created)
+            return stats
+
+
+_registry = ClientRegistry()
+
+
+def get_client(provider, api_key, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, base_url=None):
+    """Get the process-wide SDK client of a provider and API key"""
+    return _registry.get(provider, api_key, pool_size=pool_size, timeout=timeout, base_url=base_url)
+
+
+def invalidate(provider=None):
+    _registry.invalidate(provider)
+
+
+def get_stats():
+    """Get use and connection counters of the AI clients of this process"""
+    return _registry.stats()
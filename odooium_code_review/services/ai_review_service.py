@@ -1,20 +1,77 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, api, _
+from odoo import models, fields, api, _
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
 import logging
+import time
 import json
+import queue
+
+from . import ai_clients
+from . import ai_usage
+from . import diff_parser
+from . import hedging
+from . import model_router
+from . import resilience
+from . import review_schema
+from .stream_parser import FindingStreamParser
 
 _logger = logging.getLogger(__name__)
 
+# Rough size of a token, used to turn token budgets into character budgets
+CHARS_PER_TOKEN = 4
+DEFAULT_CHUNK_MAX_TOKENS = 12000
+DEFAULT_CHUNK_CONCURRENCY = 4
+
+# Token counters returned by the completion calls
+USAGE_KEYS = ('input_tokens', 'output_tokens', 'cached_tokens', 'cache_write_tokens')
+
+# Recent reviews of a repository looked at by model routing, and the
+# average score below which its changes count as risky
+HISTORY_REVIEWS = 10
+HISTORY_MIN_SCORE = 70
+
+# Percentage of the monthly budget from which the budget guard steps in
+DEFAULT_BUDGET_THRESHOLD = 90
+
+# OpenAI models accepting a strict JSON schema response format
+STRUCTURED_OUTPUT_MODELS = ('gpt-4o', 'gpt-4.1', 'gpt-5', 'o1', 'o3', 'o4')
+
+# OpenAI reasoning models: they take max_completion_tokens, which also
+# covers their hidden reasoning tokens, and only the default temperature
+REASONING_MODELS = ('gpt-5', 'o1', 'o3', 'o4')
+REASONING_MAX_COMPLETION_TOKENS = 16000
+
+# Anthropic tool the review is returned through, enforcing the review schema
+REVIEW_TOOL = {
+    'name': 'submit_review',
+    'description': 'Submit the code review',
+    'input_schema': review_schema.REVIEW_SCHEMA,
+}
+
+# Part of the hunk review cache key; bump whenever the prompt changes
+PROMPT_VERSION = '2'
+
+# SDK exception names (OpenAI and Anthropic) worth retrying
+TRANSIENT_AI_ERRORS = (
+    'APITimeoutError',
+    'APIConnectionError',
+    'RateLimitError',
+    'InternalServerError',
+    'OverloadedError',
+)
+
 
 class AIReviewService(models.Model):
     _name = 'odooium.ai_review_service'
     _description = 'AI Code Review Service'
 
     @api.model
-    def get_ai_provider(self):
-        """Get AI provider (OpenAI or Anthropic)"""
-        default_model = self.env['ir.config_parameter'].sudo().get_param('odooium.default_ai_model', 'gpt-4')
+    def get_ai_provider(self, model=None):
+        """Get AI provider (OpenAI or Anthropic) of a model, by default of the default model"""
+        default_model = model or self.env['ir.config_parameter'].sudo().get_param('odooium.default_ai_model', 'gpt-4')
         
         if default_model.startswith('gpt'):
             return 'openai'
@@ -46,8 +103,7 @@ class AIReviewService(models.Model):
             
             # Test with simple request
             if provider == 'openai':
-                import openai
-                client = openai.OpenAI(api_key=api_key)
+                client = self._get_ai_client(provider, api_key)
                 response = client.chat.completions.create(
                     model="gpt-4",
                     messages=[{"role": "user", "content": "Hello"}],
@@ -59,8 +115,7 @@ class AIReviewService(models.Model):
                     'model': response.model
                 }
             elif provider == 'anthropic':
-                import anthropic
-                client = anthropic.Anthropic(api_key=api_key)
+                client = self._get_ai_client(provider, api_key)
                 response = client.messages.create(
                     model="claude-3",
                     max_tokens=5,
@@ -79,10 +134,27 @@ class AIReviewService(models.Model):
             }
 
     @api.model
-    def review_code(self, code_diff, repository, ai_model=None):
-        """Review code diff using AI"""
+    def review_code(self, code_diff, repository, ai_model=None, on_finding=None, known_findings=None):
+        """Review code diff using AI.
+
+        The diff is split into hunks; hunks already reviewed with the same
+        model, prompt and rules are taken from the hunk review cache. The
+        remaining hunks are packed into token-budgeted chunks, reviewed in
+        parallel (map) and merged with the reused findings (reduce).
+
+        With ``on_finding`` the responses are streamed and the callback gets
+        each finding, in the calling thread, as soon as it is complete.
+
+        ``complete`` is set on the result only when every chunk was reviewed
+        and parsed in full.
+
+        ``known_findings`` were already reported by the static linter; each
+        chunk prompt lists those of its files and findings repeating them
+        are dropped from the result.
+        """
         try:
-            provider = self.get_ai_provider()
+            model = ai_model or self.env['ir.config_parameter'].sudo().get_param('odooium.default_ai_model', 'gpt-4')
+            provider = self.get_ai_provider(model)
             api_key = self.get_api_key(provider)
             
             if not api_key:
@@ -92,33 +164,120 @@ class AIReviewService(models.Model):
                     'comments': []
                 }
             
-            model = ai_model or self.env['ir.config_parameter'].sudo().get_param('odooium.default_ai_model', 'gpt-4')
-            
-            # Build prompt
-            prompt = self._build_review_prompt(code_diff, repository)
-            
-            _logger.info('Starting AI code review with model: %s', model)
-            
-            # Call AI
-            if provider == 'openai':
-                result = self._review_with_openai(api_key, model, prompt)
-            elif provider == 'anthropic':
-                result = self._review_with_anthropic(api_key, model, prompt)
-            else:
+            if provider not in ('openai', 'anthropic'):
                 return {
                     'score': 0,
                     'summary': f'Unknown AI provider: {provider}',
                     'comments': []
                 }
             
+            # Split diff into hunks, route them to a model tier and look up the ones reviewed before
+            units = diff_parser.split_hunks(code_diff, self._get_chunk_max_chars())
+            unit_models, routing_note = self._route_units(units, model, repository)
+            keys = self._get_hunk_keys(units, unit_models)
+            cached = self.env['odooium.hunk_review_cache'].lookup(keys) if any(keys) else {}
+            fresh = [index for index, key in enumerate(keys) if key not in cached]
+            
+            if not units:
+                chunks = [(code_diff, [], model)]
+            elif not cached or any(units[index]['body'] for index in fresh):
+                # Pack hunks of each routed model separately
+                chunks = []
+                for chunk_model in sorted(set(unit_models[index] for index in fresh), key=unit_models.index):
+                    group = [index for index in fresh if unit_models[index] == chunk_model]
+                    chunks.extend(
+                        (text, [group[member] for member in members], chunk_model)
+                        for text, members in diff_parser.pack_hunks([units[index] for index in group], self._get_chunk_max_chars())
+                    )
+            else:
+                # Every hunk was reviewed before, nothing to send
+                chunks = []
+            
+            prompts = [
+                self._build_review_prompt(
+                    text, repository, part=index + 1, parts=len(chunks),
+                    known_findings=self._chunk_known_findings(known_findings, units, members))
+                for index, (text, members, _model) in enumerate(chunks)
+            ]
+            
+            _logger.info('Starting AI code review with model: %s (%s chunk(s), %s cached hunk(s))',
+                        model, len(chunks), len(cached))
+            
+            # Call AI
+            results = []
+            llm_started = time.monotonic()
+            if prompts:
+                calls = {}
+                for chunk_model in set(chunk[2] for chunk in chunks):
+                    calls[chunk_model] = self._get_review_call(chunk_model, stream=bool(on_finding))
+                
+                def emit(finding):
+                    finding = self._normalize_comment(finding)
+                    if finding and self._drop_known_findings([finding], known_findings or []):
+                        on_finding(finding)
+                
+                results = self._run_chunks(
+                    [calls[chunk[2]] for chunk in chunks], prompts, on_finding=emit if on_finding else None)
+            llm_duration = time.monotonic() - llm_started
+            
             # Parse and validate result
-            parsed_result = self._parse_review_result(result)
+            parsed_results = [
+                self._parse_review_result(result['text']) if not isinstance(result, Exception) else None
+                for result in results
+            ]
+            self._store_hunk_reviews(units, keys, chunks, parsed_results)
+            reused = [
+                (cached[keys[index]]['score'], len(units[index]['body']),
+                 self.env['odooium.hunk_review_cache'].rebase_findings(cached[keys[index]]['findings'], units[index]))
+                for index in range(len(units)) if keys[index] in cached
+            ]
+            
+            if len(parsed_results) == 1 and not reused:
+                parsed_result = parsed_results[0]
+            else:
+                parsed_result = self._merge_review_results(
+                    parsed_results, [len(chunk[0]) for chunk in chunks], results, reused=reused)
+            if known_findings:
+                parsed_result['comments'] = self._drop_known_findings(parsed_result.get('comments', []), known_findings)
+            # Only a review of every chunk covers the head commit
+            parsed_result['complete'] = all(
+                result is not None and not result.get('error') and not result.get('truncated')
+                for result in parsed_results
+            )
+
+            parsed_result['usage'] = usage = self._sum_usage(results)
+            answered = []
+            cost = 0.0
+            for chunk, result in zip(chunks, results):
+                if isinstance(result, dict):
+                    # A hedged or fallback request may have been answered by another model
+                    cost += ai_usage.estimate_cost(result.get('requested_model') or chunk[2], result)
+                    for discarded in result.get('discarded_usage') or ():
+                        cost += ai_usage.estimate_cost(discarded['model'], discarded)
+                    if result.get('model') and result['model'] not in answered:
+                        answered.append(result['model'])
+            usage.update({
+                'llm_calls': len(prompts),
+                'llm_duration': llm_duration,
+                'answered_model': ', '.join(answered) or (model if prompts else False),
+                'cost': cost,
+                'model_routing': routing_note,
+            })
+            if routing_note:
+                savings = ai_usage.estimate_cost(model, usage) - cost
+                _logger.info('Model routing: %s; estimated savings %.4f USD', routing_note, savings)
+                usage['model_routing'] = f'{routing_note}\nEstimated savings: {savings:.4f} USD'
             
-            _logger.info('AI review completed. Score: %s, Comments: %s', 
-                        parsed_result.get('score'), len(parsed_result.get('comments', [])))
+            _logger.info('AI review completed. Score: %s, Comments: %s, Tokens: %s in (%s cached), %s out', 
+                        parsed_result.get('score'), len(parsed_result.get('comments', [])),
+                        usage['input_tokens'], usage['cached_tokens'], usage['output_tokens'])
             
             return parsed_result
         
+        except resilience.CircuitOpenError:
+            # Let the queue job reschedule itself instead of recording a failed review
+            raise
+        
         except Exception as e:
             _logger.exception('Error in AI review')
             return {
@@ -128,26 +287,467 @@ class AIReviewService(models.Model):
             }
 
     @api.model
-    def _build_review_prompt(self, code_diff, repository):
-        """Build prompt for AI code review"""
+    def _get_chunk_max_chars(self):
+        """Get the per-request diff budget in characters"""
+        max_tokens = int(self.env['ir.config_parameter'].sudo().get_param(
+            'odooium.chunk_max_tokens', DEFAULT_CHUNK_MAX_TOKENS))
+        return max_tokens * CHARS_PER_TOKEN
+
+    @api.model
+    def _route_units(self, units, model, repository):
+        """Pick the model of every hunk unit by size and risk of its file.
+
+        Trivial changes go to ``odooium.routing.small_model`` and risky ones
+        to ``odooium.routing.strong_model``; everything else, and every tier
+        without a configured model or API key, uses ``model``. Returns the
+        models and a note describing the routing (empty when not routed).
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        tier_models = {
+            model_router.SMALL: params.get_param('odooium.routing.small_model'),
+            model_router.STANDARD: model,
+            model_router.STRONG: params.get_param('odooium.routing.strong_model'),
+        }
+        for tier, tier_model in list(tier_models.items()):
+            if not tier_model or not self.get_api_key(self.get_ai_provider(tier_model)):
+                tier_models[tier] = model
+        if not units or all(tier_model == model for tier_model in tier_models.values()):
+            return [model] * len(units), ''
         
-        # Get Odoo-specific rules
-        odoo_rules = self._get_odoo_rules()
+        decisions = model_router.route(
+            units,
+            trivial_lines=int(params.get_param('odooium.routing.trivial_lines', model_router.DEFAULT_TRIVIAL_LINES)),
+            large_lines=int(params.get_param('odooium.routing.large_lines', model_router.DEFAULT_LARGE_LINES)),
+            history_risky=self._is_history_risky(repository),
+        )
         
-        # Limit diff size if needed
-        max_lines = int(self.env['ir.config_parameter'].sudo().get_param('odooium.max_diff_lines', '5000'))
-        if len(code_diff.split('\n')) > max_lines:
-            code_diff = '\n'.join(code_diff.split('\n')[:max_lines])
-            code_diff += f"\n\n[NOTE: Diff truncated at {max_lines} lines for review]"
+        files = {}
+        for unit, (tier, reason) in zip(units, decisions):
+            if unit['path']:
+                files[unit['path']] = (tier_models[tier], reason)
+        note = '\n'.join(f'{path}: {tier_model} ({reason})' for path, (tier_model, reason) in sorted(files.items()))
+        return [tier_models[tier] for tier, _reason in decisions], note
+
+    @api.model
+    def _is_history_risky(self, repository):
+        """Check whether recent AI reviews of a repository found serious issues"""
+        reviews = self.env['odooium.code_review'].sudo().search([
+            ('pr_id.repository_id', '=', repository.id),
+            ('reviewer_type', '=', 'ai'),
+            ('status', '=', 'completed'),
+        ], limit=HISTORY_REVIEWS)
+        if not reviews:
+            return False
+        average = sum(reviews.mapped('score')) / float(len(reviews))
+        return average < HISTORY_MIN_SCORE or any(reviews.mapped('critical_count'))
+
+    @api.model
+    def _get_hunk_keys(self, units, models):
+        """Get the hunk review cache key of every unit (None when not cacheable)"""
+        enabled = self.env['ir.config_parameter'].sudo().get_param('odooium.hunk_cache.enabled', 'True')
+        if enabled in ('False', '0', ''):
+            return [None] * len(units)
+        cache = self.env['odooium.hunk_review_cache']
+        rules_version = hashlib.sha256(self._get_odoo_rules().encode('utf-8')).hexdigest()[:16]
+        return [cache.make_key(unit, model, PROMPT_VERSION, rules_version) for unit, model in zip(units, models)]
+
+    @api.model
+    def _store_hunk_reviews(self, units, keys, chunks, parsed_results):
+        """Cache the findings of freshly reviewed hunks.
+
+        Comments are attributed to the hunk whose new line range contains
+        them; every hunk of a chunk gets the chunk score. Failed chunks are
+        not cached.
+        """
+        entries = {}
+        for (text, members, chunk_model), result in zip(chunks, parsed_results):
+            if result is None or result.get('error') or result.get('truncated'):
+                continue
+            for index in members:
+                if not keys[index]:
+                    continue
+                unit = units[index]
+                end = unit['new_start'] + max(unit['new_count'], 1)
+                findings = [
+                    comment for comment in result.get('comments', [])
+                    if comment.get('file_path') == unit['path']
+                    and isinstance(comment.get('line_number'), int)
+                    and unit['new_start'] <= comment['line_number'] < end
+                ]
+                entries.setdefault(chunk_model, []).append((keys[index], unit, result.get('score') or 0, findings))
+        for chunk_model, model_entries in entries.items():
+            self.env['odooium.hunk_review_cache'].store(model_entries, chunk_model)
+
+    @api.model
+    def _get_completion_call(self, provider, api_key, model, stream=False):
+        """Get a thread-safe callable sending one prompt to the provider.
+
+        Everything that needs the environment is resolved here, so the
+        returned callable can run outside of the request thread. Streaming
+        calls hand every finding to ``emit`` as soon as it is parsed. Once
+        the ``cancel`` Cancellation is set the call stops at its next attempt,
+        or closes its stream right away, by raising HedgeCancelled.
+        """
+        breaker, max_retries = self._get_resilience(provider)
+        client = self._get_ai_client(provider, api_key)
+        system_prompt = self._build_system_prompt()
+        if provider == 'openai':
+            complete = self._stream_openai if stream else self._review_with_openai
+        else:
+            complete = self._stream_anthropic if stream else self._review_with_anthropic
         
-        prompt = f"""You are an expert code reviewer specializing in Odoo development. Review the following code diff and provide constructive feedback.
+        def call(prompt, emit=None, cancel=None):
+            args = (client, model, system_prompt, prompt) + ((emit, cancel) if stream else ())
+            
+            def attempt():
+                if cancel is not None and cancel.is_set():
+                    raise hedging.HedgeCancelled()
+                return complete(*args)
+            
+            started = time.monotonic()
+            result = resilience.call_with_retry(
+                attempt,
+                breaker,
+                self._is_transient_error,
+                max_retries=max_retries,
+            )
+            result['latency'] = time.monotonic() - started
+            return result
+        return call
 
-Repository: {repository.full_name}
+    @api.model
+    def _get_review_call(self, model, stream=False):
+        """Get the call reviewing one prompt with ``model``.
 
-Code Diff:
-```diff
-{code_diff}
-```
+        With ``odooium.ai.hedge.mode`` set and a secondary model on a
+        configured provider, the call falls back to the secondary model when
+        the primary fails ('fallback'), and also sends the prompt to it when
+        the primary is slower than its recent latency percentile ('hedge').
+        Hedged calls always stream, so the losing request can be cancelled.
+        """
+        provider = self.get_ai_provider(model)
+        api_key = self.get_api_key(provider)
+        
+        params = self.env['ir.config_parameter'].sudo()
+        mode = params.get_param('odooium.ai.hedge.mode', 'off')
+        secondary_model = params.get_param('odooium.ai.hedge.model')
+        secondary_provider = self.get_ai_provider(secondary_model) if secondary_model else None
+        secondary_key = secondary_provider and self.get_api_key(secondary_provider)
+        if mode not in ('fallback', 'hedge') or not secondary_key or secondary_model == model:
+            return self._get_completion_call(provider, api_key, model, stream=stream)
+        primary = self._get_completion_call(provider, api_key, model, stream=True)
+        secondary = self._get_completion_call(secondary_provider, secondary_key, secondary_model, stream=True)
+        percentile = float(params.get_param('odooium.ai.hedge.percentile', hedging.DEFAULT_PERCENTILE))
+        default_delay = float(params.get_param('odooium.ai.hedge.delay', hedging.DEFAULT_DELAY))
+        
+        def call(prompt, emit=None):
+            hedge_after = hedging.hedge_delay(model, percentile, default_delay) if mode == 'hedge' else None
+            return hedging.hedged_call(
+                primary, secondary, prompt, emit=emit, hedge_after=hedge_after,
+                is_valid=review_schema.is_complete, models=(model, secondary_model))
+        return call
+
+    @api.model
+    def get_latency_stats(self):
+        """Get recent AI latencies and hedging counters of this worker, per model"""
+        return hedging.get_tracker().stats()
+
+    @api.model
+    def _run_chunks(self, calls, prompts, on_finding=None):
+        """Send prompts with bounded concurrency, each through its own call.
+
+        Returns one raw response per prompt, or the exception it raised. An
+        open circuit is raised right away; if every chunk failed the first
+        error is raised. Streamed findings are passed to ``on_finding`` in
+        this thread while the chunks are still running.
+        """
+        if len(prompts) == 1:
+            return [calls[0](prompts[0], on_finding) if on_finding else calls[0](prompts[0])]
+        
+        findings = queue.Queue()
+        
+        def deliver():
+            while True:
+                try:
+                    finding = findings.get_nowait()
+                except queue.Empty:
+                    return
+                on_finding(finding)
+        
+        concurrency = int(self.env['ir.config_parameter'].sudo().get_param(
+            'odooium.chunk_concurrency', DEFAULT_CHUNK_CONCURRENCY))
+        with ThreadPoolExecutor(max_workers=max(min(concurrency, len(prompts)), 1)) as executor:
+            if on_finding:
+                futures = [executor.submit(call, prompt, findings.put) for call, prompt in zip(calls, prompts)]
+                pending = set(futures)
+                while pending:
+                    _done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    deliver()
+            else:
+                futures = [executor.submit(call, prompt) for call, prompt in zip(calls, prompts)]
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except resilience.CircuitOpenError:
+                    for pending_future in futures:
+                        pending_future.cancel()
+                    raise
+                except Exception as e:
+                    _logger.error('AI review of a diff chunk failed: %s', e)
+                    results.append(e)
+        
+        if all(isinstance(result, Exception) for result in results):
+            raise results[0]
+        return results
+
+    @api.model
+    def _merge_review_results(self, parsed_results, weights, raw_results=None, reused=None):
+        """Reduce chunk reviews into one review.
+
+        The score is the size-weighted average of the chunk scores, comments
+        are concatenated without duplicates and chunk summaries are listed.
+        ``reused`` holds (score, weight, comments) of hunks taken from the
+        hunk review cache.
+        """
+        total_weight = 0
+        weighted_score = 0
+        summaries = []
+        comments = []
+        seen = set()
+        parts = len(parsed_results)
+        
+        def add_comments(new_comments):
+            for comment in new_comments:
+                key = self._comment_key(comment)
+                if key in seen:
+                    continue
+                seen.add(key)
+                comments.append(comment)
+        
+        for index, result in enumerate(parsed_results):
+            if result is None:
+                error = raw_results[index] if raw_results else None
+                summaries.append(f'- Part {index + 1}/{parts}: review failed ({error})')
+                continue
+            total_weight += weights[index]
+            weighted_score += (result.get('score') or 0) * weights[index]
+            if parts == 1:
+                summaries.append(result.get('summary', ''))
+            else:
+                summaries.append(f"- Part {index + 1}/{parts}: {result.get('summary', '')}")
+            add_comments(result.get('comments', []))
+        
+        reused_findings = 0
+        for score, weight, hunk_comments in reused or []:
+            total_weight += weight
+            weighted_score += score * weight
+            reused_findings += len(hunk_comments)
+            add_comments(hunk_comments)
+        
+        summary = '\n'.join(summaries)
+        if parts > 1:
+            summary = f'Reviewed in {parts} parts:\n' + summary
+        if reused:
+            note = f'{len(reused)} unchanged hunk(s) reused from earlier reviews ({reused_findings} finding(s) carried over).'
+            summary = f'{summary}\n\n{note}' if summary else note
+        
+        return {
+            'score': int(round(weighted_score / total_weight)) if total_weight else 0,
+            'summary': summary,
+            'comments': comments,
+        }
+
+    @api.model
+    def _comment_key(self, comment):
+        """Identity of a finding, used to drop duplicates"""
+        return (comment.get('file_path'), comment.get('line_number'), comment.get('rule'), comment.get('comment'))
+
+    @api.model
+    def _get_ai_client(self, provider, api_key, base_url=None):
+        """Get the pooled SDK client of this worker for a provider and API key"""
+        params = self.env['ir.config_parameter'].sudo()
+        return ai_clients.get_client(
+            provider, api_key,
+            pool_size=int(params.get_param('odooium.ai.pool_size', ai_clients.DEFAULT_POOL_SIZE)),
+            timeout=float(params.get_param('odooium.ai.timeout', ai_clients.DEFAULT_TIMEOUT)),
+            base_url=base_url,
+        )
+
+    @api.model
+    def get_client_stats(self):
+        """Get AI client reuse and connection statistics of this worker"""
+        return ai_clients.get_stats()
+
+    @api.model
+    def check_budget(self, model):
+        """Apply the monthly AI spend ceiling to a review about to start.
+
+        Near the ceiling (``odooium.ai.budget_threshold`` percent of
+        ``odooium.ai.monthly_budget``) reviews are downgraded to the fallback
+        model, or deferred when there is none or the action is 'defer'. Past
+        the ceiling they are deferred to the next month. Returns a dict with
+        the ``model`` to use and ``defer_until`` (a datetime or None).
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        budget = float(params.get_param('odooium.ai.monthly_budget', 0) or 0)
+        result = {'model': model, 'defer_until': None, 'spent': 0.0, 'budget': budget}
+        if budget <= 0:
+            return result
+        
+        now = fields.Datetime.now()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        [(spent,)] = self.env['odooium.code_review'].sudo()._read_group(
+            [('completed_at', '>=', month_start)], aggregates=['cost:sum'])
+        result['spent'] = spent = spent or 0.0
+        
+        threshold = float(params.get_param('odooium.ai.budget_threshold', DEFAULT_BUDGET_THRESHOLD) or 0)
+        fallback_model = params.get_param('odooium.ai.budget_fallback_model')
+        action = params.get_param('odooium.ai.budget_action', 'downgrade')
+        if spent >= budget:
+            _logger.warning('Monthly AI budget spent (%.2f of %.2f USD), deferring review', spent, budget)
+            result['defer_until'] = next_month
+        elif spent >= budget * threshold / 100.0:
+            if action == 'downgrade' and fallback_model and fallback_model != model:
+                _logger.info('Monthly AI budget nearly spent (%.2f of %.2f USD), using %s', spent, budget, fallback_model)
+                result['model'] = fallback_model
+            elif action == 'defer' or not fallback_model:
+                result['defer_until'] = next_month
+        return result
+
+    @api.model
+    def _get_batch_client(self, provider):
+        """Get the SDK client batch jobs are sent through.
+
+        ``odooium.ai.batch.base_url`` points batch jobs at another endpoint,
+        such as the local stand-in, instead of the provider.
+        """
+        base_url = self.env['ir.config_parameter'].sudo().get_param('odooium.ai.batch.base_url') or None
+        if base_url and provider == 'openai':
+            base_url = base_url.rstrip('/') + '/v1'
+        api_key = self.get_api_key(provider)
+        if not api_key:
+            raise ValueError(f'No API key configured for {provider}')
+        return self._get_ai_client(provider, api_key, base_url=base_url)
+
+    @api.model
+    def submit_batch(self, model, requests):
+        """Submit review prompts as one provider batch job.
+
+        ``requests`` is a list of (custom_id, prompt). Returns the provider
+        id of the batch job.
+        """
+        provider = self.get_ai_provider(model)
+        client = self._get_batch_client(provider)
+        system_prompt = self._build_system_prompt()
+        if provider == 'anthropic':
+            batch = client.messages.batches.create(requests=[
+                {'custom_id': custom_id, 'params': self._anthropic_request_args(model, system_prompt, prompt)}
+                for custom_id, prompt in requests
+            ])
+            return batch.id
+        
+        lines = [
+            json.dumps({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': self._openai_request_args(model, system_prompt, prompt),
+            })
+            for custom_id, prompt in requests
+        ]
+        batch_file = client.files.create(
+            file=('odooium-reviews.jsonl', '\n'.join(lines).encode('utf-8')), purpose='batch')
+        batch = client.batches.create(
+            input_file_id=batch_file.id, endpoint='/v1/chat/completions', completion_window='24h')
+        return batch.id
+
+    @api.model
+    def poll_batch(self, model, batch_id):
+        """Get the state of a provider batch job and, once it ended, its results.
+
+        Returns ``{'state', 'results', 'error'}`` where state is 'running',
+        'ended' or 'failed' and results map each custom id to a completion
+        dict, as returned by the synchronous calls, or to an error message.
+        Requests missing from the results (expired) are left out.
+        """
+        provider = self.get_ai_provider(model)
+        client = self._get_batch_client(provider)
+        results = {}
+        if provider == 'anthropic':
+            batch = client.messages.batches.retrieve(batch_id)
+            if batch.processing_status != 'ended':
+                return {'state': 'running', 'results': results, 'error': None}
+            for entry in client.messages.batches.results(batch_id):
+                if entry.result.type == 'succeeded':
+                    message = entry.result.message
+                    results[entry.custom_id] = dict(
+                        self._anthropic_usage(message.usage), text=self._anthropic_text(message), model=message.model)
+                else:
+                    results[entry.custom_id] = f'Batch request {entry.result.type}'
+            return {'state': 'ended', 'results': results, 'error': None}
+        
+        from openai.types.chat import ChatCompletion
+        
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in ('validating', 'in_progress', 'finalizing', 'cancelling'):
+            return {'state': 'running', 'results': results, 'error': None}
+        if not (batch.output_file_id or batch.error_file_id):
+            errors = getattr(batch.errors, 'data', None) or []
+            error = '; '.join(error.message or error.code or '' for error in errors) or batch.status
+            return {'state': 'failed', 'results': results, 'error': error}
+        
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if response.get('status_code') == 200:
+                    completion = ChatCompletion.model_validate(response['body'])
+                    results[entry['custom_id']] = dict(
+                        self._openai_usage(completion.usage),
+                        text=completion.choices[0].message.content, model=completion.model)
+                else:
+                    error = entry.get('error') or (response.get('body') or {}).get('error') or {}
+                    results[entry['custom_id']] = error.get('message') or f"Batch request failed ({response.get('status_code')})"
+        return {'state': 'ended', 'results': results, 'error': None}
+
+    @api.model
+    def _get_resilience(self, provider):
+        """Get (circuit breaker, max retries) for an AI provider"""
+        params = self.env['ir.config_parameter'].sudo()
+        breaker = resilience.get_breaker(
+            provider,
+            failure_threshold=int(params.get_param('odooium.breaker.failure_threshold', resilience.DEFAULT_FAILURE_THRESHOLD)),
+            reset_timeout=float(params.get_param('odooium.breaker.reset_timeout', resilience.DEFAULT_RESET_TIMEOUT)),
+        )
+        max_retries = int(params.get_param('odooium.ai.max_retries', resilience.DEFAULT_MAX_RETRIES))
+        return breaker, max_retries
+
+    @api.model
+    def _is_transient_error(self, error):
+        """Check whether an AI provider error may succeed on retry"""
+        if type(error).__name__ in TRANSIENT_AI_ERRORS:
+            return True
+        status = getattr(error, 'status_code', None)
+        return status == 429 or (isinstance(status, int) and status >= 500)
+
+    @api.model
+    def _build_system_prompt(self):
+        """Build the static part of the review prompt.
+
+        It holds everything that does not depend on the PR, so that it forms
+        a stable prefix the providers can cache between requests.
+        """
+        
+        # Get Odoo-specific rules
+        odoo_rules = self._get_odoo_rules()
+        
+        return f"""You are an expert code reviewer specializing in Odoo development. Review the code diff you are given and provide constructive feedback.
 
 Odoo Best Practices & Rules:
 {odoo_rules}
@@ -191,7 +791,55 @@ Scoring Guidelines:
 
 Focus on actionable, specific feedback. Be constructive and helpful.
 """
-        return prompt
+
+    @api.model
+    def _chunk_known_findings(self, known_findings, units, members):
+        """Known findings on the files of one chunk"""
+        if not known_findings:
+            return []
+        if not members:
+            return known_findings
+        paths = set(units[index]['path'] for index in members)
+        return [finding for finding in known_findings if finding.get('file_path') in paths]
+
+    @api.model
+    def _drop_known_findings(self, comments, known_findings):
+        """Drop findings on a line the linter already flagged for the same category"""
+        known = set(
+            (finding.get('file_path'), finding.get('line_number'), finding.get('rule_category'))
+            for finding in known_findings
+        )
+        return [
+            comment for comment in comments
+            if (comment.get('file_path'), comment.get('line_number'), comment.get('rule_category')) not in known
+        ]
+
+    @api.model
+    def _build_review_prompt(self, code_diff, repository, part=1, parts=1, known_findings=None):
+        """Build the per-request part of the review prompt, diff last"""
+        part_note = ''
+        if parts > 1:
+            part_note = f"This is part {part} of {parts} of the pull request diff. Review only this part.\n"
+        
+        known_note = ''
+        if known_findings:
+            listed = '\n'.join(
+                f"- {finding['file_path']}:{finding['line_number']} [{finding['rule']}] {finding['comment']}"
+                for finding in known_findings
+            )
+            known_note = (
+                "These issues were already reported by a static checker. Do not report them again, "
+                "but take them into account in the score:\n"
+                f"{listed}\n"
+            )
+        
+        return f"""Repository: {repository.full_name}
+{part_note}{known_note}
+Code Diff:
+```diff
+{code_diff}
+```
+"""
 
     @api.model
     def _get_odoo_rules(self):
@@ -261,85 +909,214 @@ Focus on actionable, specific feedback. Be constructive and helpful.
 """
 
     @api.model
-    def _review_with_openai(self, api_key, model, prompt):
-        """Review code using OpenAI"""
+    def _review_with_openai(self, client, model, system_prompt, prompt):
+        """Review code using OpenAI.
+
+        OpenAI caches long prompt prefixes automatically; keeping the static
+        system prompt first is all it takes.
+        """
+        try:
+            response = client.chat.completions.create(**self._openai_request_args(model, system_prompt, prompt))
+            
+            return dict(self._openai_usage(response.usage), text=response.choices[0].message.content, model=response.model)
+        
+        except Exception as e:
+            _logger.error('OpenAI API error: %s', e)
+            raise
+
+    @api.model
+    def _review_with_anthropic(self, client, model, system_prompt, prompt):
+        """Review code using Anthropic Claude, marking the system prompt cacheable"""
         try:
-            import openai
-            client = openai.OpenAI(api_key=api_key)
+            response = client.messages.create(**self._anthropic_request_args(model, system_prompt, prompt))
             
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert code reviewer specializing in Odoo development. Provide constructive, actionable feedback."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=4000,
+            return dict(self._anthropic_usage(response.usage), text=self._anthropic_text(response), model=response.model)
+        
+        except Exception as e:
+            _logger.error('Anthropic API error: %s', e)
+            raise
+
+    @api.model
+    def _stream_openai(self, client, model, system_prompt, prompt, emit, cancel=None):
+        """Review code using OpenAI, streaming findings to ``emit`` as they complete"""
+        parser = FindingStreamParser()
+        try:
+            stream = client.chat.completions.create(
+                stream=True,
+                stream_options={"include_usage": True},
+                **self._openai_request_args(model, system_prompt, prompt)
             )
             
-            return response.choices[0].message.content
+            usage = None
+            answered_model = model
+            if cancel is not None:
+                # Wake up a read blocked on a stalled stream as soon as the call is cancelled
+                cancel.on_cancel(stream.close)
+            try:
+                for event in stream:
+                    if cancel is not None and cancel.is_set():
+                        raise hedging.HedgeCancelled()
+                    answered_model = event.model or answered_model
+                    if event.usage:
+                        usage = event.usage
+                    if event.choices and event.choices[0].delta.content:
+                        for finding in parser.feed(event.choices[0].delta.content):
+                            emit(finding)
+            finally:
+                # Drop the connection of a cancelled stream instead of reading it to the end
+                stream.close()
+            
+            return dict(self._openai_usage(usage), text=parser.text, model=answered_model)
         
         except Exception as e:
+            if cancel is not None and cancel.is_set():
+                raise hedging.HedgeCancelled(self._cancelled_usage(system_prompt, prompt, parser.text)) from e
             _logger.error('OpenAI API error: %s', e)
             raise
 
     @api.model
-    def _review_with_anthropic(self, api_key, model, prompt):
-        """Review code using Anthropic Claude"""
+    def _stream_anthropic(self, client, model, system_prompt, prompt, emit, cancel=None):
+        """Review code using Anthropic Claude, streaming findings to ``emit`` as they complete"""
+        parser = FindingStreamParser()
         try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=api_key)
+            with client.messages.stream(**self._anthropic_request_args(model, system_prompt, prompt)) as stream:
+                if cancel is not None:
+                    # Wake up a read blocked on a stalled stream as soon as the call is cancelled
+                    cancel.on_cancel(stream.close)
+                for event in stream:
+                    if cancel is not None and cancel.is_set():
+                        raise hedging.HedgeCancelled()
+                    # The review arrives as the streamed JSON input of the forced tool call
+                    if event.type != 'content_block_delta':
+                        continue
+                    delta = event.delta
+                    text = getattr(delta, 'partial_json', None) if delta.type == 'input_json_delta' else getattr(delta, 'text', None)
+                    for finding in parser.feed(text):
+                        emit(finding)
+                message = stream.get_final_message()
             
-            response = client.messages.create(
-                model=model,
-                max_tokens=4000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            return response.content[0].text
+            return dict(self._anthropic_usage(message.usage), text=parser.text, model=message.model)
         
         except Exception as e:
+            if cancel is not None and cancel.is_set():
+                raise hedging.HedgeCancelled(self._cancelled_usage(system_prompt, prompt, parser.text)) from e
             _logger.error('Anthropic API error: %s', e)
             raise
 
+    @api.model
+    def _cancelled_usage(self, system_prompt, prompt, text):
+        """Estimate the tokens billed for a stream cut short, which never reports its usage.
+
+        The whole prompt was read; the output is what arrived before the cut.
+        """
+        usage = dict.fromkeys(USAGE_KEYS, 0)
+        usage.update({
+            'input_tokens': (len(system_prompt) + len(prompt)) // CHARS_PER_TOKEN,
+            'output_tokens': len(text) // CHARS_PER_TOKEN,
+        })
+        return usage
+
+    @api.model
+    def _openai_request_args(self, model, system_prompt, prompt):
+        """Chat completion parameters of a review request"""
+        if model.startswith(REASONING_MODELS):
+            sampling = {'max_completion_tokens': REASONING_MAX_COMPLETION_TOKENS}
+        else:
+            sampling = {'temperature': 0.3, 'max_tokens': 4000}
+        return dict(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            **sampling,
+            **self._openai_format_args(model)
+        )
+
+    @api.model
+    def _anthropic_request_args(self, model, system_prompt, prompt):
+        """Message parameters of a review request, with a cacheable system prompt"""
+        return dict(
+            model=model,
+            max_tokens=4000,
+            system=[
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ],
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            tools=[REVIEW_TOOL],
+            tool_choice={"type": "tool", "name": REVIEW_TOOL['name']},
+        )
+
+    @api.model
+    def _anthropic_text(self, message):
+        """Review text of a message: the forced tool input, or plain text"""
+        text = ''
+        for block in message.content:
+            if block.type == 'tool_use':
+                return json.dumps(block.input)
+            if block.type == 'text':
+                text += block.text
+        return text
+
+    @api.model
+    def _openai_format_args(self, model):
+        """Ask for schema-conforming JSON where the model supports structured outputs"""
+        if not model.startswith(STRUCTURED_OUTPUT_MODELS):
+            return {}
+        return {
+            'response_format': {
+                'type': 'json_schema',
+                'json_schema': {'name': 'code_review', 'schema': review_schema.REVIEW_SCHEMA, 'strict': True},
+            }
+        }
+
+    @api.model
+    def _openai_usage(self, usage):
+        details = getattr(usage, 'prompt_tokens_details', None)
+        return {
+            'input_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+            'output_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+            'cached_tokens': getattr(details, 'cached_tokens', 0) or 0,
+            'cache_write_tokens': 0,
+        }
+
+    @api.model
+    def _anthropic_usage(self, usage):
+        cached_tokens = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_write_tokens = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        return {
+            # Anthropic reports cached input separately from input_tokens
+            'input_tokens': (getattr(usage, 'input_tokens', 0) or 0) + cached_tokens + cache_write_tokens,
+            'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+            'cached_tokens': cached_tokens,
+            'cache_write_tokens': cache_write_tokens,
+        }
+
+    @api.model
+    def _sum_usage(self, results):
+        """Add up the token usage of chunk completions, including the discarded answers of hedged calls"""
+        usage = dict.fromkeys(USAGE_KEYS, 0)
+        for result in results:
+            if isinstance(result, dict):
+                for part in [result] + list(result.get('discarded_usage') or ()):
+                    for key in USAGE_KEYS:
+                        usage[key] += part.get(key) or 0
+        return usage
+
     @api.model
     def _parse_review_result(self, result_text):
-        """Parse AI review response"""
+        """Parse AI review response.
+
+        Findings are validated one by one; when the response was cut off the
+        complete findings are kept instead of losing the whole review.
+        """
         try:
-            # Try to extract JSON from response
-            start = result_text.find('{')
-            end = result_text.rfind('}') + 1
-            json_str = result_text[start:end]
-            
-            result = json.loads(json_str)
-            
-            # Validate structure
-            if 'score' not in result:
-                result['score'] = 0
-            if 'summary' not in result:
-                result['summary'] = 'No summary provided'
-            if 'comments' not in result:
-                result['comments'] = []
-            
-            # Validate comments
-            for comment in result['comments']:
-                if 'severity' not in comment:
-                    comment['severity'] = 'medium'
-                if 'file_path' not in comment:
-                    comment['file_path'] = 'Unknown'
-                if 'line_number' not in comment:
-                    comment['line_number'] = 0
-                if 'rule_category' not in comment:
-                    comment['rule_category'] = 'best_practice'
-            
+            result = review_schema.parse_review(result_text)
+            if result['truncated']:
+                _logger.warning('AI review response was cut off, recovered %s finding(s)', len(result['comments']))
+                result['summary'] += '\n\n(The AI response was cut off; findings were recovered from the partial output.)'
             return result
         
         except Exception as e:
@@ -347,5 +1124,11 @@ Focus on actionable, specific feedback. Be constructive and helpful.
             return {
                 'score': 0,
                 'summary': f'Failed to parse AI review: {str(e)}',
-                'comments': []
+                'comments': [],
+                'error': True,
             }
+
+    @api.model
+    def _normalize_comment(self, comment):
+        """Validate a finding and fill in its defaults, None if unusable"""
+        return review_schema.validate_comment(comment)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# List prices in USD per million tokens: (input, cached input, output).
+# Looked up by longest model name prefix; keep in line with the providers.
+MODEL_PRICES = {
+    'gpt-3.5-turbo': (0.50, 0.50, 1.50),
+    'gpt-4': (30.0, 30.0, 60.0),
+    'gpt-4-turbo': (10.0, 10.0, 30.0),
+    'gpt-4o': (2.50, 1.25, 10.0),
+    'gpt-4o-mini': (0.15, 0.075, 0.60),
+    'gpt-4.1': (2.0, 0.50, 8.0),
+    'gpt-4.1-mini': (0.40, 0.10, 1.60),
+    'gpt-4.1-nano': (0.10, 0.025, 0.40),
+    'claude-3': (3.0, 0.30, 15.0),
+    'claude-3.5': (3.0, 0.30, 15.0),
+    'claude-3-haiku': (0.25, 0.03, 1.25),
+    'claude-3-opus': (15.0, 1.50, 75.0),
+    'claude-3-5-haiku': (0.80, 0.08, 4.0),
+    'claude-haiku': (1.0, 0.10, 5.0),
+    'claude-sonnet': (3.0, 0.30, 15.0),
+    'claude-opus': (15.0, 1.50, 75.0),
+}
+
+# Anthropic bills prompt cache writes above the plain input price
+CACHE_WRITE_FACTOR = 1.25
+
+# Both providers bill batch jobs at half the synchronous price
+BATCH_DISCOUNT = 0.5
+
+# Unknown models are costed at the highest known price of each kind, so the
+# budget guard errs on the safe side
+FALLBACK_PRICES = tuple(max(prices) for prices in zip(*MODEL_PRICES.values()))
+
+_warned_models = set()
+
+
+def get_prices(model):
+    """Get (input, cached input, output) prices of a model, or None if unknown"""
+    best = None
+    for prefix in MODEL_PRICES:
+        if (model or '').startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return MODEL_PRICES[best] if best else None
+
+
+def estimate_cost(model, usage, batch=False):
+    """Estimate the USD cost of token ``usage`` (as returned by the completion calls)"""
+    prices = get_prices(model)
+    if not prices:
+        if model not in _warned_models:
+            _warned_models.add(model)
+            _logger.warning('No price known for AI model %s, costing it at the highest known prices', model)
+        prices = FALLBACK_PRICES
+    input_price, cached_price, output_price = prices
+    cached = usage.get('cached_tokens') or 0
+    cache_write = usage.get('cache_write_tokens') or 0
+    uncached = max((usage.get('input_tokens') or 0) - cached - cache_write, 0)
+    cost = (
+        uncached * input_price
+        + cached * cached_price
+        + cache_write * input_price * CACHE_WRITE_FACTOR
+        + (usage.get('output_tokens') or 0) * output_price
+    )
+    if batch:
+        cost *= BATCH_DISCOUNT
+    return round(cost / 1000000.0, 6)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 512
+CACHE_DIRNAME = 'odooium_diff_cache'
+# Workers sharing a filestore write to the same cache; the size estimate of
+# each is resynchronised from disk after this many of its own writes
+RESCAN_WRITES = 200
+
+
+class DiffCache(object):
+    """Content-addressed, gzip compressed on-disk cache of PR diffs and file lists.
+
+    Entries are keyed by repository and base/head commit SHA, so they never
+    go stale. Each file stores the SHA-256 of its payload, checked on read;
+    the least recently used entries are evicted beyond ``max_bytes``. The
+    cache size is tracked as entries are written, so that the cache is only
+    walked when it is full.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._bytes = None
+        self._writes = 0
+
+    @staticmethod
+    def make_key(kind, repository_name, base_sha, head_sha, *extra):
+        return ':'.join([kind, repository_name, base_sha or '', head_sha] + [str(value) for value in extra])
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + '.gz')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rb') as handle:
+                checksum, payload = handle.read().split(b'\n', 1)
+            if hashlib.sha256(payload).hexdigest().encode() != checksum:
+                raise ValueError('checksum mismatch')
+            value = json.loads(payload.decode('utf-8'))
+        except FileNotFoundError:
+            self._record(hit=False)
+            return None
+        except Exception as e:
+            _logger.warning('Dropping corrupt diff cache entry %s: %s', path, e)
+            self._track(-self._remove(path))
+            self._record(hit=False)
+            return None
+
+        # Bump mtime, which drives LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._record(hit=True)
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        payload = json.dumps(value).encode('utf-8')
+        checksum = hashlib.sha256(payload).hexdigest().encode()
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as handle:
+                handle.write(checksum + b'\n' + payload)
+            size = os.path.getsize(tmp_path)
+            replaced = self._size(path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            _logger.warning('Could not write diff cache entry %s: %s', path, e)
+            if tmp_path:
+                self._remove(tmp_path)
+            return
+
+        with self._lock:
+            self._writes += 1
+            rescan = self._bytes is None or self._writes % RESCAN_WRITES == 0
+            if not rescan:
+                self._bytes += size - replaced
+                rescan = self._bytes > self.max_bytes
+        if rescan:
+            self._evict()
+
+    def _track(self, delta):
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += delta
+
+    def _evict(self):
+        """Measure the cache on disk and remove least recently used entries until it fits its budget"""
+        entries = []
+        total = 0
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total > self.max_bytes:
+            entries.sort()
+            # Free some headroom so that eviction does not run on every write
+            target = self.max_bytes * 0.9
+            for _mtime, _size, path in entries:
+                if total <= target:
+                    break
+                total -= self._remove(path)
+        with self._lock:
+            self._bytes = total
+
+    @staticmethod
+    def _size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @classmethod
+    def _remove(cls, path):
+        """Delete a file, returning the number of bytes freed"""
+        size = cls._size(path)
+        try:
+            os.remove(path)
+        except OSError:
+            return 0
+        return size
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(filestore, max_mb=DEFAULT_MAX_MB):
+    """Get the diff cache stored under a database filestore"""
+    root = os.path.join(filestore, CACHE_DIRNAME)
+    max_bytes = int(max_mb) * 1024 * 1024
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None:
+            cache = _caches[root] = DiffCache(root, max_bytes)
+        cache.max_bytes = max_bytes
+        return cache
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+
+import fnmatch
+import re
+
+HUNK_HEADER_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+FILE_HEADER_RE = re.compile(rb'^diff --git a/(.+?) b/(.+)$')
+SECTION_PATH_RE = re.compile(r'^diff --git a/(.+?) b/(.+)$', re.MULTILINE)
+
+# Files that are generated, vendored or translated in typical Odoo modules
+DEFAULT_EXCLUDE_GLOBS = (
+    '*.po',
+    '*.pot',
+    'i18n/*',
+    '*/i18n/*',
+    'static/lib/*',
+    '*/static/lib/*',
+    '*.min.js',
+    '*.min.css',
+    '*.map',
+    'package-lock.json',
+    'yarn.lock',
+    '*.png',
+    '*.jpg',
+    '*.jpeg',
+    '*.gif',
+    '*.ico',
+    '*.woff',
+    '*.woff2',
+    '*.ttf',
+    '*.eot',
+)
+
+# Skipped file names kept for the review summary
+MAX_SKIPPED_LISTED = 50
+
+
+def commentable_lines(patch):
+    """Get new-file line numbers that can carry an inline review comment.
+
+    ``patch`` is the per-file unified diff returned by the PR files API.
+    Added and context lines on the right side of a hunk are commentable.
+    """
+    lines = set()
+    new_line = None
+    for line in (patch or '').splitlines():
+        match = HUNK_HEADER_RE.match(line)
+        if match:
+            new_line = int(match.group(3))
+            continue
+        if new_line is None:
+            continue
+        if line.startswith('-'):
+            continue
+        if line.startswith('\\'):
+            # "\ No newline at end of file"
+            continue
+        lines.add(new_line)
+        new_line += 1
+    return lines
+
+
+def parse_globs(text):
+    """Split a newline or comma separated glob list"""
+    return [glob.strip() for glob in re.split(r'[\n,]', text or '') if glob.strip()]
+
+
+def make_path_filter(include_globs=None, exclude_globs=None):
+    """Build a predicate telling whether a changed file should be reviewed.
+
+    When include globs are given only matching files are kept; exclude
+    globs then drop files from what is left.
+    """
+    include_globs = tuple(include_globs or ())
+    exclude_globs = tuple(exclude_globs or ())
+    if not include_globs and not exclude_globs:
+        return None
+
+    def keep(path):
+        if include_globs and not any(fnmatch.fnmatchcase(path, glob) for glob in include_globs):
+            return False
+        return not any(fnmatch.fnmatchcase(path, glob) for glob in exclude_globs)
+
+    return keep
+
+
+def read_bounded(lines, max_lines=None, max_bytes=None, path_filter=None):
+    """Consume an iterator of diff lines (bytes) up to line and byte ceilings.
+
+    Stops reading as soon as a ceiling is reached, so at most ``max_bytes``
+    are ever held in memory whatever the size of the source. Sections of
+    files rejected by ``path_filter`` are dropped while reading and do not
+    count against the ceilings.
+    Returns a dict with the ``diff`` text, ``lines``, ``bytes``,
+    ``skipped_files``, and ``truncated``/``truncated_reason`` when a ceiling
+    cut the diff.
+    """
+    kept = []
+    line_count = 0
+    byte_count = 0
+    reason = False
+    skipping = False
+    skipped = []
+    skipped_count = 0
+    for line in lines:
+        if path_filter:
+            header = FILE_HEADER_RE.match(line)
+            if header:
+                path = header.group(2).decode('utf-8', errors='replace')
+                skipping = not path_filter(path)
+                if skipping:
+                    skipped_count += 1
+                    if len(skipped) < MAX_SKIPPED_LISTED and path not in skipped:
+                        skipped.append(path)
+            if skipping:
+                continue
+        if max_lines and line_count >= max_lines:
+            reason = f'line limit of {max_lines} lines reached'
+            break
+        size = len(line) + 1
+        if max_bytes and byte_count + size > max_bytes:
+            reason = f'size limit of {max_bytes} bytes reached'
+            break
+        kept.append(line)
+        line_count += 1
+        byte_count += size
+
+    diff = b'\n'.join(kept).decode('utf-8', errors='replace')
+    return {
+        'diff': diff,
+        'lines': line_count,
+        'bytes': byte_count,
+        'truncated': bool(reason),
+        'truncated_reason': reason,
+        'skipped_files': skipped,
+        'skipped_count': skipped_count,
+    }
+
+
+def _split_sections(diff):
+    """Split a diff into (header, hunks) sections, one per changed file.
+
+    Text before the first file section becomes
+    a section without hunks.
+    """
+    sections = []
+    header = []
+    hunks = []
+    in_file = False
+    for line in diff.splitlines(True):
+        if line.startswith('diff --git '):
+            if header or hunks:
+                sections.append((''.join(header), [''.join(hunk) for hunk in hunks]))
+            header, hunks, in_file = [line], [], True
+        elif in_file and line.startswith('@@'):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header.append(line)
+    if header or hunks:
+        sections.append((''.join(header), [''.join(hunk) for hunk in hunks]))
+    return sections
+
+
+def _split_hunk(hunk, budget):
+    """Split one oversized hunk into smaller hunks with recomputed headers"""
+    lines = hunk.splitlines(True)
+    match = HUNK_HEADER_RE.match(lines[0])
+    if not match:
+        return [hunk[i:i + budget] for i in range(0, len(hunk), budget)]
+
+    old_line = int(match.group(1))
+    new_line = int(match.group(3))
+    # Leave room for the recomputed hunk header
+    budget = max(budget - 40, 1)
+    pieces = []
+    body = []
+    size = 0
+    piece_old = old_line
+    piece_new = new_line
+    old_count = new_count = 0
+
+    def flush():
+        header = f'@@ -{piece_old},{old_count} +{piece_new},{new_count} @@\n'
+        pieces.append(header + ''.join(body))
+
+    for line in lines[1:]:
+        if body and size + len(line) > budget:
+            flush()
+            body, size = [], 0
+            piece_old, piece_new = old_line, new_line
+            old_count = new_count = 0
+        body.append(line)
+        size += len(line)
+        if line.startswith('-'):
+            old_line += 1
+            old_count += 1
+        elif line.startswith('+'):
+            new_line += 1
+            new_count += 1
+        elif not line.startswith('\\'):
+            old_line += 1
+            new_line += 1
+            old_count += 1
+            new_count += 1
+    if body:
+        flush()
+    return pieces
+
+
+def _section_path(header):
+    match = SECTION_PATH_RE.search(header)
+    return match.group(2) if match else None
+
+
+def split_hunks(diff, max_chars):
+    """Split a diff into hunk units no larger than ``max_chars``.
+
+    Each unit is a dict with the file ``path`` (None for text outside of file
+    sections), the file ``header``, the hunk ``body`` and the ``new_start``
+    and ``new_count`` of its right-side line range. Oversized hunks are cut
+    into smaller hunks with recomputed headers.
+    """
+    units = []
+    for header, hunks in _split_sections(diff):
+        path = _section_path(header)
+        if not hunks:
+            units.append({'path': path, 'header': header, 'body': '', 'new_start': 0, 'new_count': 0})
+            continue
+        budget = max(max_chars - len(header), max_chars // 2)
+        for hunk in hunks:
+            for part in ([hunk] if len(hunk) <= budget else _split_hunk(hunk, budget)):
+                match = HUNK_HEADER_RE.match(part)
+                units.append({
+                    'path': path,
+                    'header': header,
+                    'body': part,
+                    'new_start': int(match.group(3)) if match else 0,
+                    'new_count': int(match.group(4) if match.group(4) is not None else 1) if match else 0,
+                })
+    return units
+
+
+def normalize_hunk(body):
+    """Hunk content without its line numbers or trailing whitespace, for hashing"""
+    lines = body.splitlines()
+    if lines and lines[0].startswith('@@'):
+        lines = lines[1:]
+    return '\n'.join(line.rstrip() for line in lines)
+
+
+def pack_hunks(units, max_chars):
+    """Pack hunk units into chunks of at most ``max_chars``.
+
+    Consecutive units of the same file share one file header. Returns a
+    list of (chunk text, indexes of the units it contains).
+    """
+    chunks = []
+    current = []
+    members = []
+    size = 0
+    last_header = None
+    for index, unit in enumerate(units):
+        if current and unit['header'] == last_header:
+            piece = unit['body']
+        else:
+            piece = unit['header'] + unit['body']
+        if current and size + len(piece) > max_chars:
+            chunks.append((''.join(current), members))
+            current, members, size = [], [], 0
+            piece = unit['header'] + unit['body']
+        current.append(piece)
+        members.append(index)
+        size += len(piece)
+        last_header = unit['header']
+    if current:
+        chunks.append((''.join(current), members))
+    return chunks
+
+
+def _hunk_lines(hunk):
+    """Walk a hunk, yielding (marker, old line, new line) for each of its lines.
+
+    Added lines have no old line and removed lines no new line.
+    """
+    old_line = new_line = None
+    for line in hunk.splitlines():
+        match = HUNK_HEADER_RE.match(line)
+        if match:
+            old_line, new_line = int(match.group(1)), int(match.group(3))
+        elif old_line is None or line.startswith('\\'):
+            continue
+        elif line.startswith('+'):
+            yield '+', None, new_line
+            new_line += 1
+        elif line.startswith('-'):
+            yield '-', old_line, None
+            old_line += 1
+        else:
+            yield ' ', old_line, new_line
+            old_line += 1
+            new_line += 1
+
+
+def changed_files(diff):
+    """Map each file of a diff to how it changed.
+
+    Returns ``{path: {'old_path', 'deleted', 'hunks'}}`` where hunks are
+    (old_start, old_count, new_start, new_count, kept) tuples, ``kept``
+    mapping the old line numbers of the hunk's context lines to their new
+    ones.
+    """
+    files = {}
+    for header, hunks in _split_sections(diff):
+        match = SECTION_PATH_RE.search(header)
+        if not match:
+            continue
+        ranges = []
+        for hunk in hunks:
+            hunk_match = HUNK_HEADER_RE.match(hunk)
+            if hunk_match:
+                old_start, old_count, new_start, new_count = hunk_match.groups()
+                ranges.append((
+                    int(old_start), int(old_count) if old_count is not None else 1,
+                    int(new_start), int(new_count) if new_count is not None else 1,
+                    {old: new for marker, old, new in _hunk_lines(hunk) if marker == ' '},
+                ))
+        files[match.group(2)] = {
+            'old_path': match.group(1),
+            'deleted': '\ndeleted file mode' in header,
+            'hunks': ranges,
+        }
+    return files
+
+
+def added_lines(diff):
+    """Map each file of a diff to the new-file line numbers it adds"""
+    files = {}
+    for header, hunks in _split_sections(diff):
+        path = _section_path(header)
+        if not path:
+            continue
+        lines = files.setdefault(path, set())
+        for hunk in hunks:
+            lines.update(new for marker, _old, new in _hunk_lines(hunk) if marker == '+')
+    return files
+
+
+def file_patches(diff):
+    """Map each file of a diff to its hunks, like the ``patch`` of the PR files API"""
+    patches = {}
+    for header, hunks in _split_sections(diff):
+        path = _section_path(header)
+        if path:
+            patches[path] = ''.join(hunks)
+    return patches
+
+
+def remap_line(hunks, line):
+    """Follow a line of the old file through a file diff.
+
+    Returns its number in the new file, or None when the line itself was
+    removed or changed; context lines of a hunk are followed too.
+    """
+    offset = 0
+    for old_start, old_count, new_start, new_count, kept in hunks:
+        if old_count == 0:
+            # Pure insertion after line old_start
+            if line <= old_start:
+                break
+        elif line < old_start:
+            break
+        elif line < old_start + old_count:
+            return kept.get(line)
+        # A zero-length range starts after the line it names
+        old_end = old_start + old_count if old_count else old_start + 1
+        new_end = new_start + new_count if new_count else new_start + 1
+        offset = new_end - old_end
+    return line + offset
+
+
+def split_chunks(diff, max_chars):
+    """Split a diff along file and hunk boundaries into chunks of at most ``max_chars``.
+
+    Whole files are packed together while they fit; larger files are split
+    between hunks, each piece repeating the file header, and hunks larger
+    than the budget are cut into smaller hunks. No line is ever dropped.
+    """
+    return [text for text, _members in pack_hunks(split_hunks(diff, max_chars), max_chars)]
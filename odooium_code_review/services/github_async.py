@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+
+from . import github_ratelimit
+from . import resilience
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+QUEUE_SIZE = 32
+
+
+def is_available():
+    """Check whether the optional aiohttp client is installed"""
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class RepositorySpec(object):
+    """What to fetch for one repository during a concurrent sync"""
+
+    def __init__(self, key, full_name, token=None, watermark=None, prefetch_files=False):
+        self.key = key
+        self.full_name = full_name
+        self.token = token
+        # ISO 8601 timestamp; PRs updated before it stop the paging
+        self.watermark = watermark
+        self.prefetch_files = prefetch_files
+
+
+class _FetchContext(object):
+
+    def __init__(self, session, base_url, headers_for, events, stop, settings, file_cache, breaker):
+        self.session = session
+        self.base_url = base_url
+        self.headers_for = headers_for
+        self.events = events
+        self.stop = stop
+        self.concurrency, self.per_page, self.reserve, self.max_retries, self.max_wait = settings
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.scheduler = github_ratelimit.get_scheduler()
+        self.file_cache = file_cache
+        self.breaker = breaker
+
+
+async def _emit(ctx, event):
+    """Hand an event over to the consuming thread, waiting while its queue is full"""
+    while True:
+        if ctx.stop.is_set():
+            raise asyncio.CancelledError()
+        try:
+            ctx.events.put_nowait(event)
+            return
+        except queue.Full:
+            await asyncio.sleep(0.05)
+
+
+async def _get_page(ctx, url, headers, params=None):
+    """GET one page honouring the shared rate limit scheduler; returns (items, next_url).
+
+    Connection errors, timeouts and 5xx responses are retried with jittered
+    backoff and count against the ``github.rest`` circuit breaker shared
+    with the synchronous client, like ``_send_throttled`` does.
+    """
+    import aiohttp
+
+    token_key = ctx.scheduler.token_key(headers)
+    attempt = 0
+    while True:
+        ctx.breaker.check()
+        delay = ctx.scheduler.reserve(token_key, reserve=ctx.reserve, max_wait=ctx.max_wait)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        try:
+            async with ctx.semaphore:
+                async with ctx.session.get(url, headers=headers, params=params) as response:
+                    body = await response.text()
+                    ctx.scheduler.update(token_key, response)
+                    if response.status in resilience.TRANSIENT_STATUS:
+                        ctx.breaker.record_failure()
+                        if attempt >= ctx.max_retries:
+                            response.raise_for_status()
+                        retry = resilience.backoff_delay(attempt)
+                        _logger.warning('GitHub returned %s on %s, retrying in %.1fs', response.status, url, retry)
+                    else:
+                        ctx.breaker.record_success()
+                        retry = github_ratelimit.retry_delay_for(response.status, response.headers, body, attempt)
+                        if retry is None:
+                            response.raise_for_status()
+                            next_link = response.links.get('next')
+                            next_url = str(next_link.get('url')) if next_link else None
+                            return (json.loads(body) if body else []), next_url
+                        ctx.scheduler.block(token_key, retry)
+                        if attempt >= ctx.max_retries or retry > ctx.max_wait:
+                            raise github_ratelimit.exceeded(response.status, retry)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            ctx.breaker.record_failure()
+            if attempt >= ctx.max_retries:
+                raise
+            retry = resilience.backoff_delay(attempt)
+            _logger.warning('GitHub request to %s failed (%s), retrying in %.1fs', url, e, retry)
+        except asyncio.CancelledError:
+            # Do not leave a half-open breaker waiting for this trial call
+            ctx.breaker.release()
+            raise
+
+        await asyncio.sleep(retry)
+        attempt += 1
+
+
+async def _fetch_files(ctx, spec, headers, pr_data):
+    """Fetch the file list of an open PR into the diff cache.
+
+    The cache's disk IO runs in the default executor, off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    head_sha = pr_data.get('head', {}).get('sha')
+    base_sha = pr_data.get('base', {}).get('sha')
+    cache_key = ctx.file_cache.make_key('files', spec.full_name, base_sha, head_sha)
+    if await loop.run_in_executor(None, ctx.file_cache.get, cache_key) is not None:
+        return
+
+    files = []
+    url = f"{ctx.base_url}/repos/{spec.full_name}/pulls/{pr_data.get('number')}/files"
+    params = {'per_page': ctx.per_page}
+    while url:
+        items, url = await _get_page(ctx, url, headers, params)
+        files.extend(items)
+        params = None
+    await loop.run_in_executor(None, ctx.file_cache.put, cache_key, files)
+
+
+async def _fetch_repository(ctx, spec):
+    headers = ctx.headers_for(spec.token)
+    url = f'{ctx.base_url}/repos/{spec.full_name}/pulls'
+    params = {'state': 'all', 'per_page': ctx.per_page}
+    if spec.watermark:
+        params.update({'sort': 'updated', 'direction': 'desc'})
+
+    try:
+        while url:
+            items, url = await _get_page(ctx, url, headers, params)
+            params = None
+            if spec.watermark:
+                fresh = [item for item in items if (item.get('updated_at') or '') >= spec.watermark]
+                if len(fresh) < len(items):
+                    url = None
+                items = fresh
+
+            if spec.prefetch_files and ctx.file_cache:
+                await asyncio.gather(*[
+                    _fetch_files(ctx, spec, headers, item)
+                    for item in items if item.get('state') == 'open'
+                ])
+
+            if items:
+                await _emit(ctx, ('page', spec.key, items))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        _logger.error('Concurrent sync of %s failed: %s', spec.full_name, e)
+        await _emit(ctx, ('done', spec.key, str(e) or e.__class__.__name__))
+        return
+
+    await _emit(ctx, ('done', spec.key, None))
+
+
+async def _fetch_all(specs, base_url, headers_for, events, stop, settings, timeout, file_cache, breaker):
+    import aiohttp
+
+    connect_timeout, read_timeout = timeout
+    connector = aiohttp.TCPConnector(limit=settings[0])
+    client_timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, auto_decompress=True) as session:
+        ctx = _FetchContext(session, base_url, headers_for, events, stop, settings, file_cache, breaker)
+        await asyncio.gather(*[_fetch_repository(ctx, spec) for spec in specs])
+
+
+def iter_concurrent(specs, base_url, headers_for, settings, timeout, file_cache=None, breaker=None):
+    """Fetch PR pages of many repositories at once and yield them as they arrive.
+
+    The HTTP work runs on an asyncio event loop in a background thread, with
+    at most ``settings[0]`` requests in flight. Events are yielded to the
+    calling thread, which owns the ORM cursor:
+
+    * ``('page', key, items)`` for every fetched page of PRs,
+    * ``('done', key, error)`` once a repository is finished (error is None
+      on success).
+
+    A bounded queue keeps memory flat when the consumer is slower than the
+    network. Closing the generator stops the fetch. Requests go through
+    ``breaker``, by default the process-wide ``github.rest`` breaker.
+    """
+    if breaker is None:
+        breaker = resilience.get_breaker('github.rest')
+    events = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    finished = object()
+
+    def run():
+        try:
+            asyncio.run(_fetch_all(specs, base_url, headers_for, events, stop, settings, timeout, file_cache, breaker))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            _logger.exception('Concurrent GitHub sync aborted')
+            for spec in specs:
+                events.put(('done', spec.key, str(e)))
+        finally:
+            events.put(finished)
+
+    thread = threading.Thread(target=run, name='odooium-github-sync', daemon=True)
+    thread.start()
+    try:
+        while True:
+            event = events.get()
+            if event is finished:
+                break
+            yield event
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue
+        while thread.is_alive():
+            try:
+                events.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
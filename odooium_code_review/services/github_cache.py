@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_MAX_MB = 32
+MAX_CACHED_BODY_BYTES = 5 * 1024 * 1024
+CACHED_HEADERS = ('etag', 'last-modified', 'link', 'content-type')
+
+
+class CachedResponse(object):
+    """Minimal stand-in for a requests.Response replayed from the cache"""
+
+    def __init__(self, status_code, headers, content, encoding, links):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.links = links
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        return None
+
+
+class ConditionalCache(object):
+    """LRU cache of GitHub GET responses validated with ETag/Last-Modified.
+
+    The size is bounded by the total bytes of the cached bodies.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(url, params=None, headers=None):
+        """Build cache key from URL, query, Accept header and token.
+
+        The token is hashed so that credentials are never kept in memory
+        as dictionary keys.
+        """
+        headers = headers or {}
+        token = headers.get('Authorization') or ''
+        raw = '|'.join([
+            url,
+            json.dumps(params or {}, sort_keys=True, default=str),
+            headers.get('Accept') or '',
+            hashlib.sha256(token.encode()).hexdigest(),
+        ])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def validators(self, key):
+        """Get conditional request headers for a cached entry"""
+        entry = self.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.headers.get('ETag'):
+            headers['If-None-Match'] = entry.headers['ETag']
+        if entry.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = entry.headers['Last-Modified']
+        return headers
+
+    def store(self, key, response):
+        """Store a 200 response if it carries a validator"""
+        if response.status_code != 200:
+            return
+        headers = CaseInsensitiveDict(response.headers)
+        if not (headers.get('ETag') or headers.get('Last-Modified')):
+            return
+        if len(response.content) > min(MAX_CACHED_BODY_BYTES, self.max_bytes):
+            return
+
+        entry = CachedResponse(
+            response.status_code,
+            CaseInsensitiveDict({k: v for k, v in headers.items() if k.lower() in CACHED_HEADERS}),
+            response.content,
+            response.encoding,
+            response.links,
+        )
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.content)
+            self._entries[key] = entry
+            self._bytes += len(entry.content)
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries beyond the byte budget; call with the lock held"""
+        while self._bytes > self.max_bytes and self._entries:
+            _key, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry.content)
+            self.evictions += 1
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / float(lookups), 3) if lookups else 0.0,
+        }
+
+
+_cache = ConditionalCache()
+
+
+def get_cache(max_mb=DEFAULT_MAX_MB):
+    """Get the process-wide conditional request cache"""
+    max_bytes = int(max_mb) * 1024 * 1024
+    if _cache.max_bytes != max_bytes:
+        _cache.resize(max_bytes)
+    return _cache
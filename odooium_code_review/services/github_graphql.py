@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+# GraphQL queries and converters producing the same payload shape as the
+# REST endpoints, so callers do not care which API served the data.
+
+MAX_PRS_PER_QUERY = 50
+MAX_FILES_PER_PR = 100
+MAX_REVIEWS_PER_PR = 20
+
+PR_FIELDS = """
+    databaseId
+    number
+    title
+    body
+    state
+    createdAt
+    updatedAt
+    closedAt
+    mergedAt
+    headRefName
+    headRefOid
+    baseRefName
+    baseRefOid
+    reviewDecision
+    author {
+        login
+        avatarUrl
+        ... on User { databaseId }
+    }
+    files(first: %(max_files)d) {
+        totalCount
+        nodes { path additions deletions changeType }
+    }
+    reviews(last: %(max_reviews)d) {
+        nodes {
+            databaseId
+            state
+            submittedAt
+            author { login }
+        }
+    }
+""" % {'max_files': MAX_FILES_PER_PR, 'max_reviews': MAX_REVIEWS_PER_PR}
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String,
+      $states: [PullRequestState!], $orderBy: IssueOrder) {
+    repository(owner: $owner, name: $name) {
+        pullRequests(first: $first, after: $after, states: $states, orderBy: $orderBy) {
+            pageInfo { hasNextPage endCursor }
+            nodes { %s }
+        }
+    }
+}
+""" % PR_FIELDS
+
+PR_FILES_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $first: Int!, $after: String) {
+    repository(owner: $owner, name: $name) {
+        pullRequest(number: $number) {
+            files(first: $first, after: $after) {
+                pageInfo { hasNextPage endCursor }
+                nodes { path additions deletions changeType }
+            }
+        }
+    }
+}
+"""
+
+REST_STATES = {
+    'open': ['OPEN'],
+    'closed': ['CLOSED', 'MERGED'],
+    'all': None,
+}
+
+REST_SORT_FIELDS = {
+    'created': 'CREATED_AT',
+    'updated': 'UPDATED_AT',
+}
+
+FILE_STATUS = {
+    'ADDED': 'added',
+    'DELETED': 'removed',
+    'MODIFIED': 'modified',
+    'RENAMED': 'renamed',
+    'COPIED': 'copied',
+    'CHANGED': 'changed',
+}
+
+
+def pull_requests_variables(owner, name, state='open', sort=None, direction=None, first=MAX_PRS_PER_QUERY):
+    """Translate REST list parameters into GraphQL query variables"""
+    return {
+        'owner': owner,
+        'name': name,
+        'first': min(first, MAX_PRS_PER_QUERY),
+        'states': REST_STATES.get(state),
+        'orderBy': {
+            'field': REST_SORT_FIELDS.get(sort or 'created', 'CREATED_AT'),
+            'direction': (direction or 'desc').upper(),
+        },
+    }
+
+
+def file_node_to_rest(node):
+    return {
+        'filename': node.get('path'),
+        'additions': node.get('additions'),
+        'deletions': node.get('deletions'),
+        'status': FILE_STATUS.get(node.get('changeType'), 'modified'),
+    }
+
+
+def pr_node_to_rest(node):
+    """Convert a GraphQL PullRequest node into a REST-shaped PR dict.
+
+    Besides the REST fields, ``files``, ``files_complete`` and ``reviews``
+    carry the data that would otherwise need extra REST round trips.
+    """
+    author = node.get('author') or {}
+    files = node.get('files') or {}
+    file_nodes = files.get('nodes') or []
+    return {
+        'id': node.get('databaseId'),
+        'number': node.get('number'),
+        'title': node.get('title'),
+        'body': node.get('body'),
+        'state': 'open' if node.get('state') == 'OPEN' else 'closed',
+        'created_at': node.get('createdAt'),
+        'updated_at': node.get('updatedAt'),
+        'closed_at': node.get('closedAt'),
+        'merged_at': node.get('mergedAt'),
+        'user': {
+            'login': author.get('login'),
+            'id': author.get('databaseId'),
+            'avatar_url': author.get('avatarUrl'),
+        },
+        'head': {'ref': node.get('headRefName'), 'sha': node.get('headRefOid')},
+        'base': {'ref': node.get('baseRefName'), 'sha': node.get('baseRefOid')},
+        'review_decision': node.get('reviewDecision'),
+        'files': [file_node_to_rest(f) for f in file_nodes],
+        'files_complete': files.get('totalCount', 0) <= len(file_nodes),
+        'reviews': [{
+            'id': review.get('databaseId'),
+            'state': review.get('state'),
+            'submitted_at': review.get('submittedAt'),
+            'user': {'login': (review.get('author') or {}).get('login')},
+        } for review in (node.get('reviews') or {}).get('nodes') or []],
+    }
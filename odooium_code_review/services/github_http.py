@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+
+class PooledSession(object):
+    """Keep-alive HTTP session shared by every request of a worker process"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, keep_alive=True):
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session = requests.Session()
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+        self._session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        })
+        self._lock = threading.Lock()
+        self._requests = 0
+
+    def request(self, method, url, **kwargs):
+        """Send request through the pooled session"""
+        with self._lock:
+            self._requests += 1
+        return self._session.request(method, url, **kwargs)
+
+    def stats(self):
+        """Get connection statistics for this session"""
+        pools = self._adapter.poolmanager.pools
+        connections = 0
+        pool_requests = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += getattr(pool, 'num_connections', 0)
+            pool_requests += getattr(pool, 'num_requests', 0)
+
+        reuse_ratio = 0.0
+        if pool_requests:
+            reuse_ratio = max(pool_requests - connections, 0) / float(pool_requests)
+
+        return {
+            'pool_size': self.pool_size,
+            'keep_alive': self.keep_alive,
+            'requests': self._requests,
+            'connections': connections,
+            'reuse_ratio': round(reuse_ratio, 3),
+        }
+
+    def close(self):
+        self._session.close()
+
+
+_session_lock = threading.Lock()
+_session = None
+
+
+def get_session(pool_size=DEFAULT_POOL_SIZE, keep_alive=True):
+    """Get the process-wide pooled session, rebuilding it when settings change"""
+    global _session
+    session = _session
+    if session and session.pool_size == pool_size and session.keep_alive == keep_alive:
+        return session
+
+    with _session_lock:
+        if _session and _session.pool_size == pool_size and _session.keep_alive == keep_alive:
+            return _session
+        if _session:
+            _logger.info('GitHub HTTP pool settings changed, rebuilding session')
+            _session.close()
+        _session = PooledSession(pool_size=pool_size, keep_alive=keep_alive)
+        return _session
+
+
+def get_stats():
+    """Get statistics of the current session (empty if none was created yet)"""
+    session = _session
+    if not session:
+        return {'requests': 0, 'connections': 0, 'reuse_ratio': 0.0}
+    return session.stats()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import random
+import threading
+import time
+
+import requests
+
+DEFAULT_RESERVE = 100
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_WAIT = 60.0
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """Raised when the rate limit budget would make the caller wait too long"""
+
+    def __init__(self, message, retry_at=None):
+        super(RateLimitExceeded, self).__init__(message)
+        self.retry_at = retry_at
+
+
+def _int_header(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket(object):
+    """Request budget of one access token, refilled by GitHub at reset time"""
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self.next_slot = 0.0
+
+    def update(self, headers):
+        limit = _int_header(headers, 'X-RateLimit-Limit')
+        remaining = _int_header(headers, 'X-RateLimit-Remaining')
+        reset_at = _int_header(headers, 'X-RateLimit-Reset')
+        if limit is not None:
+            self.limit = limit
+        if remaining is not None:
+            self.remaining = remaining
+        if reset_at is not None:
+            self.reset_at = reset_at
+
+    def delay(self, now, reserve):
+        """Seconds to wait before the next request may be sent"""
+        if self.reset_at is not None and self.reset_at <= now:
+            # Window has been refilled
+            self.remaining = self.limit
+            self.reset_at = None
+
+        delay = max(self.blocked_until - now, 0.0)
+        if self.remaining is None or self.reset_at is None:
+            return delay
+        if self.remaining <= 0:
+            return max(delay, self.reset_at - now)
+        if self.remaining <= reserve:
+            # Spread what is left of the budget over the rest of the window
+            interval = (self.reset_at - now) / float(self.remaining)
+            delay = max(delay, self.next_slot - now)
+            self.next_slot = max(self.next_slot, now) + interval
+        return delay
+
+    def budget(self, now):
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_at': self.reset_at,
+            'reset_in': max(self.reset_at - now, 0) if self.reset_at else 0,
+            'blocked_for': max(self.blocked_until - now, 0.0),
+        }
+
+
+class RateLimitScheduler(object):
+    """Per-token request scheduler driven by GitHub rate limit headers"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def token_key(headers):
+        token = (headers or {}).get('Authorization') or ''
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets.setdefault(key, TokenBucket())
+        return bucket
+
+    def wait(self, key, reserve=DEFAULT_RESERVE, max_wait=DEFAULT_MAX_WAIT):
+        """Block until the token may send another request"""
+        delay = self.reserve(key, reserve=reserve, max_wait=max_wait)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self, key, reserve=DEFAULT_RESERVE, max_wait=DEFAULT_MAX_WAIT):
+        """Book the next request slot of the token and return how long to wait for it"""
+        now = time.time()
+        with self._lock:
+            bucket = self._bucket(key)
+            delay = bucket.delay(now, reserve)
+            if delay > max_wait:
+                raise RateLimitExceeded(
+                    'GitHub rate limit exhausted, retry in %d seconds' % delay,
+                    retry_at=now + delay,
+                )
+            if bucket.remaining:
+                bucket.remaining -= 1
+        return delay
+
+    def update(self, key, response):
+        with self._lock:
+            self._bucket(key).update(response.headers)
+
+    def block(self, key, seconds):
+        """Hold back every request of the token for a while (secondary limits)"""
+        with self._lock:
+            bucket = self._bucket(key)
+            bucket.blocked_until = max(bucket.blocked_until, time.time() + seconds)
+
+    def budget(self, key):
+        with self._lock:
+            return self._bucket(key).budget(time.time())
+
+
+def exceeded(status, delay):
+    """Error for a rate limited response that will not be retried, resetting in ``delay`` seconds"""
+    return RateLimitExceeded(
+        'GitHub rate limit exceeded (%s), retry in %d seconds' % (status, delay),
+        retry_at=time.time() + delay,
+    )
+
+
+def retry_delay(response, attempt):
+    """Get seconds to wait before retrying a rate limited response, or None"""
+    if response.status_code not in (403, 429):
+        return None
+    return retry_delay_for(response.status_code, response.headers, response.text, attempt)
+
+
+def retry_delay_for(status, headers, text, attempt):
+    """Get retry delay from a response status, headers and body, or None"""
+    if status not in (403, 429):
+        return None
+
+    retry_after = headers.get('Retry-After')
+    remaining = _int_header(headers, 'X-RateLimit-Remaining')
+
+    if status == 403 and retry_after is None and remaining != 0:
+        # A plain permission error, not a rate limit
+        if 'rate limit' not in (text or '').lower():
+            return None
+
+    if retry_after is not None:
+        try:
+            return float(retry_after) + random.uniform(0, BACKOFF_BASE)
+        except ValueError:
+            pass
+    if remaining == 0:
+        reset_at = _int_header(headers, 'X-RateLimit-Reset')
+        if reset_at:
+            return max(reset_at - time.time(), 0) + random.uniform(0, BACKOFF_BASE)
+    # Full jitter exponential backoff
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+_scheduler = RateLimitScheduler()
+
+
+def get_scheduler():
+    """Get the process-wide rate limit scheduler"""
+    return _scheduler
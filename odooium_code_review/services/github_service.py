@@ -1,14 +1,45 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, api, _
+from odoo import models, fields, api, _
+from datetime import datetime, timedelta
 import requests
 import logging
 import json
 import hmac
 import hashlib
+import time
+from urllib.parse import quote
+
+from . import diff_cache
+from . import diff_parser
+from . import github_async
+from . import github_cache
+from . import github_graphql
+from . import github_http
+from . import github_ratelimit
+from . import resilience
 
 _logger = logging.getLogger(__name__)
 
+# Hidden marker identifying Odooium's summary comment on a PR
+SUMMARY_MARKER = '<!-- odooium-review -->'
+
+# Hard ceiling on downloaded diff size, whatever the line count
+DEFAULT_MAX_DIFF_BYTES = 10 * 1024 * 1024
+DIFF_CHUNK_SIZE = 64 * 1024
+
+# Number of PRs upserted per ORM batch during a sync
+SYNC_BATCH_SIZE = 500
+
+# Safety margin applied to the incremental sync watermark (clock skew, in-flight updates)
+SYNC_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Fields compared against the database to only write what changed
+SYNC_COMPARED_FIELDS = [
+    'number', 'title', 'description', 'author', 'author_github_id', 'author_avatar',
+    'branch', 'base_branch', 'commit_sha', 'base_commit_sha', 'state', 'created_at', 'updated_at', 'closed_at',
+]
+
 
 class GitHubService(models.Model):
     _name = 'odooium.github_service'
@@ -30,6 +61,170 @@ class GitHubService(models.Model):
             headers['Authorization'] = f'token {token}'
         return headers
 
+    @api.model
+    def _get_http_session(self):
+        """Get pooled keep-alive session for this worker process"""
+        params = self.env['ir.config_parameter'].sudo()
+        pool_size = int(params.get_param('odooium.github.pool_size', github_http.DEFAULT_POOL_SIZE))
+        keep_alive = params.get_param('odooium.github.keep_alive', 'True') not in ('False', '0', '')
+        return github_http.get_session(pool_size=pool_size, keep_alive=keep_alive)
+
+    @api.model
+    def _get_timeout(self, read_timeout=None):
+        """Get (connect, read) timeout for GitHub API requests"""
+        params = self.env['ir.config_parameter'].sudo()
+        connect_timeout = float(params.get_param('odooium.github.connect_timeout', github_http.DEFAULT_CONNECT_TIMEOUT))
+        if read_timeout is None:
+            read_timeout = float(params.get_param('odooium.github.read_timeout', github_http.DEFAULT_READ_TIMEOUT))
+        return (connect_timeout, read_timeout)
+
+    @api.model
+    def _get_response_cache(self):
+        """Get conditional request cache, or None when disabled"""
+        max_mb = int(self.env['ir.config_parameter'].sudo().get_param(
+            'odooium.github.cache_max_mb', github_cache.DEFAULT_MAX_MB))
+        if max_mb <= 0:
+            return None
+        return github_cache.get_cache(max_mb)
+
+    @api.model
+    def _http_request(self, method, url, headers=None, data=None, timeout=None, **kwargs):
+        """Send raw HTTP request through the pooled session and return the response.
+
+        GET requests are revalidated with ``If-None-Match``/``If-Modified-Since``
+        against the response cache; a 304 is replayed from the cache and does not
+        count against the GitHub rate limit. A 304 without a cached response is
+        retried once without the conditional headers.
+        """
+        if method not in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+            raise ValueError(f'Unsupported method: {method}')
+
+        headers = dict(headers or {})
+        cache = None
+        cache_key = None
+        if method == 'GET' and not kwargs.get('stream'):
+            cache = self._get_response_cache()
+        if cache:
+            cache_key = cache.make_key(url, kwargs.get('params'), headers)
+            headers.update(cache.validators(cache_key))
+
+        response = self._send_throttled(method, url, headers, data, timeout, **kwargs)
+
+        if response.status_code == 304:
+            cached = cache.get(cache_key) if cache else None
+            if cached:
+                cache.record(hit=True)
+                return cached
+            # The entry was evicted meanwhile: ask again for the full response
+            response.close()
+            headers = {
+                name: value for name, value in headers.items()
+                if name.lower() not in ('if-none-match', 'if-modified-since')
+            }
+            response = self._send_throttled(method, url, headers, data, timeout, **kwargs)
+        if cache:
+            cache.record(hit=False)
+
+        response.raise_for_status()
+
+        if cache:
+            cache.store(cache_key, response)
+        return response
+
+    @api.model
+    def _get_rate_limit_settings(self):
+        """Get (reserve, max retries, max wait) for the rate limit scheduler"""
+        params = self.env['ir.config_parameter'].sudo()
+        return (
+            int(params.get_param('odooium.github.rate_limit_reserve', github_ratelimit.DEFAULT_RESERVE)),
+            int(params.get_param('odooium.github.max_retries', github_ratelimit.DEFAULT_MAX_RETRIES)),
+            float(params.get_param('odooium.github.max_rate_wait', github_ratelimit.DEFAULT_MAX_WAIT)),
+        )
+
+    @api.model
+    def _get_breaker(self, name):
+        """Get circuit breaker of a GitHub endpoint"""
+        params = self.env['ir.config_parameter'].sudo()
+        return resilience.get_breaker(
+            name,
+            failure_threshold=int(params.get_param('odooium.breaker.failure_threshold', resilience.DEFAULT_FAILURE_THRESHOLD)),
+            reset_timeout=float(params.get_param('odooium.breaker.reset_timeout', resilience.DEFAULT_RESET_TIMEOUT)),
+        )
+
+    @api.model
+    def _send_throttled(self, method, url, headers, data=None, timeout=None, **kwargs):
+        """Send request paced by the per-token rate limit budget.
+
+        Primary (429/403 with exhausted budget) and secondary (Retry-After)
+        rate limit responses are retried with jittered backoff, as are
+        connection errors, timeouts and 5xx responses. The latter count against
+        the endpoint's circuit breaker, which raises ``CircuitOpenError``
+        without calling GitHub while it is open. A rate limit that outlasts
+        the retries or ``max_wait`` raises ``RateLimitExceeded`` with the
+        time at which it resets.
+        """
+        scheduler = github_ratelimit.get_scheduler()
+        token_key = scheduler.token_key(headers)
+        reserve, max_retries, max_wait = self._get_rate_limit_settings()
+        session = self._get_http_session()
+        breaker = self._get_breaker('github.graphql' if url.endswith('/graphql') else 'github.rest')
+        
+        attempt = 0
+        while True:
+            breaker.check()
+            scheduler.wait(token_key, reserve=reserve, max_wait=max_wait)
+            try:
+                response = session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    json=data,
+                    timeout=timeout or self._get_timeout(),
+                    **kwargs
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                breaker.record_failure()
+                if attempt >= max_retries:
+                    raise
+                delay = resilience.backoff_delay(attempt)
+                _logger.warning('GitHub request to %s failed (%s), retrying in %.1fs', url, e, delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            
+            scheduler.update(token_key, response)
+            
+            if response.status_code in resilience.TRANSIENT_STATUS:
+                breaker.record_failure()
+                if attempt >= max_retries:
+                    return response
+                delay = resilience.backoff_delay(attempt)
+                _logger.warning('GitHub returned %s on %s, retrying in %.1fs', response.status_code, url, delay)
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+            
+            breaker.record_success()
+            
+            delay = github_ratelimit.retry_delay(response, attempt)
+            if delay is None:
+                return response
+            scheduler.block(token_key, delay)
+            response.close()
+            if attempt >= max_retries or delay > max_wait:
+                raise github_ratelimit.exceeded(response.status_code, delay)
+            
+            _logger.warning('GitHub rate limited (%s) on %s, retrying in %.1fs', response.status_code, url, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    @api.model
+    def get_rate_limit_budget(self, token=None):
+        """Get the current rate limit budget known for a token"""
+        scheduler = github_ratelimit.get_scheduler()
+        return scheduler.budget(scheduler.token_key(self._get_headers(token)))
+
     @api.model
     def _api_request(self, method, endpoint, data=None, token=None):
         """Make API request to GitHub"""
@@ -38,24 +233,54 @@ class GitHubService(models.Model):
         headers = self._get_headers(token)
         
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, timeout=30)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=30)
-            elif method == 'PUT':
-                response = requests.put(url, headers=headers, json=data, timeout=30)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers, timeout=30)
-            else:
-                raise ValueError(f'Unsupported method: {method}')
-            
-            response.raise_for_status()
+            response = self._http_request(method, url, headers=headers, data=data)
             return response.json() if response.text else {}
         
         except requests.exceptions.RequestException as e:
             _logger.error('GitHub API request failed: %s', e)
             raise
 
+    @api.model
+    def _paginate(self, endpoint, params=None, token=None, per_page=100):
+        """Iterate lazily over all items of a GitHub list endpoint.
+
+        Follows the ``Link: rel="next"`` header page by page, so only one page
+        is held in memory at a time and callers can stop early.
+        """
+        url = f'{self._get_github_api_base()}{endpoint}'
+        headers = self._get_headers(token)
+        params = dict(params or {}, per_page=min(int(per_page), 100))
+        
+        while url:
+            try:
+                response = self._http_request('GET', url, headers=headers, params=params)
+            except requests.exceptions.RequestException as e:
+                _logger.error('GitHub API request failed: %s', e)
+                raise
+            
+            for item in (response.json() if response.text else []):
+                yield item
+            
+            # The next link already carries the query string
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+    @api.model
+    def get_connection_stats(self):
+        """Get connection pool statistics (reuse ratio) for this worker"""
+        return github_http.get_stats()
+
+    @api.model
+    def get_breaker_stats(self):
+        """Get circuit breaker states and counters for this worker"""
+        return resilience.get_stats()
+
+    @api.model
+    def get_cache_stats(self):
+        """Get conditional request cache statistics (hits/misses) for this worker"""
+        cache = self._get_response_cache()
+        return cache.stats() if cache else {}
+
     @api.model
     def test_connection(self):
         """Test GitHub connection"""
@@ -93,13 +318,99 @@ class GitHubService(models.Model):
             _logger.error('Failed to get repository %s/%s: %s', owner, repo_name, e)
             return None
 
+    @api.model
+    def _get_api_mode(self):
+        """Get API used for bulk PR fetches: 'rest' or 'graphql'"""
+        return self.env['ir.config_parameter'].sudo().get_param('odooium.github.api_mode', 'rest')
+
+    @api.model
+    def _graphql_request(self, query, variables=None, token=None):
+        """Run GraphQL query against the GitHub API and return its data"""
+        url = f'{self._get_github_api_base()}/graphql'
+        try:
+            response = self._http_request('POST', url, headers=self._get_headers(token),
+                                          data={'query': query, 'variables': variables or {}})
+        except requests.exceptions.RequestException as e:
+            _logger.error('GitHub GraphQL request failed: %s', e)
+            raise
+        
+        result = response.json()
+        if result.get('errors'):
+            messages = '; '.join(error.get('message', '') for error in result['errors'])
+            raise requests.exceptions.RequestException(f'GitHub GraphQL error: {messages}')
+        return result.get('data') or {}
+
+    @api.model
+    def _iter_pull_requests_graphql(self, repository, state='open', token=None, per_page=50, sort=None, direction=None):
+        """Iterate over pull requests with their files and reviews, many PRs per query"""
+        owner, repo = repository.full_name.split('/')
+        variables = github_graphql.pull_requests_variables(
+            owner, repo, state=state, sort=sort, direction=direction, first=per_page)
+        
+        while True:
+            data = self._graphql_request(github_graphql.PULL_REQUESTS_QUERY, variables, token=token)
+            connection = (data.get('repository') or {}).get('pullRequests') or {}
+            for node in connection.get('nodes') or []:
+                yield github_graphql.pr_node_to_rest(node)
+            
+            page_info = connection.get('pageInfo') or {}
+            if not page_info.get('hasNextPage'):
+                break
+            variables['after'] = page_info.get('endCursor')
+
+    @api.model
+    def _iter_pr_files_graphql(self, repository, pr_number, token=None, per_page=100):
+        """Iterate over files changed in PR using GraphQL"""
+        owner, repo = repository.full_name.split('/')
+        variables = {
+            'owner': owner,
+            'name': repo,
+            'number': int(pr_number),
+            'first': min(int(per_page), github_graphql.MAX_FILES_PER_PR),
+        }
+        
+        while True:
+            data = self._graphql_request(github_graphql.PR_FILES_QUERY, variables, token=token)
+            pull_request = (data.get('repository') or {}).get('pullRequest') or {}
+            connection = pull_request.get('files') or {}
+            for node in connection.get('nodes') or []:
+                yield github_graphql.file_node_to_rest(node)
+            
+            page_info = connection.get('pageInfo') or {}
+            if not page_info.get('hasNextPage'):
+                break
+            variables['after'] = page_info.get('endCursor')
+
+    @api.model
+    def iter_pull_requests(self, repository, state='open', token=None, per_page=100, sort=None, direction=None, api_mode=None):
+        """Iterate over all pull requests of a repository, page by page.
+
+        With the GraphQL API mode each PR also carries its changed ``files``
+        and ``reviews``, fetched in the same query.
+        """
+        if (api_mode or self._get_api_mode()) == 'graphql':
+            return self._iter_pull_requests_graphql(
+                repository, state=state, token=token, per_page=min(per_page, github_graphql.MAX_PRS_PER_QUERY),
+                sort=sort, direction=direction)
+        
+        owner, repo = repository.full_name.split('/')
+        params = {'state': state}
+        if sort:
+            params['sort'] = sort
+        if direction:
+            params['direction'] = direction
+        return self._paginate(
+            f'/repos/{owner}/{repo}/pulls',
+            params=params,
+            token=token,
+            per_page=per_page,
+        )
+
     @api.model
     def get_pull_requests(self, repository, state='open', token=None):
         """Get pull requests for a repository"""
         try:
-            owner, repo = repository.full_name.split('/')
-            result = self._api_request('GET', f'/repos/{owner}/{repo}/pulls?state={state}', token=token)
-            return result
+            return list(self.iter_pull_requests(repository, state=state, token=token))
         except Exception as e:
             _logger.error('Failed to get PRs for %s: %s', repository.full_name, e)
             return []
@@ -116,32 +427,233 @@ class GitHubService(models.Model):
             return None
 
     @api.model
-    def get_pr_diff(self, repository, pr_number, token=None):
-        """Get PR diff (patch)"""
-        try:
+    def _get_diff_cache(self):
+        """Get on-disk diff cache under the database filestore, or None when disabled"""
+        max_mb = int(self.env['ir.config_parameter'].sudo().get_param(
+            'odooium.diff_cache.max_mb', diff_cache.DEFAULT_MAX_MB))
+        if max_mb <= 0:
+            return None
+        return diff_cache.get_cache(self.env['ir.attachment']._filestore(), max_mb)
+
+    @api.model
+    def get_pr_diff_bounded(self, repository, pr_number, token=None, max_lines=None, max_bytes=None,
+                            base_sha=None, head_sha=None, include_globs=None, exclude_globs=None):
+        """Stream PR diff (patch) line by line up to a line and byte ceiling.
+
+        The download is aborted as soon as a ceiling is reached. Files not
+        matching the include/exclude globs are dropped while reading. Returns
+        the result of ``diff_parser.read_bounded`` or None on error. When the
+        base and head SHAs are given, the diff is fetched between those two
+        commits through the compare API rather than from the PR, whose head
+        may have moved since, and served from the on-disk diff cache.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        if max_lines is None:
+            max_lines = int(params.get_param('odooium.max_diff_lines', '5000'))
+        if max_bytes is None:
+            max_bytes = int(params.get_param('odooium.max_diff_bytes', DEFAULT_MAX_DIFF_BYTES))
+        
+        pinned = bool(base_sha and head_sha)
+        cache = self._get_diff_cache() if pinned else None
+        if cache:
+            cache_key = cache.make_key('diff', repository.full_name, base_sha, head_sha, max_lines, max_bytes,
+                                       '|'.join(include_globs or ()), '|'.join(exclude_globs or ()))
+            result = cache.get(cache_key)
+            if result is not None:
+                return result
+        
+        path_filter = diff_parser.make_path_filter(include_globs, exclude_globs)
+        if pinned:
+            # Same three-dot (merge base) diff as the PR's, but of exactly the cached SHAs
             owner, repo = repository.full_name.split('/')
+            url = f'{self._get_github_api_base()}/repos/{owner}/{repo}/compare/{base_sha}...{head_sha}'
+            result = self._download_diff(
+                url, f'PR #{pr_number} at {head_sha[:7]}', 'application/vnd.github.v3.diff', token=token,
+                max_lines=max_lines, max_bytes=max_bytes, path_filter=path_filter)
+        else:
+            result = self._download_pr_diff(
+                repository, pr_number, token=token, max_lines=max_lines, max_bytes=max_bytes,
+                path_filter=path_filter)
+        if cache and result is not None:
+            cache.put(cache_key, result)
+        return result
+
+    @api.model
+    def _download_pr_diff(self, repository, pr_number, token=None, max_lines=None, max_bytes=None, path_filter=None):
+        """Download PR diff, aborting once a ceiling is reached"""
+        owner, repo = repository.full_name.split('/')
+        url = f'{self._get_github_api_base()}/repos/{owner}/{repo}/pulls/{pr_number}'
+        return self._download_diff(url, f'PR #{pr_number}', 'application/vnd.github.v3.diff', token=token,
+                                   max_lines=max_lines, max_bytes=max_bytes, path_filter=path_filter)
+
+    @api.model
+    def _download_diff(self, url, label, accept, token=None, max_lines=None, max_bytes=None, path_filter=None):
+        """Stream a diff from the API, aborting once a ceiling is reached"""
+        response = None
+        try:
             headers = self._get_headers(token)
-            headers['Accept'] = 'application/vnd.github.v3.patch'
+            headers['Accept'] = accept
             
-            url = f'{self._get_github_api_base()}/repos/{owner}/{repo}/pulls/{pr_number}'
-            response = requests.get(url, headers=headers, timeout=60)
-            response.raise_for_status()
-            return response.text
+            response = self._http_request('GET', url, headers=headers, timeout=self._get_timeout(read_timeout=60), stream=True)
+            result = diff_parser.read_bounded(
+                response.iter_lines(chunk_size=DIFF_CHUNK_SIZE), max_lines=max_lines, max_bytes=max_bytes,
+                path_filter=path_filter)
+            if result['truncated']:
+                _logger.info('Diff of %s cut: %s', label, result['truncated_reason'])
+            return result
+        
+        except resilience.CircuitOpenError:
+            raise
         
         except Exception as e:
-            _logger.error('Failed to get PR diff for #%s: %s', pr_number, e)
+            _logger.error('Failed to get diff of %s: %s', label, e)
             return None
+        
+        finally:
+            if response is not None:
+                # Drops the rest of an aborted download
+                response.close()
 
     @api.model
-    def get_pr_files(self, repository, pr_number, token=None):
-        """Get files changed in PR"""
+    def get_compare_status(self, repository, base_sha, head_sha, token=None):
+        """Get how head relates to base ('ahead', 'behind', 'diverged', 'identical'), or None on error"""
+        cache = self._get_diff_cache()
+        if cache:
+            cache_key = cache.make_key('compare', repository.full_name, base_sha, head_sha)
+            status = cache.get(cache_key)
+            if status is not None:
+                return status
+        
         try:
             owner, repo = repository.full_name.split('/')
-            result = self._api_request('GET', f'/repos/{owner}/{repo}/pulls/{pr_number}/files', token=token)
-            return result
+            # One commit per page is enough, only the status is needed
+            result = self._api_request('GET', f'/repos/{owner}/{repo}/compare/{base_sha}...{head_sha}?per_page=1', token=token)
+        except resilience.CircuitOpenError:
+            raise
+        except Exception as e:
+            _logger.warning('Failed to compare %s...%s of %s: %s', base_sha, head_sha, repository.full_name, e)
+            return None
+        
+        status = result.get('status')
+        if cache and status:
+            cache.put(cache_key, status)
+        return status
+
+    @api.model
+    def get_compare_diff_bounded(self, repository, base_sha, head_sha, token=None, max_lines=None, max_bytes=None,
+                                 include_globs=None, exclude_globs=None):
+        """Stream the diff between two commits, like ``get_pr_diff_bounded``.
+
+        Used to review only the commits pushed since the last review.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        if max_lines is None:
+            max_lines = int(params.get_param('odooium.max_diff_lines', '5000'))
+        if max_bytes is None:
+            max_bytes = int(params.get_param('odooium.max_diff_bytes', DEFAULT_MAX_DIFF_BYTES))
+        
+        cache = self._get_diff_cache()
+        if cache:
+            cache_key = cache.make_key('compare_diff', repository.full_name, base_sha, head_sha, max_lines, max_bytes,
+                                       '|'.join(include_globs or ()), '|'.join(exclude_globs or ()))
+            result = cache.get(cache_key)
+            if result is not None:
+                return result
+        
+        owner, repo = repository.full_name.split('/')
+        url = f'{self._get_github_api_base()}/repos/{owner}/{repo}/compare/{base_sha}...{head_sha}'
+        result = self._download_diff(
+            url, f'{repository.full_name} {base_sha[:7]}...{head_sha[:7]}', 'application/vnd.github.v3.diff',
+            token=token, max_lines=max_lines, max_bytes=max_bytes,
+            path_filter=diff_parser.make_path_filter(include_globs, exclude_globs))
+        if cache and result is not None:
+            cache.put(cache_key, result)
+        return result
+
+    @api.model
+    def get_pr_diff(self, repository, pr_number, token=None):
+        """Get PR diff (patch)"""
+        result = self.get_pr_diff_bounded(repository, pr_number, token=token)
+        return result['diff'] if result else None
+
+    @api.model
+    def get_file_content(self, repository, path, ref, token=None, max_bytes=None):
+        """Get the content of a file at a commit, or None on error or above ``max_bytes``"""
+        cache = self._get_diff_cache()
+        if cache:
+            cache_key = cache.make_key('file', repository.full_name, ref, path)
+            content = cache.get(cache_key)
+            if content is not None:
+                return content
+        
+        try:
+            owner, repo = repository.full_name.split('/')
+            headers = self._get_headers(token)
+            headers['Accept'] = 'application/vnd.github.raw'
+            url = f'{self._get_github_api_base()}/repos/{owner}/{repo}/contents/{quote(path)}?ref={ref}'
+            response = self._http_request('GET', url, headers=headers, timeout=self._get_timeout())
+        except resilience.CircuitOpenError:
+            raise
+        except Exception as e:
+            _logger.warning('Failed to get %s@%s of %s: %s', path, ref[:7], repository.full_name, e)
+            return None
+        
+        if max_bytes and len(response.content) > max_bytes:
+            return None
+        content = response.content.decode('utf-8', errors='replace')
+        if cache:
+            cache.put(cache_key, content)
+        return content
+
+    @api.model
+    def iter_pr_files(self, repository, pr_number, token=None, per_page=100, api_mode=None):
+        """Iterate over all files changed in PR, page by page"""
+        if (api_mode or self._get_api_mode()) == 'graphql':
+            return self._iter_pr_files_graphql(repository, pr_number, token=token, per_page=per_page)
+        
+        owner, repo = repository.full_name.split('/')
+        return self._paginate(f'/repos/{owner}/{repo}/pulls/{pr_number}/files', token=token, per_page=per_page)
+
+    @api.model
+    def _pr_files_cache_key(self, cache, repository, base_sha, head_sha, api_mode):
+        # GraphQL file lists carry no patches, keep them apart from REST ones
+        kind = 'graphql_files' if api_mode == 'graphql' else 'files'
+        return cache.make_key(kind, repository.full_name, base_sha, head_sha)
+
+    @api.model
+    def _cache_pr_files(self, repository, pr_data):
+        """Keep the file list of an open PR fetched along with it by GraphQL, sparing a later round trip"""
+        head_sha = pr_data.get('head', {}).get('sha')
+        if pr_data.get('state') != 'open' or not head_sha or not pr_data.get('files_complete'):
+            return
+        cache = self._get_diff_cache()
+        if cache:
+            base_sha = pr_data.get('base', {}).get('sha')
+            cache.put(self._pr_files_cache_key(cache, repository, base_sha, head_sha, 'graphql'), pr_data['files'])
+
+    @api.model
+    def get_pr_files(self, repository, pr_number, token=None, base_sha=None, head_sha=None, api_mode=None):
+        """Get files changed in PR.
+
+        Files fetched through GraphQL have no ``patch``.
+        """
+        api_mode = api_mode or self._get_api_mode()
+        cache = self._get_diff_cache() if head_sha else None
+        if cache:
+            cache_key = self._pr_files_cache_key(cache, repository, base_sha, head_sha, api_mode)
+            files = cache.get(cache_key)
+            if files is not None:
+                return files
+        
+        try:
+            files = list(self.iter_pr_files(repository, pr_number, token=token, api_mode=api_mode))
         except Exception as e:
             _logger.error('Failed to get PR files for #%s: %s', pr_number, e)
             return []
+        
+        if cache:
+            cache.put(cache_key, files)
+        return files
 
     @api.model
     def create_webhook(self, repository):
@@ -179,28 +691,154 @@ class GitHubService(models.Model):
             }
 
     @api.model
-    def post_review_comment(self, repository, pr_number, summary, comments, token=None):
-        """Post review comment to GitHub PR"""
+    def _get_commentable_lines(self, repository, pr_number, token=None, base_sha=None, head_sha=None):
+        """Map each changed file of a PR to the lines that accept inline comments.
+
+        GraphQL file lists have no patches: they are taken from the PR diff,
+        fetched with the review's arguments so that it comes from the diff cache.
+        """
+        api_mode = self._get_api_mode()
+        files = self.get_pr_files(
+            repository, pr_number, token=token, base_sha=base_sha, head_sha=head_sha, api_mode=api_mode)
+        patches = {}
+        if api_mode == 'graphql' and files:
+            include_globs, exclude_globs = repository._get_review_globs()
+            diff_result = self.get_pr_diff_bounded(
+                repository, pr_number, token=token, base_sha=base_sha, head_sha=head_sha,
+                include_globs=include_globs, exclude_globs=exclude_globs)
+            patches = diff_parser.file_patches(diff_result['diff']) if diff_result else {}
+        
+        commentable = {}
+        for pr_file in files:
+            filename = pr_file.get('filename')
+            commentable[filename] = diff_parser.commentable_lines(pr_file.get('patch') or patches.get(filename))
+        return commentable
+
+    @api.model
+    def _find_summary_comment(self, repository, pr_number, token=None):
+        """Find id of Odooium's previous summary comment on a PR"""
+        owner, repo = repository.full_name.split('/')
+        for comment in self._paginate(f'/repos/{owner}/{repo}/issues/{pr_number}/comments', token=token):
+            if SUMMARY_MARKER in (comment.get('body') or ''):
+                return comment.get('id')
+        return None
+
+    @api.model
+    def _upsert_summary_comment(self, repository, pr_number, body, token=None, summary_comment_id=None):
+        """Edit Odooium's summary comment in place, or create it"""
+        owner, repo = repository.full_name.split('/')
+        if not summary_comment_id:
+            summary_comment_id = self._find_summary_comment(repository, pr_number, token=token)
+        
+        if summary_comment_id:
+            try:
+                result = self._api_request(
+                    'PATCH', f'/repos/{owner}/{repo}/issues/comments/{summary_comment_id}',
+                    data={'body': body}, token=token)
+                return result.get('id')
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code != 404:
+                    raise
+                # Comment was deleted on GitHub, post a new one
+        
+        result = self._api_request(
+            'POST', f'/repos/{owner}/{repo}/issues/{pr_number}/comments', data={'body': body}, token=token)
+        return result.get('id')
+
+    @api.model
+    def _format_inline_comment(self, comment):
+        """Format a finding as inline review comment body"""
+        body = f"**{(comment.get('severity') or 'info').upper()}**"
+        if comment.get('rule'):
+            body += f" ({comment.get('rule')})"
+        return f"{body}: {comment.get('comment')}"
+
+    @api.model
+    def post_review_comment(self, repository, pr_number, summary, comments, token=None,
+                            commit_sha=None, summary_comment_id=None, update_summary=True, base_sha=None):
+        """Post review to GitHub PR.
+
+        Findings that land on a changed line are sent as inline comments of a
+        single ``pulls/{n}/reviews`` call; the others are listed in the summary
+        comment, which is edited in place on re-reviews when ``update_summary``
+        is set.
+
+        Returns the summary ``comment_id``, the ``review_id`` and
+        ``comment_ids``, the inline comment id of each finding (or None).
+        """
         try:
             owner, repo = repository.full_name.split('/')
-            headers = self._get_headers(token)
-            
-            # Post PR comment (not inline review for now)
-            comment_body = f"## 🐰 Odooium AI Review\n\n{summary}\n\n"
+            comment_ids = [None] * len(comments)
+            review_id = None
             
+            inline = []
+            remaining = []
             if comments:
+                commentable = self._get_commentable_lines(
+                    repository, pr_number, token=token, base_sha=base_sha, head_sha=commit_sha)
+                for index, comment in enumerate(comments):
+                    try:
+                        line = int(comment.get('line_number') or 0)
+                    except (TypeError, ValueError):
+                        line = 0
+                    if line and line in commentable.get(comment.get('file_path'), ()):
+                        inline.append((index, dict(comment, line_number=line)))
+                    else:
+                        remaining.append(comment)
+            
+            if inline:
+                review_data = {
+                    'event': 'COMMENT',
+                    'body': f'🐰 Odooium AI Review: {len(inline)} inline comment(s)',
+                    'comments': [{
+                        'path': comment.get('file_path'),
+                        'line': comment.get('line_number'),
+                        'side': 'RIGHT',
+                        'body': self._format_inline_comment(comment),
+                    } for index, comment in inline],
+                }
+                if commit_sha:
+                    review_data['commit_id'] = commit_sha
+                review = self._api_request(
+                    'POST', f'/repos/{owner}/{repo}/pulls/{pr_number}/reviews', data=review_data, token=token)
+                review_id = review.get('id')
+                
+                # Match created comments back to findings by (path, line), in order
+                posted = {}
+                for posted_comment in self._paginate(
+                        f'/repos/{owner}/{repo}/pulls/{pr_number}/reviews/{review_id}/comments', token=token):
+                    key = (posted_comment.get('path'), posted_comment.get('line'))
+                    posted.setdefault(key, []).append(posted_comment.get('id'))
+                for index, comment in inline:
+                    ids = posted.get((comment.get('file_path'), comment.get('line_number')))
+                    if ids:
+                        comment_ids[index] = ids.pop(0)
+            
+            comment_body = f"{SUMMARY_MARKER}\n## 🐰 Odooium AI Review\n\n{summary}\n\n"
+            
+            if inline:
+                comment_body += f"\n_{len(inline)} issue(s) posted as inline comments._\n"
+            
+            if remaining:
                 comment_body += "\n### Issues Found:\n\n"
-                for comment in comments:
+                for comment in remaining:
                     severity_icon = comment.get('severity', 'info')
                     comment_body += f"- **{severity_icon.upper()}**: `{comment.get('file_path')}`:{comment.get('line_number')} - {comment.get('comment')}\n"
             
-            url = f'{self._get_github_api_base()}/repos/{owner}/{repo}/issues/{pr_number}/comments'
-            response = requests.post(url, headers=headers, json={'body': comment_body}, timeout=30)
-            response.raise_for_status()
+            if update_summary:
+                summary_id = self._upsert_summary_comment(
+                    repository, pr_number, comment_body, token=token, summary_comment_id=summary_comment_id)
+            else:
+                result = self._api_request(
+                    'POST', f'/repos/{owner}/{repo}/issues/{pr_number}/comments',
+                    data={'body': comment_body}, token=token)
+                summary_id = result.get('id')
             
             return {
                 'success': True,
-                'comment_id': response.json().get('id'),
+                'comment_id': summary_id,
+                'review_id': review_id,
+                'comment_ids': comment_ids,
                 'message': 'Review comment posted successfully'
             }
         except Exception as e:
@@ -211,72 +849,179 @@ class GitHubService(models.Model):
             }
 
     @api.model
-    def sync_repository_prs(self, repository):
-        """Sync all PRs from GitHub to Odoo"""
+    def _github_datetime(self, value):
+        """Convert GitHub ISO 8601 timestamp to Odoo datetime string"""
+        if not value:
+            return False
+        return value.replace('T', ' ').rstrip('Z')[:19]
+
+    @api.model
+    def _prepare_pr_vals(self, pr_data, repository):
+        """Build pull request values from GitHub PR payload"""
+        # Determine state
+        state = 'open'
+        if pr_data.get('closed_at'):
+            state = 'closed'
+        elif pr_data.get('merged_at'):
+            state = 'merged'
+        
+        vals = {
+            'github_id': pr_data.get('id'),
+            'number': pr_data.get('number'),
+            'title': pr_data.get('title'),
+            'description': pr_data.get('body'),
+            'author': pr_data.get('user', {}).get('login'),
+            'author_github_id': pr_data.get('user', {}).get('id'),
+            'author_avatar': pr_data.get('user', {}).get('avatar_url'),
+            'branch': pr_data.get('head', {}).get('ref'),
+            'base_branch': pr_data.get('base', {}).get('ref'),
+            'commit_sha': pr_data.get('head', {}).get('sha'),
+            'base_commit_sha': pr_data.get('base', {}).get('sha'),
+            'state': state,
+            'repository_id': repository.id,
+            'created_at': self._github_datetime(pr_data.get('created_at')),
+            'updated_at': self._github_datetime(pr_data.get('updated_at')),
+        }
+        
+        if state in ['closed', 'merged']:
+            vals['closed_at'] = self._github_datetime(pr_data.get('closed_at') or pr_data.get('merged_at'))
+        
+        return vals
+
+    @api.model
+    def _sync_value_changed(self, current, new):
+        """Check whether a synced value differs from the stored one"""
+        if isinstance(current, datetime):
+            current = fields.Datetime.to_string(current)
+        return (current or False) != (new or False)
+
+    @api.model
+    def _upsert_pr_batch(self, vals_list, existing_ids):
+        """Create new PRs in one call and write only changed fields of known ones.
+
+        ``existing_ids`` maps GitHub PR id to record id and is updated in place.
+        Returns the created records and the number of updated ones.
+        """
+        PullRequest = self.env['odooium.pull_request'].with_context(
+            tracking_disable=True, mail_create_nolog=True)
+        
+        to_create = []
+        to_update = {}
+        for vals in vals_list:
+            pr_id = existing_ids.get(vals['github_id'])
+            if pr_id:
+                to_update[pr_id] = vals
+            else:
+                to_create.append(vals)
+        
+        updated_count = 0
+        if to_update:
+            for current in PullRequest.browse(list(to_update)).read(SYNC_COMPARED_FIELDS):
+                vals = to_update[current['id']]
+                changes = {
+                    name: value for name, value in vals.items()
+                    if name in SYNC_COMPARED_FIELDS and self._sync_value_changed(current.get(name), value)
+                }
+                if changes:
+                    PullRequest.browse(current['id']).write(changes)
+                    updated_count += 1
+        
+        new_prs = PullRequest.create(to_create) if to_create else PullRequest.browse()
+        for vals, pr in zip(to_create, new_prs):
+            existing_ids[vals['github_id']] = pr.id
+        
+        return new_prs, updated_count
+
+    @api.model
+    def _after_prs_synced(self, new_prs, repository):
+        """Queue task creation and AI reviews for newly synced PRs as batch jobs"""
+        if not new_prs:
+            return
+        
+        if repository.create_tasks:
+            self.with_delay(description=f'Create tasks for {len(new_prs)} PRs of {repository.full_name}')._create_tasks_for_prs(new_prs, repository)
+        
+        if repository.auto_review_enabled:
+            open_prs = new_prs.filtered(lambda pr: pr.state == 'open')
+            if open_prs:
+                open_prs.with_delay(description=f'Start AI reviews for {len(open_prs)} PRs of {repository.full_name}')._start_ai_review_batch()
+
+    @api.model
+    def sync_repository_prs(self, repository, incremental=False):
+        """Sync PRs from GitHub to Odoo.
+
+        In incremental mode PRs are requested most recently updated first and
+        paging stops once they are older than the repository's last sync, so
+        only the delta since then is processed. In the GraphQL API mode the
+        file lists of open PRs go to the diff cache for their reviews.
+        """
+        synced_count = 0
+        updated_count = 0
+        new_prs = self.env['odooium.pull_request'].browse()
+        sync_started_at = fields.Datetime.now()
+        watermark = None
+        if incremental and repository.last_sync_at:
+            watermark = fields.Datetime.to_string(repository.last_sync_at - SYNC_WATERMARK_OVERLAP)
         try:
-            github_prs = self.get_pull_requests(repository, state='all', token=repository.access_token)
+            # Load the github_id -> id map once instead of one search per PR
+            existing_ids = {
+                row['github_id']: row['id']
+                for row in self.env['odooium.pull_request'].with_context(active_test=False).search_read(
+                    [('repository_id', '=', repository.id)], ['github_id'])
+            }
             
-            synced_count = 0
+            # Stream pages instead of loading the full PR history at once
+            if watermark:
+                github_prs = self.iter_pull_requests(
+                    repository, state='all', token=repository.access_token, sort='updated', direction='desc')
+            else:
+                github_prs = self.iter_pull_requests(repository, state='all', token=repository.access_token)
+            
+            batch = []
             for pr_data in github_prs:
-                pr_github_id = pr_data.get('id')
-                pr_number = pr_data.get('number')
-                
-                # Find existing PR
-                existing_pr = self.env['odooium.pull_request'].search([
-                    ('github_id', '=', pr_github_id),
-                    ('repository_id', '=', repository.id)
-                ], limit=1)
-                
-                # Determine state
-                state = 'open'
-                if pr_data.get('closed_at'):
-                    state = 'closed'
-                elif pr_data.get('merged_at'):
-                    state = 'merged'
-                
-                vals = {
-                    'github_id': pr_github_id,
-                    'number': pr_number,
-                    'title': pr_data.get('title'),
-                    'description': pr_data.get('body'),
-                    'author': pr_data.get('user', {}).get('login'),
-                    'author_github_id': pr_data.get('user', {}).get('id'),
-                    'author_avatar': pr_data.get('user', {}).get('avatar_url'),
-                    'branch': pr_data.get('head', {}).get('ref'),
-                    'base_branch': pr_data.get('base', {}).get('ref'),
-                    'commit_sha': pr_data.get('head', {}).get('sha'),
-                    'state': state,
-                    'repository_id': repository.id,
-                    'created_at': pr_data.get('created_at'),
-                    'updated_at': pr_data.get('updated_at'),
-                }
-                
-                if state in ['closed', 'merged']:
-                    vals['closed_at'] = pr_data.get('closed_at') or pr_data.get('merged_at')
-                
-                if existing_pr:
-                    existing_pr.write(vals)
-                else:
-                    new_pr = self.env['odooium.pull_request'].create(vals)
-                    
-                    # Create Odoo task if enabled
-                    if repository.create_tasks:
-                        self._create_task_for_pr(new_pr, repository)
-                    
-                    # Start AI review if enabled
-                    if repository.auto_review_enabled and state == 'open':
-                        new_pr.action_start_ai_review()
-                    
-                    synced_count += 1
-            
-            repository.write({'last_sync_at': fields.Datetime.now()})
+                vals = self._prepare_pr_vals(pr_data, repository)
+                if watermark and vals['updated_at'] and vals['updated_at'] < watermark:
+                    # Everything from here on was already synced
+                    github_prs.close()
+                    break
+                if 'files' in pr_data:
+                    self._cache_pr_files(repository, pr_data)
+                batch.append(vals)
+                if len(batch) >= SYNC_BATCH_SIZE:
+                    created, updated = self._upsert_pr_batch(batch, existing_ids)
+                    new_prs |= created
+                    synced_count += len(created)
+                    updated_count += updated
+                    batch = []
+            
+            if batch:
+                created, updated = self._upsert_pr_batch(batch, existing_ids)
+                new_prs |= created
+                synced_count += len(created)
+                updated_count += updated
+            
+            repository.write({'last_sync_at': sync_started_at})
+            self._after_prs_synced(new_prs, repository)
             
             return {
                 'success': True,
                 'synced': synced_count,
+                'updated': updated_count,
                 'message': f'Synced {synced_count} PRs'
             }
         
+        except github_ratelimit.RateLimitExceeded as e:
+            # Keep what was synced so far, the next sync picks up the rest
+            _logger.warning('PR sync for %s paused: %s', repository.full_name, e)
+            self._after_prs_synced(new_prs, repository)
+            return {
+                'success': False,
+                'synced': synced_count,
+                'updated': updated_count,
+                'retry_at': e.retry_at,
+                'message': str(e)
+            }
+        
         except Exception as e:
             _logger.error('Failed to sync PRs: %s', e)
             return {
@@ -284,6 +1029,70 @@ class GitHubService(models.Model):
                 'message': str(e)
             }
 
+    @api.model
+    def sync_repositories_concurrent(self, repositories, incremental=False):
+        """Sync PRs of many repositories at once.
+
+        PR pages (and, for open PRs, file lists into the diff cache) are fetched
+        concurrently by an asyncio HTTP client under a global concurrency cap,
+        while this thread upserts them through the ORM and commits each batch.
+        Wall time is bounded by the slowest repository instead of their sum.
+        Falls back to one sync after the other when aiohttp is not installed.
+        """
+        if not github_async.is_available():
+            _logger.warning('aiohttp is not installed, syncing %s repositories sequentially', len(repositories))
+            return {repo.id: self.sync_repository_prs(repo, incremental=incremental) for repo in repositories}
+        
+        params = self.env['ir.config_parameter'].sudo()
+        concurrency = int(params.get_param('odooium.github.sync_concurrency', github_async.DEFAULT_CONCURRENCY))
+        reserve, max_retries, max_wait = self._get_rate_limit_settings()
+        settings = (concurrency, 100, reserve, max_retries, max_wait)
+        sync_started_at = fields.Datetime.now()
+        
+        specs = []
+        for repo in repositories:
+            watermark = None
+            if incremental and repo.last_sync_at:
+                watermark = (repo.last_sync_at - SYNC_WATERMARK_OVERLAP).strftime('%Y-%m-%dT%H:%M:%SZ')
+            specs.append(github_async.RepositorySpec(
+                repo.id, repo.full_name, token=repo.access_token, watermark=watermark, prefetch_files=True))
+        
+        # One query for the github_id -> id maps of every repository
+        existing_ids = {repo.id: {} for repo in repositories}
+        for row in self.env['odooium.pull_request'].with_context(active_test=False).search_read(
+                [('repository_id', 'in', repositories.ids)], ['github_id', 'repository_id']):
+            existing_ids[row['repository_id'][0]][row['github_id']] = row['id']
+        
+        new_prs = {repo.id: self.env['odooium.pull_request'].browse() for repo in repositories}
+        results = {repo.id: {'success': False, 'synced': 0, 'updated': 0} for repo in repositories}
+        repos_by_id = {repo.id: repo for repo in repositories}
+        
+        events = github_async.iter_concurrent(
+            specs, self._get_github_api_base(), self._get_headers, settings, self._get_timeout(),
+            file_cache=self._get_diff_cache(), breaker=self._get_breaker('github.rest'))
+        for kind, repo_id, payload in events:
+            repository = repos_by_id[repo_id]
+            result = results[repo_id]
+            if kind == 'page':
+                for start in range(0, len(payload), SYNC_BATCH_SIZE):
+                    vals_list = [self._prepare_pr_vals(pr_data, repository)
+                                 for pr_data in payload[start:start + SYNC_BATCH_SIZE]]
+                    created, updated = self._upsert_pr_batch(vals_list, existing_ids[repo_id])
+                    new_prs[repo_id] |= created
+                    result['synced'] += len(created)
+                    result['updated'] += updated
+                    self.env.cr.commit()
+            elif kind == 'done' and not result.get('message'):
+                if payload:
+                    result['message'] = payload
+                else:
+                    repository.write({'last_sync_at': sync_started_at})
+                    result.update(success=True, message=f"Synced {result['synced']} PRs")
+                self._after_prs_synced(new_prs[repo_id], repository)
+                self.env.cr.commit()
+        
+        return results
+
     @api.model
     def _create_task_for_pr(self, pr, repository):
         """Create Odoo task for PR"""
@@ -321,6 +1130,38 @@ class GitHubService(models.Model):
         except Exception as e:
             _logger.error('Failed to create task for PR %s: %s', pr.number, e)
 
+    @api.model
+    def _create_tasks_for_prs(self, prs, repository):
+        """Create Odoo tasks for many PRs at once (queued job)"""
+        prs = prs.filtered(lambda pr: not pr.task_id)
+        if not repository.project_id or not prs:
+            return
+        
+        # Get default stage
+        default_stage = self.env['project.task.type'].search([
+            ('project_ids', 'in', repository.project_id.id),
+            ('sequence', '=', 1)
+        ], limit=1)
+        
+        # Map GitHub authors to Odoo users in one query
+        github_users = self.env['odooium.github_user'].search([
+            ('github_id', 'in', prs.mapped('author_github_id'))
+        ])
+        assignees = {user.github_id: user.odoo_user_id.id for user in github_users if user.odoo_user_id}
+        
+        tasks = self.env['project.task'].create([{
+            'name': f'[PR #{pr.number}] {pr.title}',
+            'project_id': repository.project_id.id,
+            'stage_id': default_stage.id if default_stage else None,
+            'description': pr.description,
+            'user_id': assignees.get(pr.author_github_id),
+        } for pr in prs])
+        
+        for pr, task in zip(prs, tasks):
+            pr.write({'task_id': task.id, 'project_id': repository.project_id.id})
+        
+        _logger.info('Created %s Odoo tasks for PRs of %s', len(tasks), repository.full_name)
+
     @api.model
     def test_webhook(self, repository):
         """Test webhook configuration"""
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import logging
+import queue
+import threading
+import time
+
+from . import resilience
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILE = 95
+# Hedge delay until enough latencies of a model were seen
+DEFAULT_DELAY = 30.0
+# Never hedge sooner than this, whatever the percentile says
+MIN_DELAY = 2.0
+MIN_SAMPLES = 20
+WINDOW = 200
+
+# Interval at which streamed findings are relayed to the calling thread
+POLL_INTERVAL = 0.2
+# Time given to a cancelled call to stop and report the tokens it used
+LOSER_GRACE = 2.0
+
+PRIMARY = 'primary'
+SECONDARY = 'secondary'
+
+
+class HedgeCancelled(resilience.CallCancelled):
+    """Raised inside a call whose answer is no longer needed, with the token usage it had incurred"""
+
+    def __init__(self, usage=None):
+        super().__init__()
+        self.usage = usage or {}
+
+
+class Cancellation(threading.Event):
+    """Cancel event of one call.
+
+    Callbacks registered with ``on_cancel`` run as soon as it is set, from
+    the setting thread: a call blocked reading a stalled stream registers
+    the stream's ``close`` to be woken up.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    def on_cancel(self, callback):
+        with self._callbacks_lock:
+            if not self.is_set():
+                self._callbacks.append(callback)
+                return
+        self._run(callback)
+
+    def set(self):
+        with self._callbacks_lock:
+            super().set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run(callback)
+
+    @staticmethod
+    def _run(callback):
+        try:
+            callback()
+        except Exception as e:
+            _logger.debug('Could not close a cancelled call: %s', e)
+
+
+class LatencyTracker(object):
+    """Recent completion latencies per model, with hedging counters"""
+
+    def __init__(self, window=WINDOW):
+        self._window = window
+        self._samples = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, model, latency):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self._window)).append(latency)
+
+    def count(self, model, event):
+        with self._lock:
+            counters = self._counters.setdefault(model, {'hedged': 0, 'hedge_won': 0, 'fallback': 0})
+            counters[event] += 1
+
+    def percentile(self, model, percentile):
+        """Latency within which ``percentile`` percent of recent calls answered, or None without enough samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(model) or ())
+        if len(samples) < MIN_SAMPLES:
+            return None
+        return samples[min(int(round(percentile / 100.0 * (len(samples) - 1))), len(samples) - 1)]
+
+    def stats(self):
+        with self._lock:
+            models = set(self._samples) | set(self._counters)
+            counters = {
+                model: dict({'hedged': 0, 'hedge_won': 0, 'fallback': 0}, **self._counters.get(model, {}))
+                for model in models
+            }
+            samples = {model: len(self._samples.get(model) or ()) for model in models}
+        return {
+            model: dict(
+                counters[model],
+                samples=samples[model],
+                p50=self.percentile(model, 50),
+                p95=self.percentile(model, 95),
+            )
+            for model in models
+        }
+
+
+_tracker = LatencyTracker()
+
+
+def get_tracker():
+    return _tracker
+
+
+def hedge_delay(model, percentile=DEFAULT_PERCENTILE, default=DEFAULT_DELAY):
+    """Seconds to wait for ``model`` before hedging: its recent latency percentile"""
+    latency = _tracker.percentile(model, percentile)
+    return max(latency if latency is not None else default, MIN_DELAY)
+
+
+def hedged_call(primary, secondary, prompt, emit=None, hedge_after=None, is_valid=None, models=(None, None)):
+    """Send a prompt through ``primary``, hedged by and falling back to ``secondary``.
+
+    Both are completion calls taking (prompt, emit, cancel). The secondary
+    is started as soon as the primary fails or gives an invalid answer, or,
+    with ``hedge_after``, once the primary has not answered within that many
+    seconds. The first valid answer wins and the loser's ``cancel``
+    Cancellation is set, running the closers it registered; it should then
+    stop by raising HedgeCancelled with the usage it had incurred. The
+    loser's latency is recorded as the time it had run when it lost, a lower
+    bound of its real latency. Only the primary's findings are passed to
+    ``emit``, in the calling thread. Without any valid answer an invalid one
+    is returned, or else the primary's error is raised.
+
+    The tokens spent on answers that were not returned (a cancelled loser,
+    an invalid answer) are listed in the result's ``discarded_usage``, each
+    with its ``model``, so that they are billed too.
+    """
+    primary_model, secondary_model = models
+    model_of = {PRIMARY: primary_model, SECONDARY: secondary_model}
+    findings = queue.Queue()
+    cancelled = {PRIMARY: Cancellation(), SECONDARY: Cancellation()}
+    discarded = []
+    started = {}
+    settled = set()
+    settled_lock = threading.Lock()
+
+    def settle(name, latency):
+        # One latency sample per call, whether it answered or was cut short
+        with settled_lock:
+            if name in settled:
+                return
+            settled.add(name)
+        _tracker.record(model_of[name], latency)
+
+    def run(name, call):
+        def relay(finding):
+            if cancelled[name].is_set():
+                raise HedgeCancelled()
+            if name == PRIMARY and emit:
+                findings.put(finding)
+
+        try:
+            result = call(prompt, relay, cancelled[name])
+        except HedgeCancelled:
+            settle(name, time.monotonic() - started[name])
+            raise
+        settle(name, result.get('latency') or time.monotonic() - started[name])
+        result['requested_model'] = model_of[name]
+        return result
+
+    def submit(name, call):
+        started[name] = time.monotonic()
+        return executor.submit(run, name, call)
+
+    def deliver():
+        while True:
+            try:
+                finding = findings.get_nowait()
+            except queue.Empty:
+                return
+            emit(finding)
+
+    def discard(name, usage):
+        tokens = {key: value for key, value in (usage or {}).items() if key.endswith('_tokens')}
+        if tokens:
+            discarded.append(dict(tokens, model=model_of[name]))
+
+    def stop_losers(futures):
+        """Cancel the calls still running and collect the usage they report"""
+        for name in futures.values():
+            cancelled[name].set()
+            settle(name, time.monotonic() - started[name])
+        done, pending = wait(list(futures), timeout=LOSER_GRACE)
+        for future in done:
+            try:
+                discard(futures[future], future.result())
+            except HedgeCancelled as e:
+                discard(futures[future], e.usage)
+            except Exception:
+                pass
+        for future in pending:
+            _logger.warning('Cancelled %s request has not stopped, its token usage is not counted',
+                            model_of[futures[future]])
+
+    def finish(result):
+        result['discarded_usage'] = discarded
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        futures = {submit(PRIMARY, primary): PRIMARY}
+        deadline = time.monotonic() + hedge_after if hedge_after is not None else None
+        launched = False
+        reason = None
+        errors = {}
+        invalid = {}
+        while futures:
+            timeout = POLL_INTERVAL if emit else None
+            if deadline is not None and not launched:
+                remaining = max(deadline - time.monotonic(), 0)
+                timeout = min(timeout, remaining) if timeout is not None else remaining
+            done, _pending = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+            if emit:
+                deliver()
+
+            for future in done:
+                name = futures.pop(future)
+                try:
+                    result = future.result()
+                except HedgeCancelled:
+                    continue
+                except Exception as e:
+                    errors[name] = e
+                    continue
+                if is_valid is not None and not is_valid(result):
+                    invalid[name] = result
+                    continue
+                stop_losers(futures)
+                for other, answer in invalid.items():
+                    discard(other, answer)
+                if name == SECONDARY:
+                    if reason == 'hedged':
+                        _tracker.count(primary_model, 'hedge_won')
+                    _logger.info('%s answered instead of %s (%s)', secondary_model, primary_model, reason)
+                return finish(result)
+
+            if not launched and (errors or invalid or (deadline is not None and time.monotonic() >= deadline)):
+                launched = True
+                if errors or invalid:
+                    reason = 'fallback'
+                    _logger.warning('%s failed (%s), falling back to %s', primary_model,
+                                    errors.get(PRIMARY) or 'invalid answer', secondary_model)
+                else:
+                    reason = 'hedged'
+                    _logger.info('%s has not answered within %.1fs, hedging with %s',
+                                 primary_model, hedge_after, secondary_model)
+                _tracker.count(primary_model, reason)
+                futures[submit(SECONDARY, secondary)] = SECONDARY
+    finally:
+        executor.shutdown(wait=False)
+
+    if invalid:
+        name = PRIMARY if PRIMARY in invalid else SECONDARY
+        for other, answer in invalid.items():
+            if other != name:
+                discard(other, answer)
+        return finish(invalid[name])
+    raise errors.get(PRIMARY) or errors[SECONDARY]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from fnmatch import fnmatch
+import re
+
+SMALL = 'small'
+STANDARD = 'standard'
+STRONG = 'strong'
+
+DEFAULT_TRIVIAL_LINES = 10
+DEFAULT_LARGE_LINES = 400
+
+# Files a small model reviews just as well
+LOW_RISK_GLOBS = (
+    '*.md', '*.rst', '*.txt', '*.po', '*.pot', '*.cfg', '*.ini', '*.toml',
+    '*.png', '*.jpg', '*.svg', '*.gif', '*.ico',
+    'LICENSE*', 'CHANGELOG*', '*/i18n/*', 'i18n/*', '.github/*', '.gitignore',
+)
+
+# Files where mistakes open security holes
+SENSITIVE_GLOBS = (
+    'controllers/*.py', '*/controllers/*.py',
+    '*ir.model.access.csv', 'security/*', '*/security/*',
+    '__manifest__.py', '*/__manifest__.py',
+)
+
+# Added code worth the strongest model: raw SQL, privilege escalation,
+# public routes, dynamic evaluation
+RISKY_CODE_RE = re.compile(
+    r'\bcr\.execute\(|\bSQL\(|\.sudo\(|auth\s*=\s*[\'"](?:public|none)[\'"]|csrf\s*=\s*False'
+    r'|\bsafe_eval\(|\beval\(|\bexec\(|\bsubprocess\b|\bpickle\.loads?\(|\bos\.system\('
+)
+
+
+def changed_lines(body):
+    """Count added and removed lines of a hunk"""
+    return sum(
+        1 for line in body.splitlines()
+        if line[:1] in ('+', '-') and not line.startswith(('+++', '---'))
+    )
+
+
+def added_code(body):
+    return '\n'.join(line[1:] for line in body.splitlines() if line.startswith('+') and not line.startswith('+++'))
+
+
+def _matches(path, globs):
+    return any(fnmatch(path, pattern) for pattern in globs)
+
+
+def classify_file(path, bodies, diff_changed, trivial_lines=DEFAULT_TRIVIAL_LINES,
+                  large_lines=DEFAULT_LARGE_LINES, history_risky=False):
+    """Pick the model tier of one changed file; returns (tier, reason)"""
+    if not path:
+        return STANDARD, 'no file'
+    if _matches(path, SENSITIVE_GLOBS):
+        return STRONG, 'security sensitive file'
+    if any(RISKY_CODE_RE.search(added_code(body)) for body in bodies):
+        return STRONG, 'risky code (SQL, sudo, public route or eval)'
+    if _matches(path, LOW_RISK_GLOBS):
+        return SMALL, 'documentation or data file'
+
+    file_changed = sum(changed_lines(body) for body in bodies)
+    if file_changed >= large_lines:
+        return STRONG, '%s changed lines' % file_changed
+    if history_risky:
+        return STRONG, 'recent reviews found serious issues'
+    if diff_changed <= trivial_lines:
+        return SMALL, 'trivial change (%s lines)' % diff_changed
+    return STANDARD, 'regular change'
+
+
+def route(units, trivial_lines=DEFAULT_TRIVIAL_LINES, large_lines=DEFAULT_LARGE_LINES, history_risky=False):
+    """Classify diff hunk units file by file.
+
+    Returns one (tier, reason) per unit; all units of a file share a tier.
+    """
+    bodies = {}
+    for unit in units:
+        bodies.setdefault(unit['path'], []).append(unit['body'])
+    diff_changed = sum(changed_lines(unit['body']) for unit in units)
+
+    decisions = {
+        path: classify_file(path, file_bodies, diff_changed, trivial_lines, large_lines, history_risky)
+        for path, file_bodies in bodies.items()
+    }
+    return [decisions[unit['path']] for unit in units]
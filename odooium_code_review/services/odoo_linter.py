@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+import ast
+
+# Larger files are generated or vendored, not worth linting
+MAX_FILE_BYTES = 512 * 1024
+
+SEARCH_METHODS = ('search', 'search_count', 'search_read', 'read_group', '_read_group')
+PUBLIC_AUTH = ('public', 'none')
+
+
+def _finding(line, rule, message, severity, category):
+    return {
+        'line_number': line,
+        'rule': rule,
+        'comment': message,
+        'severity': severity,
+        'rule_category': category,
+    }
+
+
+def _keyword(call, name):
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+
+def _constant(node):
+    return node.value if isinstance(node, ast.Constant) else None
+
+
+def _is_interpolated(node):
+    """Check whether an expression builds a string by interpolation"""
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(value, ast.FormattedValue) for value in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Mod, ast.Add)):
+        return isinstance(node.left, (ast.Constant, ast.JoinedStr, ast.BinOp)) and (
+            isinstance(node.op, ast.Mod) or not isinstance(node.right, ast.Constant))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'format':
+        return True
+    return False
+
+
+class _PythonChecker(ast.NodeVisitor):
+
+    def __init__(self):
+        self.findings = []
+        self._loops = 0
+        self._string_assignments = {}
+
+    def visit_Assign(self, node):
+        # Remember queries built into a variable before being executed
+        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            self._string_assignments[node.targets[0].id] = node.value
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute):
+            if func.attr == 'execute' and node.args:
+                query = node.args[0]
+                if isinstance(query, ast.Name):
+                    query = self._string_assignments.get(query.id, query)
+                if _is_interpolated(query):
+                    self.findings.append(_finding(
+                        node.lineno, 'sql-injection',
+                        'SQL query built with string interpolation; pass parameters to execute() or use odoo.tools.SQL',
+                        'critical', 'security'))
+            elif func.attr in SEARCH_METHODS and self._loops:
+                self.findings.append(_finding(
+                    node.lineno, 'search-in-loop',
+                    '%s() called inside a loop runs one query per iteration; search once before the loop' % func.attr,
+                    'medium', 'performance'))
+        self.generic_visit(node)
+
+    def _visit_loop(self, node):
+        self._loops += 1
+        self.generic_visit(node)
+        self._loops -= 1
+
+    visit_While = _visit_loop
+
+    def visit_For(self, node):
+        # The iterable is evaluated once, before the loop starts
+        self.visit(node.iter)
+        self._loops += 1
+        self.visit(node.target)
+        for statement in node.body:
+            self.visit(statement)
+        self._loops -= 1
+        for statement in node.orelse:
+            self.visit(statement)
+
+    visit_AsyncFor = visit_For
+
+    def _visit_comprehension(self, node):
+        # Only the first iterable is evaluated outside of the loop
+        first = node.generators[0]
+        self.visit(first.iter)
+        self._loops += 1
+        self.visit(first.target)
+        for condition in first.ifs:
+            self.visit(condition)
+        for generator in node.generators[1:]:
+            self.visit(generator)
+        for name in ('elt', 'key', 'value'):
+            if hasattr(node, name):
+                self.visit(getattr(node, name))
+        self._loops -= 1
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _visit_comprehension
+
+    def visit_FunctionDef(self, node):
+        # A loop around a nested function definition does not run its body
+        loops, self._loops = self._loops, 0
+        self._check_route(node)
+        self.generic_visit(node)
+        self._loops = loops
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def _check_route(self, node):
+        for decorator in node.decorator_list:
+            if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)
+                    and decorator.func.attr == 'route'):
+                continue
+            auth = _constant(_keyword(decorator, 'auth'))
+            csrf = _keyword(decorator, 'csrf')
+            if auth in PUBLIC_AUTH and csrf is not None and _constant(csrf) is False:
+                self.findings.append(_finding(
+                    decorator.lineno, 'public-route-csrf',
+                    "Route with auth='%s' disables CSRF protection; anyone can trigger it from another site" % auth,
+                    'high', 'security'))
+
+    def visit_ClassDef(self, node):
+        self._check_model(node)
+        self.generic_visit(node)
+
+    def _check_model(self, node):
+        attributes = {}
+        fields = {}
+        methods = {}
+        for statement in node.body:
+            if isinstance(statement, ast.Assign) and len(statement.targets) == 1 \
+                    and isinstance(statement.targets[0], ast.Name):
+                name = statement.targets[0].id
+                attributes[name] = statement.value
+                value = statement.value
+                if isinstance(value, ast.Call) and isinstance(value.func, ast.Attribute) \
+                        and isinstance(value.func.value, ast.Name) and value.func.value.id == 'fields':
+                    fields[name] = value
+            elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                methods[statement.name] = statement
+
+        if '_name' in attributes and '_description' not in attributes and '_inherit' not in attributes:
+            self.findings.append(_finding(
+                node.lineno, 'missing-description',
+                'Model %s defines _name without _description' % _constant(attributes['_name']),
+                'low', 'orm'))
+
+        order = _constant(attributes.get('_order')) or ''
+        for name, field in fields.items():
+            compute = _constant(_keyword(field, 'compute'))
+            if not compute:
+                continue
+            stored = _constant(_keyword(field, 'store')) is True
+            method = methods.get(compute)
+            if method is not None and not any(_is_depends(decorator) for decorator in method.decorator_list):
+                self.findings.append(_finding(
+                    method.lineno, 'compute-without-depends',
+                    'Compute method %s of field %s has no @api.depends; the value is never recomputed' % (compute, name),
+                    'medium', 'orm'))
+            if not stored and name in [part.strip().split(' ')[0] for part in order.split(',')]:
+                self.findings.append(_finding(
+                    field.lineno, 'order-on-non-stored',
+                    'Field %s is used in _order but is computed without store=True' % name,
+                    'high', 'orm'))
+
+
+def _is_depends(decorator):
+    target = decorator.func if isinstance(decorator, ast.Call) else decorator
+    return isinstance(target, ast.Attribute) and target.attr in ('depends', 'depends_context')
+
+
+def _lint_python(source):
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return [_finding(e.lineno or 0, 'syntax-error', 'Python syntax error: %s' % e.msg, 'critical', 'error')]
+    checker = _PythonChecker()
+    checker.visit(tree)
+    return checker.findings
+
+
+def _lint_xml(source):
+    try:
+        from lxml import etree
+    except ImportError:
+        return []
+    try:
+        root = etree.fromstring(source.encode('utf-8'))
+    except etree.XMLSyntaxError as e:
+        return [_finding(getattr(e, 'lineno', 0) or 0, 'xml-error', 'Invalid XML: %s' % e, 'critical', 'error')]
+
+    findings = []
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        if 't-raw' in element.attrib:
+            findings.append(_finding(
+                element.sourceline, 'qweb-t-raw',
+                't-raw outputs unescaped HTML (XSS risk); use t-out with markupsafe.Markup for trusted HTML',
+                'high', 'security'))
+    return findings
+
+
+def lint_source(path, source):
+    """Lint one file; returns findings with ``file_path`` set"""
+    if path.endswith('.py'):
+        findings = _lint_python(source)
+    elif path.endswith('.xml'):
+        findings = _lint_xml(source)
+    else:
+        findings = []
+    for finding in findings:
+        finding['file_path'] = path
+    return findings
+
+
+def lint_files(files):
+    """Lint (path, source) pairs.
+
+    Runs inline: parsing a few dozen bounded files takes far less than the
+    AI review, and a process pool cannot safely be forked from a threaded
+    Odoo worker.
+    """
+    return [finding for path, source in files for finding in lint_source(path, source)]
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import random
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60.0
+DEFAULT_MAX_RETRIES = 2
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# HTTP statuses worth retrying: the request may succeed a moment later
+TRANSIENT_STATUS = (500, 502, 503, 504)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+    def __init__(self, name, retry_in):
+        super(CircuitOpenError, self).__init__(
+            '%s is unavailable (circuit open), retry in %d seconds' % (name, retry_in))
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CallCancelled(Exception):
+    """Raised by a call whose answer is no longer needed; says nothing about the endpoint"""
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full jitter exponential backoff"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker(object):
+    """Fail fast on an endpoint after repeated transient failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds; then a single trial call is
+    let through (half open) and closes the breaker again on success.
+    """
+
+    def __init__(self, name, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opened_count = 0
+        self.rejected_count = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go through"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self.opened_at + self.reset_timeout - time.time()
+            if self.state == OPEN and retry_in <= 0:
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected_count += 1
+            raise CircuitOpenError(self.name, max(retry_in, 1))
+
+    def record_success(self):
+        with self._lock:
+            self.success_count += 1
+            self.failures = 0
+            if self.state != CLOSED:
+                _logger.info('Circuit breaker %s closed', self.name)
+            self.state = CLOSED
+            self._trial_running = False
+
+    def release(self):
+        """Give back the trial call slot of a call that ended without a verdict"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                _logger.warning('Circuit breaker %s opened after %s failures', self.name, self.failures)
+                self.state = OPEN
+                self.opened_at = time.time()
+                self.opened_count += 1
+            self._trial_running = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'failures': self.failure_count,
+                'successes': self.success_count,
+                'rejected': self.rejected_count,
+                'opened': self.opened_count,
+                'retry_in': max(self.opened_at + self.reset_timeout - time.time(), 0) if self.state == OPEN else 0,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+    """Get the process-wide circuit breaker of an endpoint"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+        breaker.failure_threshold = failure_threshold
+        breaker.reset_timeout = reset_timeout
+        return breaker
+
+
+def get_stats():
+    """Get state and counters of every circuit breaker of this process"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def call_with_retry(func, breaker, is_transient, max_retries=DEFAULT_MAX_RETRIES):
+    """Call ``func`` through a circuit breaker, retrying transient errors.
+
+    Only errors for which ``is_transient(error)`` is true are retried and
+    counted against the breaker; other errors are raised straight away.
+    A cancelled call is raised without touching the breaker.
+    """
+    attempt = 0
+    while True:
+        breaker.check()
+        try:
+            result = func()
+        except CallCancelled:
+            breaker.release()
+            raise
+        except Exception as e:
+            if not is_transient(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            _logger.warning('%s call failed (%s), retrying in %.1fs', breaker.name, e, delay)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
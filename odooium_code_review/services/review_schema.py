@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+
+from .stream_parser import FindingStreamParser
+
+SEVERITIES = ('critical', 'high', 'medium', 'low', 'info')
+RULE_CATEGORIES = ('orm', 'security', 'performance', 'style', 'documentation', 'best_practice', 'error', 'other')
+
+# Words models use instead of the expected severities
+SEVERITY_ALIASES = {
+    'blocker': 'critical',
+    'major': 'high',
+    'error': 'high',
+    'warning': 'medium',
+    'moderate': 'medium',
+    'minor': 'low',
+    'trivial': 'low',
+    'note': 'info',
+    'suggestion': 'info',
+}
+
+COMMENT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'file_path': {'type': 'string'},
+        'line_number': {'type': 'integer'},
+        'comment': {'type': 'string'},
+        'severity': {'type': 'string', 'enum': list(SEVERITIES)},
+        'rule': {'type': 'string'},
+        'rule_category': {'type': 'string', 'enum': list(RULE_CATEGORIES)},
+    },
+    'required': ['file_path', 'line_number', 'comment', 'severity', 'rule', 'rule_category'],
+    'additionalProperties': False,
+}
+
+REVIEW_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'score': {'type': 'integer'},
+        'summary': {'type': 'string'},
+        'comments': {'type': 'array', 'items': COMMENT_SCHEMA},
+    },
+    'required': ['score', 'summary', 'comments'],
+    'additionalProperties': False,
+}
+
+_SCORE_RE = re.compile(r'"score"\s*:\s*"?(-?\d+(?:\.\d+)?)')
+_SUMMARY_RE = re.compile(r'"summary"\s*:\s*("(?:[^"\\]|\\.)*")')
+_LEADING_INT_RE = re.compile(r'-?\d+')
+
+
+def _to_int(value):
+    """Coerce a model supplied number ("12", "12-15", 12.0) to an int, or None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        match = _LEADING_INT_RE.search(value)
+        if match:
+            return int(match.group())
+    return None
+
+
+def validate_comment(comment):
+    """Check and coerce the fields of one finding; returns a clean copy or None"""
+    if not isinstance(comment, dict):
+        return None
+    text = comment.get('comment')
+    if not isinstance(text, str) or not text.strip():
+        return None
+
+    severity = str(comment.get('severity') or 'medium').strip().lower()
+    severity = SEVERITY_ALIASES.get(severity, severity)
+    category = str(comment.get('rule_category') or 'best_practice').strip().lower()
+    line_number = _to_int(comment.get('line_number'))
+    file_path = comment.get('file_path')
+
+    return {
+        'file_path': file_path.strip() if isinstance(file_path, str) and file_path.strip() else 'Unknown',
+        'line_number': line_number if line_number and line_number > 0 else 0,
+        'comment': text.strip(),
+        'severity': severity if severity in SEVERITIES else 'medium',
+        'rule': comment.get('rule') if isinstance(comment.get('rule'), str) else '',
+        'rule_category': category if category in RULE_CATEGORIES else 'other',
+    }
+
+
+def _decode_object(text):
+    """Decode the first complete JSON review object found in ``text``"""
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder()
+    index = text.find('{')
+    while index != -1:
+        try:
+            value, _end = decoder.raw_decode(text, index)
+        except ValueError:
+            value = None
+        if isinstance(value, dict) and ('comments' in value or 'score' in value):
+            return value
+        index = text.find('{', index + 1)
+    return None
+
+
+def _recover_truncated(text):
+    """Salvage score, summary and every complete comment of cut off output"""
+    score_match = _SCORE_RE.search(text)
+    summary_match = _SUMMARY_RE.search(text)
+    comments = FindingStreamParser().feed(text)
+    if not (score_match or summary_match or comments):
+        return None
+
+    summary = ''
+    if summary_match:
+        try:
+            summary = json.loads(summary_match.group(1))
+        except ValueError:
+            pass
+    return {
+        'score': float(score_match.group(1)) if score_match else 0,
+        'summary': summary,
+        'comments': comments,
+    }
+
+
+def is_complete(result):
+    """Check whether a completion holds a whole, parseable review"""
+    try:
+        return not parse_review(result.get('text'))['truncated']
+    except ValueError:
+        return False
+
+
+def parse_review(text):
+    """Parse a review response into a validated ``{'score', 'summary', 'comments'}``.
+
+    Whole JSON documents are decoded wherever they start in the text; if
+    the output was cut off, every complete comment is still recovered and
+    ``truncated`` is set. Raises ValueError when nothing can be recovered.
+    """
+    text = text or ''
+    truncated = False
+    result = _decode_object(text)
+    if result is None:
+        result = _recover_truncated(text)
+        truncated = True
+    if result is None:
+        raise ValueError('no review found in AI response')
+
+    score = _to_int(result.get('score'))
+    summary = result.get('summary')
+    comments = result.get('comments')
+    return {
+        'score': min(max(score or 0, 0), 100),
+        'summary': summary if isinstance(summary, str) and summary else 'No summary provided',
+        'comments': [
+            comment for comment in (validate_comment(item) for item in (comments if isinstance(comments, list) else []))
+            if comment
+        ],
+        'truncated': truncated,
+    }
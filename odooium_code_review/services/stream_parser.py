@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import json
+import re
+
+
+class FindingStreamParser(object):
+    """Pick the objects of a JSON array out of a streamed review response.
+
+    Text is fed as it arrives; every object of the ``comments`` array is
+    returned as soon as its closing brace is seen, long before the whole
+    response is complete. Braces inside strings are ignored.
+    """
+
+    def __init__(self, key='comments'):
+        self._key_re = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._buffer = ''
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text):
+        """Add streamed text and return the objects completed by it"""
+        self._buffer += text or ''
+        if self._done:
+            return []
+        if not self._in_array:
+            match = self._key_re.search(self._buffer)
+            if not match:
+                return []
+            self._in_array = True
+            self._pos = match.end()
+
+        found = []
+        buffer = self._buffer
+        index = self._pos
+        while index < len(buffer):
+            char = buffer[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                if self._depth == 0:
+                    self._start = index
+                self._depth += 1
+            elif char == '}' and self._depth:
+                self._depth -= 1
+                if self._depth == 0 and self._start is not None:
+                    try:
+                        value = json.loads(buffer[self._start:index + 1])
+                    except ValueError:
+                        value = None
+                    if isinstance(value, dict):
+                        found.append(value)
+                    self._start = None
+            elif char == ']' and self._depth == 0:
+                self._done = True
+                index += 1
+                break
+            index += 1
+        self._pos = index
+        return found
+
+    @property
+    def text(self):
+        """Everything fed so far"""
+        return self._buffer
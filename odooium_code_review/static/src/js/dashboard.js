@@ -47,7 +47,8 @@ export class OdooiumDashboard extends Component {
     }
 
     setupBusSubscription() {
-        // Subscribe to PR updates via bus
+        // Subscribe to PR updates via bus, including findings streamed during reviews
+        this.bus.addChannel("odooium_dashboard");
         this.busUpdate = this.onPRUpdate.bind(this);
         this.bus.addEventListener("odooium_pr_update", this.busUpdate);
     }
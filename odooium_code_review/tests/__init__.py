@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from . import test_diff_parser
+from . import test_github_cache
+from . import test_github_ratelimit
+from . import test_resilience
+from . import test_stream_parser
+from . import test_review_schema
+from . import test_ai_usage
+from . import test_odoo_linter
+from . import test_hedging
+from . import test_github_graphql
+from . import test_diff_cache
+from . import test_model_router
+from . import test_hunk_review_cache
+from . import test_ai_clients
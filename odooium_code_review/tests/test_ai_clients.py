@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import types
+from unittest.mock import patch
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import ai_clients
+
+
+class FakeHttpClient(object):
+
+    def __init__(self, limits=None, timeout=None):
+        self.limits = limits
+        self.timeout = timeout
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSdkClient(object):
+
+    def __init__(self, api_key=None, http_client=None, max_retries=None, base_url=None):
+        self.api_key = api_key
+        self.http_client = http_client
+        self.max_retries = max_retries
+        self.base_url = base_url
+
+
+def fake_modules():
+    """Stand-ins for the httpx and provider SDK modules imported by PooledClient"""
+    httpx = types.ModuleType('httpx')
+    httpx.Client = FakeHttpClient
+    httpx.Limits = lambda **limits: limits
+    openai = types.ModuleType('openai')
+    openai.OpenAI = FakeSdkClient
+    anthropic = types.ModuleType('anthropic')
+    anthropic.Anthropic = FakeSdkClient
+    return {'httpx': httpx, 'openai': openai, 'anthropic': anthropic}
+
+
+@tagged('post_install', '-at_install')
+class TestClientRegistry(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        modules = patch.dict(sys.modules, fake_modules())
+        modules.start()
+        self.addCleanup(modules.stop)
+        self.registry = ai_clients.ClientRegistry()
+
+    def test_client_is_reused(self):
+        client = self.registry.get('openai', 'key-1')
+        self.assertIs(self.registry.get('openai', 'key-1'), client)
+        self.assertEqual(client.max_retries, 0)
+        self.assertEqual(self.registry.stats()['openai']['clients_created'], 1)
+        self.assertEqual(self.registry.stats()['openai']['uses'], 2)
+
+    def test_changed_settings_rebuild_and_close_the_client(self):
+        client = self.registry.get('openai', 'key-1')
+        rotated = self.registry.get('openai', 'key-2')
+        self.assertIsNot(rotated, client)
+        self.assertTrue(client.http_client.closed)
+        self.assertEqual(rotated.api_key, 'key-2')
+
+        resized = self.registry.get('openai', 'key-2', pool_size=20)
+        self.assertTrue(rotated.http_client.closed)
+        self.assertEqual(resized.http_client.limits['max_connections'], 20)
+        slower = self.registry.get('openai', 'key-2', pool_size=20, timeout=300.0)
+        self.assertTrue(resized.http_client.closed)
+        self.assertFalse(slower.http_client.closed)
+        self.assertEqual(self.registry.stats()['openai']['clients_created'], 4)
+
+    def test_base_url_clients_are_kept_apart(self):
+        client = self.registry.get('anthropic', 'key')
+        local = self.registry.get('anthropic', 'key', base_url='http://localhost:8080')
+        self.assertIsNot(local, client)
+        self.assertEqual(local.base_url, 'http://localhost:8080')
+        self.assertIs(self.registry.get('anthropic', 'key'), client)
+        self.assertFalse(client.http_client.closed)
+        self.assertEqual(set(self.registry.stats()), {'anthropic', 'anthropic@http://localhost:8080'})
+
+    def test_invalidate(self):
+        openai_client = self.registry.get('openai', 'key')
+        client = self.registry.get('anthropic', 'key')
+        local = self.registry.get('anthropic', 'key', base_url='http://localhost:8080')
+        self.registry.invalidate('anthropic')
+        self.assertTrue(client.http_client.closed)
+        self.assertTrue(local.http_client.closed)
+        self.assertFalse(openai_client.http_client.closed)
+        self.assertIsNot(self.registry.get('anthropic', 'key'), client)
+
+        self.registry.invalidate()
+        self.assertTrue(openai_client.http_client.closed)
+
+    def test_unknown_provider(self):
+        with self.assertRaises(ValueError):
+            self.registry.get('mistral', 'key')
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import ai_usage
+
+MILLION = 1000000
+
+
+@tagged('post_install', '-at_install')
+class TestAiUsage(BaseCase):
+
+    def test_longest_prefix_wins(self):
+        self.assertEqual(ai_usage.get_prices('gpt-4o-mini-2024-07-18'), ai_usage.MODEL_PRICES['gpt-4o-mini'])
+        self.assertEqual(ai_usage.get_prices('gpt-4o-2024-08-06'), ai_usage.MODEL_PRICES['gpt-4o'])
+        self.assertEqual(ai_usage.get_prices('claude-3-opus-20240229'), (15.0, 1.50, 75.0))
+        self.assertEqual(ai_usage.get_prices('claude-3-sonnet-20240229'), ai_usage.MODEL_PRICES['claude-3'])
+        self.assertIsNone(ai_usage.get_prices('mistral-large'))
+        self.assertIsNone(ai_usage.get_prices(None))
+
+    def test_cost(self):
+        usage = {'input_tokens': MILLION, 'output_tokens': MILLION}
+        self.assertEqual(ai_usage.estimate_cost('gpt-4o', usage), 12.5)
+        self.assertEqual(ai_usage.estimate_cost('gpt-4o', usage, batch=True), 6.25)
+
+    def test_cached_and_cache_write_tokens(self):
+        usage = {
+            'input_tokens': 3 * MILLION,
+            'cached_tokens': MILLION,
+            'cache_write_tokens': MILLION,
+            'output_tokens': 0,
+        }
+        # 1M plain input, 1M read from the cache, 1M written to it
+        self.assertEqual(ai_usage.estimate_cost('claude-sonnet-4-5', usage), 3.0 + 0.30 + 3.0 * ai_usage.CACHE_WRITE_FACTOR)
+
+    def test_unknown_model_is_costed_at_the_highest_prices(self):
+        usage = {'input_tokens': MILLION, 'output_tokens': MILLION}
+        with self.assertLogs(ai_usage.__name__, level='WARNING'):
+            cost = ai_usage.estimate_cost('mistral-large-test', usage)
+        highest_input = max(prices[0] for prices in ai_usage.MODEL_PRICES.values())
+        highest_output = max(prices[2] for prices in ai_usage.MODEL_PRICES.values())
+        self.assertEqual(cost, highest_input + highest_output)
+        self.assertGreater(cost, 0)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import gzip
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import diff_cache
+
+
+@tagged('post_install', '-at_install')
+class TestDiffCache(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp(prefix='odooium-test-')
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.cache = diff_cache.DiffCache(self.root, max_bytes=1024 * 1024)
+
+    def test_round_trip(self):
+        key = self.cache.make_key('diff', 'odoo/odoo', 'base', 'head', 5000)
+        self.assertEqual(key, 'diff:odoo/odoo:base:head:5000')
+        self.assertIsNone(self.cache.get(key))
+        value = {'diff': 'diff --git a/a.py b/a.py\n+x', 'lines': 2, 'truncated': False}
+        self.cache.put(key, value)
+        self.assertEqual(self.cache.get(key), value)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_corrupt_entry_is_dropped(self):
+        self.cache.put('key', {'diff': 'x'})
+        path = self.cache._path('key')
+        with gzip.open(path, 'wb') as handle:
+            handle.write(b'0000\n{"diff": "tampered"}')
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.put('old', {'diff': os.urandom(64).hex()})
+        os.utime(self.cache._path('old'), (1, 1))
+        # Room for a single entry
+        self.cache.max_bytes = os.path.getsize(self.cache._path('old')) * 1.5
+        self.cache.put('new', {'diff': os.urandom(64).hex()})
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('new'))
+
+    def test_size_is_tracked_without_walking_the_cache(self):
+        self.cache.put('a', {'diff': 'a'})
+        with patch.object(diff_cache.os, 'walk', side_effect=AssertionError('cache walked')):
+            self.cache.put('b', {'diff': 'b'})
+            self.cache.put('b', {'diff': 'bb'})
+        on_disk = sum(os.path.getsize(self.cache._path(key)) for key in ('a', 'b'))
+        self.assertEqual(self.cache.stats()['bytes'], on_disk)
+
+    def test_failed_write_leaves_no_temporary_file(self):
+        with patch.object(diff_cache.os, 'replace', side_effect=OSError('disk full')):
+            self.cache.put('key', {'diff': 'x'})
+        self.assertIsNone(self.cache.get('key'))
+        leftovers = [name for _dirpath, _dirnames, names in os.walk(self.root) for name in names]
+        self.assertEqual(leftovers, [])
+
+    def test_one_cache_per_filestore(self):
+        cache = diff_cache.get_cache(self.root, max_mb=1)
+        self.assertIs(diff_cache.get_cache(self.root, max_mb=2), cache)
+        self.assertEqual(cache.max_bytes, 2 * 1024 * 1024)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import diff_parser
+
+DIFF = """diff --git a/models/sale.py b/models/sale.py
+index 1111111..2222222 100644
+--- a/models/sale.py
++++ b/models/sale.py
+@@ -3,6 +3,7 @@ class Sale(models.Model):
+ line3
+ line4
+-line5
++line5 changed
++line5 added
+ line6
+ line7
+ line8
+@@ -20,3 +21,2 @@ class Sale(models.Model):
+ line20
+-line21
+ line22
+diff --git a/i18n/fr.po b/i18n/fr.po
+index 3333333..4444444 100644
+--- a/i18n/fr.po
++++ b/i18n/fr.po
+@@ -1 +1 @@
+-msgid "a"
++msgid "b"
+diff --git a/old.py b/old.py
+deleted file mode 100644
+index 5555555..0000000
+--- a/old.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-x = 1
+-y = 2
+"""
+
+
+@tagged('post_install', '-at_install')
+class TestDiffParser(BaseCase):
+
+    def test_commentable_lines(self):
+        patch = '@@ -1,3 +1,3 @@\n a\n-b\n+c\n d\n\\ No newline at end of file'
+        self.assertEqual(diff_parser.commentable_lines(patch), {1, 2, 3})
+        self.assertEqual(diff_parser.commentable_lines(None), set())
+
+    def test_path_filter(self):
+        self.assertIsNone(diff_parser.make_path_filter())
+        keep = diff_parser.make_path_filter(['*.py', '*.xml'], diff_parser.DEFAULT_EXCLUDE_GLOBS)
+        self.assertTrue(keep('models/sale.py'))
+        self.assertFalse(keep('i18n/fr.po'))
+        self.assertFalse(keep('static/lib/jquery.js'))
+        self.assertEqual(diff_parser.parse_globs('*.py, *.xml\n\nstatic/*'), ['*.py', '*.xml', 'static/*'])
+
+    def test_read_bounded(self):
+        lines = [line.encode('utf-8') for line in DIFF.splitlines()]
+        result = diff_parser.read_bounded(iter(lines), path_filter=diff_parser.make_path_filter(
+            exclude_globs=diff_parser.DEFAULT_EXCLUDE_GLOBS))
+        self.assertNotIn('fr.po', result['diff'])
+        self.assertIn('old.py', result['diff'])
+        self.assertEqual(result['skipped_files'], ['i18n/fr.po'])
+        self.assertFalse(result['truncated'])
+
+        result = diff_parser.read_bounded(iter(lines), max_lines=5)
+        self.assertEqual(result['lines'], 5)
+        self.assertTrue(result['truncated'])
+
+        result = diff_parser.read_bounded(iter(lines), max_bytes=100)
+        self.assertLessEqual(result['bytes'], 100)
+        self.assertTrue(result['truncated'])
+
+    def test_split_chunks_keeps_every_line(self):
+        for max_chars in (80, 200, 10000):
+            chunks = diff_parser.split_chunks(DIFF, max_chars)
+            body_lines = [line for chunk in chunks for line in chunk.splitlines()
+                          if line[:1] in '+- ' and not line.startswith(('+++', '---'))]
+            expected = [line for line in DIFF.splitlines()
+                        if line[:1] in '+- ' and not line.startswith(('+++', '---'))]
+            self.assertEqual(sorted(body_lines), sorted(expected))
+        self.assertEqual(len(diff_parser.split_chunks(DIFF, 10000)), 1)
+
+    def test_split_hunks(self):
+        units = diff_parser.split_hunks(DIFF, 10000)
+        self.assertEqual([unit['path'] for unit in units], ['models/sale.py', 'models/sale.py', 'i18n/fr.po', 'old.py'])
+        self.assertEqual((units[0]['new_start'], units[0]['new_count']), (3, 7))
+        self.assertEqual(
+            diff_parser.normalize_hunk('@@ -1 +1 @@\n+a  \n b'),
+            diff_parser.normalize_hunk('@@ -9 +12 @@\n+a\n b'))
+
+    def test_added_lines(self):
+        added = diff_parser.added_lines(DIFF)
+        self.assertEqual(added['models/sale.py'], {5, 6})
+        self.assertEqual(added['i18n/fr.po'], {1})
+        self.assertEqual(added['old.py'], set())
+
+    def test_file_patches(self):
+        patches = diff_parser.file_patches(DIFF)
+        self.assertEqual(set(patches), {'models/sale.py', 'i18n/fr.po', 'old.py'})
+        self.assertTrue(patches['i18n/fr.po'].startswith('@@ -1 +1 @@'))
+        self.assertEqual(diff_parser.commentable_lines(patches['models/sale.py']), set(range(3, 10)) | {21, 22})
+
+    def test_changed_files(self):
+        files = diff_parser.changed_files(DIFF)
+        self.assertEqual(set(files), {'models/sale.py', 'i18n/fr.po', 'old.py'})
+        self.assertTrue(files['old.py']['deleted'])
+        self.assertFalse(files['models/sale.py']['deleted'])
+        self.assertEqual(files['models/sale.py']['hunks'][0][:4], (3, 6, 3, 7))
+
+    def test_remap_line(self):
+        hunks = diff_parser.changed_files(DIFF)['models/sale.py']['hunks']
+        remap = lambda line: diff_parser.remap_line(hunks, line)
+        # Before the first hunk
+        self.assertEqual(remap(1), 1)
+        # Context lines inside a hunk follow the lines added before them
+        self.assertEqual(remap(3), 3)
+        self.assertEqual(remap(4), 4)
+        self.assertEqual(remap(6), 7)
+        self.assertEqual(remap(8), 9)
+        # Removed or rewritten lines are gone
+        self.assertIsNone(remap(5))
+        self.assertIsNone(remap(21))
+        # Between and after the hunks
+        self.assertEqual(remap(10), 11)
+        self.assertEqual(remap(20), 21)
+        self.assertEqual(remap(22), 22)
+        self.assertEqual(remap(40), 40)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import github_cache
+
+
+class FakeResponse(object):
+
+    def __init__(self, status_code=200, headers=None, content=b'{}'):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+        self.encoding = 'utf-8'
+        self.links = {}
+
+
+@tagged('post_install', '-at_install')
+class TestConditionalCache(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = github_cache.ConditionalCache(max_bytes=1024)
+
+    def test_key_depends_on_token_and_accept(self):
+        url = 'https://api.github.com/repos/o/r/pulls'
+        key = self.cache.make_key(url, {'page': 1}, {'Authorization': 'token a'})
+        self.assertEqual(key, self.cache.make_key(url, {'page': 1}, {'Authorization': 'token a'}))
+        self.assertNotEqual(key, self.cache.make_key(url, {'page': 1}, {'Authorization': 'token b'}))
+        self.assertNotEqual(key, self.cache.make_key(url, {'page': 1}, {'Authorization': 'token a', 'Accept': 'application/vnd.github.v3.diff'}))
+        self.assertNotEqual(key, self.cache.make_key(url, {'page': 2}, {'Authorization': 'token a'}))
+        self.assertNotIn('token a', key)
+
+    def test_store_needs_a_validator(self):
+        self.cache.store('plain', FakeResponse())
+        self.cache.store('error', FakeResponse(status_code=404, headers={'ETag': '"x"'}))
+        self.assertIsNone(self.cache.get('plain'))
+        self.assertIsNone(self.cache.get('error'))
+        self.assertEqual(self.cache.validators('plain'), {})
+
+        self.cache.store('lower', FakeResponse(headers={'etag': '"low"', 'link': '<https://next>; rel="next"'}))
+        self.assertEqual(self.cache.validators('lower'), {'If-None-Match': '"low"'})
+        self.assertEqual(self.cache.get('lower').headers['Link'], '<https://next>; rel="next"')
+
+        self.cache.store('etag', FakeResponse(headers={'ETag': '"abc"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}))
+        self.assertEqual(self.cache.validators('etag'), {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+        })
+
+    def test_replayed_response(self):
+        self.cache.store('key', FakeResponse(headers={'ETag': '"abc"', 'X-Other': '1'}, content=b'{"number": 7}'))
+        cached = self.cache.get('key')
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(cached.json(), {'number': 7})
+        self.assertNotIn('X-Other', cached.headers)
+        self.assertIsNone(cached.raise_for_status())
+
+    def test_least_recently_used_is_evicted(self):
+        # Every body is one byte, the budget two
+        self.cache.resize(2)
+        for key in ('a', 'b'):
+            self.cache.store(key, FakeResponse(headers={'ETag': key}, content=b'1'))
+        self.cache.get('a')
+        self.cache.store('c', FakeResponse(headers={'ETag': 'c'}, content=b'1'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertEqual(self.cache.stats()['bytes'], 2)
+
+        # Replacing an entry does not count its old body twice
+        self.cache.store('c', FakeResponse(headers={'ETag': 'c2'}, content=b'1'))
+        self.assertEqual(self.cache.stats()['bytes'], 2)
+
+        self.cache.resize(1)
+        self.assertEqual(self.cache.stats()['entries'], 1)
+        self.assertEqual(self.cache.stats()['evictions'], 2)
+
+        # Bodies larger than the whole budget are not cached
+        self.cache.store('big', FakeResponse(headers={'ETag': 'big'}, content=b'12'))
+        self.assertIsNone(self.cache.get('big'))
+        self.assertEqual(self.cache.stats()['bytes'], 1)
+
+    def test_hit_ratio(self):
+        self.assertEqual(self.cache.stats()['hit_ratio'], 0.0)
+        self.cache.record(hit=True)
+        self.cache.record(hit=True)
+        self.cache.record(hit=False)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertEqual(stats['hit_ratio'], 0.667)
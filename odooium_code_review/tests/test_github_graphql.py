@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import github_graphql
+
+
+@tagged('post_install', '-at_install')
+class TestGithubGraphql(BaseCase):
+
+    def test_list_parameters(self):
+        variables = github_graphql.pull_requests_variables('odoo', 'odoo', state='closed', sort='updated', first=500)
+        self.assertEqual(variables['first'], github_graphql.MAX_PRS_PER_QUERY)
+        self.assertEqual(variables['states'], ['CLOSED', 'MERGED'])
+        self.assertEqual(variables['orderBy'], {'field': 'UPDATED_AT', 'direction': 'DESC'})
+        self.assertIsNone(github_graphql.pull_requests_variables('odoo', 'odoo', state='all')['states'])
+
+    def test_pr_node_has_the_rest_shape(self):
+        pr = github_graphql.pr_node_to_rest({
+            'databaseId': 42,
+            'number': 7,
+            'title': 'Fix',
+            'state': 'MERGED',
+            'headRefName': 'fix',
+            'headRefOid': 'abc',
+            'baseRefName': '17.0',
+            'baseRefOid': 'def',
+            'author': {'login': 'dev', 'databaseId': 3, 'avatarUrl': 'https://avatar'},
+            'files': {'totalCount': 2, 'nodes': [{'path': 'a.py', 'additions': 1, 'deletions': 0, 'changeType': 'ADDED'}]},
+            'reviews': {'nodes': [{'databaseId': 9, 'state': 'APPROVED', 'submittedAt': 'now', 'author': {'login': 'lead'}}]},
+        })
+        self.assertEqual((pr['id'], pr['number'], pr['state']), (42, 7, 'closed'))
+        self.assertEqual(pr['head'], {'ref': 'fix', 'sha': 'abc'})
+        self.assertEqual(pr['base'], {'ref': '17.0', 'sha': 'def'})
+        self.assertEqual(pr['user'], {'login': 'dev', 'id': 3, 'avatar_url': 'https://avatar'})
+        self.assertEqual(pr['files'], [{'filename': 'a.py', 'additions': 1, 'deletions': 0, 'status': 'added'}])
+        # Only part of the files came with the PR
+        self.assertFalse(pr['files_complete'])
+        self.assertEqual(pr['reviews'], [{'id': 9, 'state': 'APPROVED', 'submitted_at': 'now', 'user': {'login': 'lead'}}])
+        pr = github_graphql.pr_node_to_rest({'state': 'OPEN', 'author': None})
+        self.assertEqual((pr['state'], pr['files'], pr['files_complete'], pr['reviews']), ('open', [], True, []))
+
+    def test_file_node(self):
+        self.assertEqual(
+            github_graphql.file_node_to_rest({'path': 'a.py', 'additions': 2, 'deletions': 1, 'changeType': 'DELETED'}),
+            {'filename': 'a.py', 'additions': 2, 'deletions': 1, 'status': 'removed'})
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import github_ratelimit
+
+
+class FakeResponse(object):
+
+    def __init__(self, headers):
+        self.headers = headers
+
+
+@tagged('post_install', '-at_install')
+class TestRetryDelay(BaseCase):
+
+    def test_exceeded(self):
+        error = github_ratelimit.exceeded(429, 120)
+        self.assertIsInstance(error, github_ratelimit.RateLimitExceeded)
+        self.assertAlmostEqual(error.retry_at, time.time() + 120, delta=5)
+        self.assertIn('429', str(error))
+
+    def test_only_rate_limits_are_retried(self):
+        self.assertIsNone(github_ratelimit.retry_delay_for(200, {}, '', 0))
+        self.assertIsNone(github_ratelimit.retry_delay_for(500, {}, '', 0))
+        # A 403 without rate limit signs is a permission error
+        self.assertIsNone(github_ratelimit.retry_delay_for(
+            403, {'X-RateLimit-Remaining': '4000'}, '{"message": "Resource not accessible"}', 0))
+
+    def test_secondary_rate_limit_body(self):
+        delay = github_ratelimit.retry_delay_for(
+            403, {}, '{"message": "You have exceeded a secondary rate limit"}', 2)
+        self.assertGreaterEqual(delay, 0)
+        self.assertLessEqual(delay, github_ratelimit.BACKOFF_BASE * 4)
+
+    def test_retry_after(self):
+        delay = github_ratelimit.retry_delay_for(429, {'Retry-After': '5'}, '', 0)
+        self.assertGreaterEqual(delay, 5)
+        self.assertLessEqual(delay, 5 + github_ratelimit.BACKOFF_BASE)
+
+    def test_exhausted_budget_waits_for_reset(self):
+        headers = {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + 30)}
+        delay = github_ratelimit.retry_delay_for(403, headers, '', 0)
+        self.assertGreater(delay, 25)
+        self.assertLessEqual(delay, 30 + github_ratelimit.BACKOFF_BASE)
+
+
+@tagged('post_install', '-at_install')
+class TestRateLimitScheduler(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.scheduler = github_ratelimit.RateLimitScheduler()
+        self.key = self.scheduler.token_key({'Authorization': 'token secret'})
+
+    def _update(self, remaining, reset_in, limit=5000):
+        self.scheduler.update(self.key, FakeResponse({
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': str(int(time.time() + reset_in)),
+        }))
+
+    def test_token_key_hides_the_token(self):
+        self.assertNotIn('secret', self.key)
+        self.assertNotEqual(self.key, self.scheduler.token_key({'Authorization': 'token other'}))
+
+    def test_unknown_budget_does_not_wait(self):
+        self.assertEqual(self.scheduler.reserve(self.key), 0)
+
+    def test_budget_is_counted_down(self):
+        self._update(remaining=1000, reset_in=3600)
+        self.assertEqual(self.scheduler.reserve(self.key, reserve=100), 0)
+        self.assertEqual(self.scheduler.budget(self.key)['remaining'], 999)
+
+    def test_reserve_spreads_the_remaining_budget(self):
+        self._update(remaining=10, reset_in=100)
+        self.assertEqual(self.scheduler.reserve(self.key, reserve=100, max_wait=60), 0)
+        # The second request gets the next slot, about a tenth of the window later
+        delay = self.scheduler.reserve(self.key, reserve=100, max_wait=60)
+        self.assertGreater(delay, 8)
+        self.assertLess(delay, 12)
+
+    def test_exhausted_budget_raises_beyond_max_wait(self):
+        self._update(remaining=0, reset_in=600)
+        with self.assertRaises(github_ratelimit.RateLimitExceeded) as error:
+            self.scheduler.reserve(self.key, max_wait=60)
+        self.assertGreater(error.exception.retry_at, time.time() + 500)
+
+    def test_block(self):
+        self.scheduler.block(self.key, 30)
+        self.assertGreater(self.scheduler.reserve(self.key, max_wait=60), 25)
+        with self.assertRaises(github_ratelimit.RateLimitExceeded):
+            self.scheduler.reserve(self.key, max_wait=10)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import hedging
+
+
+def answer(text, delay=0.0, findings=()):
+    def call(prompt, emit, cancel):
+        for finding in findings:
+            emit(finding)
+        time.sleep(delay)
+        return {'text': text, 'latency': delay}
+    return call
+
+
+def hanging(stopped, timeout=5.0):
+    """A call blocked on a stalled stream, only woken up by closing it"""
+    def call(prompt, emit, cancel):
+        closed = threading.Event()
+        cancel.on_cancel(closed.set)
+        if closed.wait(timeout):
+            stopped.set()
+            raise hedging.HedgeCancelled({'input_tokens': 100, 'output_tokens': 5})
+        return {'text': 'late', 'latency': timeout}
+    return call
+
+
+def failing(error):
+    def call(prompt, emit, cancel):
+        raise error
+    return call
+
+
+@tagged('post_install', '-at_install')
+class TestLatencyTracker(BaseCase):
+
+    def test_percentile_needs_samples(self):
+        tracker = hedging.LatencyTracker()
+        for latency in range(1, hedging.MIN_SAMPLES):
+            tracker.record('m', float(latency))
+        self.assertIsNone(tracker.percentile('m', 95))
+        tracker.record('m', float(hedging.MIN_SAMPLES))
+        self.assertEqual(tracker.percentile('m', 0), 1.0)
+        self.assertEqual(tracker.percentile('m', 100), float(hedging.MIN_SAMPLES))
+
+    def test_hedge_delay(self):
+        model = 'test-hedge-delay'
+        self.assertEqual(hedging.hedge_delay(model, default=12.0), 12.0)
+        for _index in range(hedging.MIN_SAMPLES):
+            hedging.get_tracker().record(model, 0.1)
+        # Never hedge sooner than the floor
+        self.assertEqual(hedging.hedge_delay(model), hedging.MIN_DELAY)
+
+
+@tagged('post_install', '-at_install')
+class TestHedgedCall(BaseCase):
+
+    def _stats(self, model):
+        return hedging.get_tracker().stats()[model]
+
+    def test_fast_primary_answers_alone(self):
+        secondary_called = []
+
+        def secondary(prompt, emit, cancel):
+            secondary_called.append(prompt)
+            return {'text': 'secondary'}
+
+        result = hedging.hedged_call(
+            answer('primary', 0.01), secondary, 'prompt', hedge_after=5.0, models=('test-fast', 'test-fast-2'))
+        self.assertEqual(result['text'], 'primary')
+        self.assertEqual(result['requested_model'], 'test-fast')
+        self.assertEqual(result['discarded_usage'], [])
+        self.assertFalse(secondary_called)
+        self.assertEqual(self._stats('test-fast')['samples'], 1)
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        stopped = threading.Event()
+        started = time.monotonic()
+        result = hedging.hedged_call(
+            hanging(stopped), answer('secondary', 0.01), 'prompt', hedge_after=0.05,
+            models=('test-slow', 'test-slow-2'))
+        self.assertEqual(result['text'], 'secondary')
+        self.assertEqual(result['requested_model'], 'test-slow-2')
+        self.assertTrue(stopped.wait(1.0), 'the losing request was not cancelled')
+        # The tokens of the cancelled request are still billed
+        self.assertEqual(result['discarded_usage'], [{'input_tokens': 100, 'output_tokens': 5, 'model': 'test-slow'}])
+
+        stats = self._stats('test-slow')
+        self.assertEqual((stats['hedged'], stats['hedge_won']), (1, 1))
+        # The loser is recorded with the time it ran, not left out
+        self.assertEqual(stats['samples'], 1)
+        samples = list(hedging.get_tracker()._samples['test-slow'])
+        self.assertGreaterEqual(samples[0], 0.05)
+        self.assertLessEqual(samples[0], time.monotonic() - started)
+
+    def test_fallback_on_error(self):
+        result = hedging.hedged_call(
+            failing(ValueError('boom')), answer('secondary'), 'prompt', models=('test-error', 'test-error-2'))
+        self.assertEqual(result['text'], 'secondary')
+        self.assertEqual(self._stats('test-error')['fallback'], 1)
+
+    def test_fallback_on_invalid_answer(self):
+        is_valid = lambda result: result['text'] != 'bad'
+        bad = lambda prompt, emit, cancel: {'text': 'bad', 'input_tokens': 10, 'output_tokens': 2}
+        result = hedging.hedged_call(
+            bad, answer('good'), 'prompt', is_valid=is_valid, models=('test-invalid', 'test-invalid-2'))
+        self.assertEqual(result['text'], 'good')
+        self.assertEqual(result['discarded_usage'], [{'input_tokens': 10, 'output_tokens': 2, 'model': 'test-invalid'}])
+
+        result = hedging.hedged_call(
+            answer('bad'), answer('bad'), 'prompt', is_valid=is_valid, models=('test-invalid', 'test-invalid-2'))
+        self.assertEqual(result['requested_model'], 'test-invalid')
+
+    def test_primary_error_is_raised_when_both_fail(self):
+        with self.assertRaises(ValueError):
+            hedging.hedged_call(
+                failing(ValueError('primary')), failing(KeyError('secondary')), 'prompt',
+                models=('test-failed', 'test-failed-2'))
+
+    def test_only_primary_findings_are_emitted_in_the_calling_thread(self):
+        emitted = []
+        threads = set()
+
+        def emit(finding):
+            emitted.append(finding)
+            threads.add(threading.current_thread())
+
+        result = hedging.hedged_call(
+            answer('primary', 0.01, findings=[{'n': 1}, {'n': 2}]), answer('secondary', findings=[{'n': 3}]),
+            'prompt', emit=emit, models=('test-stream', 'test-stream-2'))
+        self.assertEqual(result['text'], 'primary')
+        self.assertEqual(emitted, [{'n': 1}, {'n': 2}])
+        self.assertEqual(threads, {threading.current_thread()})
+
+    def test_cancellation_runs_its_closers(self):
+        cancel = hedging.Cancellation()
+        closed = []
+        cancel.on_cancel(lambda: closed.append('first'))
+        cancel.on_cancel(lambda: 1 / 0)
+        cancel.set()
+        self.assertTrue(cancel.is_set())
+        # Registered after the cancellation: runs right away
+        cancel.on_cancel(lambda: closed.append('late'))
+        self.assertEqual(closed, ['first', 'late'])
+
+    def test_cancelled_is_not_a_failure(self):
+        self.assertTrue(issubclass(hedging.HedgeCancelled, hedging.resilience.CallCancelled))
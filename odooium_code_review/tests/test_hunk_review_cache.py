@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase, tagged
+
+from ..services import diff_parser
+
+HUNK = """@@ -%(start)s,3 +%(start)s,4 @@ class Sale(models.Model):
+     def action(self):
+-        return self.env.cr.execute(query)
++        query = "SELECT 1"
++        return self.env.cr.execute(query)
+     pass
+"""
+
+
+def unit(start, path='models/sale.py'):
+    diff = 'diff --git a/%s b/%s\n--- a/%s\n+++ b/%s\n' % (path, path, path, path) + HUNK % {'start': start}
+    return diff_parser.split_hunks(diff, 10000)[0]
+
+
+@tagged('post_install', '-at_install')
+class TestHunkReviewCache(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = self.env['odooium.hunk_review_cache']
+
+    def test_key_ignores_the_hunk_position(self):
+        key = self.cache.make_key(unit(10), 'gpt-4o', '2', 'rules')
+        self.assertEqual(key, self.cache.make_key(unit(40), 'gpt-4o', '2', 'rules'))
+        self.assertNotEqual(key, self.cache.make_key(unit(10), 'gpt-4o-mini', '2', 'rules'))
+        self.assertNotEqual(key, self.cache.make_key(unit(10, path='models/stock.py'), 'gpt-4o', '2', 'rules'))
+        self.assertIsNone(self.cache.make_key({'path': None, 'body': 'text'}, 'gpt-4o', '2', 'rules'))
+
+    def test_store_and_lookup(self):
+        old = unit(10)
+        key = self.cache.make_key(old, 'gpt-4o', '2', 'rules')
+        findings = [
+            {'line_number': 12, 'severity': 'high', 'comment': 'Raw SQL'},
+            {'severity': 'info', 'comment': 'No line'},
+        ]
+        self.cache.store([(key, old, 80, findings)], 'gpt-4o')
+        # Storing the same hunk again keeps a single entry
+        self.cache.store([(key, old, 60, findings)], 'gpt-4o')
+        self.assertEqual(self.cache.search_count([('key', '=', key)]), 1)
+
+        cached = self.cache.lookup([key, 'unknown', None])
+        self.assertEqual(list(cached), [key])
+        self.assertEqual(cached[key]['score'], 80)
+        self.assertEqual([finding['line_offset'] for finding in cached[key]['findings']], [2, 0])
+        self.assertTrue(all('line_number' not in finding for finding in cached[key]['findings']))
+        self.assertEqual(self.cache.lookup([]), {})
+
+    def test_findings_follow_a_moved_hunk(self):
+        old = unit(10)
+        key = self.cache.make_key(old, 'gpt-4o', '2', 'rules')
+        self.cache.store([(key, old, 80, [{'line_number': 12, 'comment': 'Raw SQL'}])], 'gpt-4o')
+
+        # Thirty lines were added above the same change
+        moved = unit(40)
+        self.assertEqual(self.cache.make_key(moved, 'gpt-4o', '2', 'rules'), key)
+        findings = self.cache.rebase_findings(self.cache.lookup([key])[key]['findings'], moved)
+        self.assertEqual(findings, [{'line_number': 42, 'file_path': 'models/sale.py', 'comment': 'Raw SQL'}])
+        # The new line still points at the same code
+        self.assertEqual(diff_parser.added_lines(moved['header'] + moved['body'])['models/sale.py'], {41, 42})
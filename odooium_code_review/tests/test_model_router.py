@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import model_router
+
+
+def unit(path, *added):
+    return {'path': path, 'body': '@@ -1,1 +1,%s @@\n' % len(added) + ''.join('+%s\n' % line for line in added)}
+
+
+@tagged('post_install', '-at_install')
+class TestModelRouter(BaseCase):
+
+    def test_line_counts(self):
+        body = '--- a/a.py\n+++ b/a.py\n@@ -1,2 +1,2 @@\n context\n-old\n+new\n'
+        self.assertEqual(model_router.changed_lines(body), 2)
+        self.assertEqual(model_router.added_code(body), 'new')
+
+    def test_tiers(self):
+        self.assertEqual(model_router.route([unit('README.md', 'text')])[0][0], model_router.SMALL)
+        self.assertEqual(model_router.route([unit('models/sale.py', 'x = 1')])[0][0], model_router.SMALL)
+        self.assertEqual(
+            model_router.route([unit('models/sale.py', *['x = 1'] * 20)])[0][0], model_router.STANDARD)
+        self.assertEqual(
+            model_router.route([unit('models/sale.py', *['x = 1'] * 20)], large_lines=20)[0][0], model_router.STRONG)
+        self.assertEqual(
+            model_router.route([unit('models/sale.py', 'x = 1')], history_risky=True)[0][0], model_router.STRONG)
+
+    def test_sensitive_files_and_risky_code(self):
+        self.assertEqual(
+            model_router.route([unit('sale/security/ir.model.access.csv', 'a,b')])[0],
+            (model_router.STRONG, 'security sensitive file'))
+        self.assertEqual(
+            model_router.route([unit('models/sale.py', 'self.sudo().write({})')])[0][0], model_router.STRONG)
+        # Risky code beats a low risk file type
+        self.assertEqual(model_router.route([unit('doc/index.rst', 'eval(x)')])[0][0], model_router.STRONG)
+
+    def test_units_of_a_file_share_a_tier(self):
+        units = [unit('models/sale.py', 'x = 1'), unit('models/sale.py', 'self.env.cr.execute(query)'),
+                 unit('README.md', 'text')]
+        tiers = [tier for tier, _reason in model_router.route(units)]
+        self.assertEqual(tiers, [model_router.STRONG, model_router.STRONG, model_router.SMALL])
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import odoo_linter
+
+MODEL = '''
+from odoo import api, fields, models
+
+
+class Sale(models.Model):
+    _name = 'x.sale'
+    _order = 'total desc'
+
+    total = fields.Float(compute='_compute_total')
+    stored = fields.Float(compute='_compute_stored', store=True)
+
+    def _compute_total(self):
+        for record in self:
+            record.total = 0
+
+    @api.depends('total')
+    def _compute_stored(self):
+        for record in self:
+            record.stored = record.total
+
+    def action(self, ids):
+        for partner_id in ids:
+            self.env['res.partner'].search([('id', '=', partner_id)])
+        self.env.cr.execute("SELECT id FROM x_sale WHERE name = '%s'" % self.name)
+        query = f"DELETE FROM x_sale WHERE id = {self.id}"
+        self.env.cr.execute(query)
+        self.env.cr.execute("SELECT id FROM x_sale WHERE id = %s", (self.id,))
+        self.env['res.partner'].search([])
+'''
+
+CONTROLLER = '''
+from odoo import http
+
+
+class Api(http.Controller):
+
+    @http.route('/x/hook', type='http', auth='public', csrf=False)
+    def hook(self):
+        return ''
+
+    @http.route('/x/form', type='http', auth='user', csrf=False)
+    def form(self):
+        return ''
+'''
+
+TEMPLATE = '''<odoo>
+    <template id="page">
+        <div t-raw="html"/>
+        <div t-out="text"/>
+    </template>
+</odoo>
+'''
+
+
+def rules(findings):
+    return sorted((finding['rule'], finding['line_number']) for finding in findings)
+
+
+@tagged('post_install', '-at_install')
+class TestOdooLinter(BaseCase):
+
+    def test_model_rules(self):
+        findings = odoo_linter.lint_source('models/sale.py', MODEL)
+        self.assertEqual(rules(findings), [
+            ('compute-without-depends', 12),
+            ('missing-description', 5),
+            ('order-on-non-stored', 9),
+            ('search-in-loop', 23),
+            ('sql-injection', 24),
+            ('sql-injection', 26),
+        ])
+        self.assertTrue(all(finding['file_path'] == 'models/sale.py' for finding in findings))
+        self.assertEqual({finding['rule_category'] for finding in findings}, {'orm', 'performance', 'security'})
+
+    def test_inherited_model_needs_no_description(self):
+        source = "from odoo import models\n\nclass Sale(models.Model):\n    _name = 'sale.order'\n    _inherit = 'sale.order'\n"
+        self.assertEqual(odoo_linter.lint_source('models/sale.py', source), [])
+
+    def test_search_as_the_loop_iterable(self):
+        source = (
+            "for rec in self.search([]):\n"
+            "    rec.name = rec.name\n"
+            "ids = [r.id for r in env['x'].search([]) if r]\n"
+            "names = {p.name: p for p in env['res.partner'].browse(ids)}\n"
+            "for x in y:\n"
+            "    pass\n"
+            "else:\n"
+            "    env['a'].search([])\n"
+        )
+        self.assertEqual(odoo_linter.lint_source('a.py', source), [])
+        source = "[env['a'].search([('id', '=', i)]) for i in ids]\n[x for i in ids for x in env['a'].search([])]\n"
+        self.assertEqual(rules(odoo_linter.lint_source('a.py', source)), [('search-in-loop', 1), ('search-in-loop', 2)])
+
+    def test_nested_function_in_loop(self):
+        source = "for x in y:\n    def f():\n        return env['a'].search([])\n"
+        self.assertEqual(odoo_linter.lint_source('a.py', source), [])
+
+    def test_public_route_without_csrf(self):
+        self.assertEqual(rules(odoo_linter.lint_source('controllers/main.py', CONTROLLER)), [('public-route-csrf', 7)])
+
+    def test_syntax_error(self):
+        findings = odoo_linter.lint_source('broken.py', 'def f(:\n')
+        self.assertEqual([finding['rule'] for finding in findings], ['syntax-error'])
+        self.assertEqual(findings[0]['severity'], 'critical')
+
+    def test_qweb_t_raw(self):
+        self.assertEqual(rules(odoo_linter.lint_source('views/page.xml', TEMPLATE)), [('qweb-t-raw', 3)])
+        self.assertEqual(rules(odoo_linter.lint_source('views/broken.xml', '<odoo><template>')), [('xml-error', 1)])
+
+    def test_other_files_are_skipped(self):
+        self.assertEqual(odoo_linter.lint_source('static/src/app.js', 'eval(x)'), [])
+
+    def test_lint_files(self):
+        findings = odoo_linter.lint_files([('models/sale.py', MODEL), ('views/page.xml', TEMPLATE)])
+        self.assertEqual({finding['file_path'] for finding in findings}, {'models/sale.py', 'views/page.xml'})
+        self.assertEqual(odoo_linter.lint_files([]), [])
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import resilience
+
+
+class Transient(Exception):
+    pass
+
+
+@tagged('post_install', '-at_install')
+class TestCircuitBreaker(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.breaker = resilience.CircuitBreaker('test', failure_threshold=2, reset_timeout=60)
+
+    def test_opens_after_threshold(self):
+        self.breaker.check()
+        self.breaker.record_failure()
+        self.breaker.check()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+        with self.assertRaises(resilience.CircuitOpenError) as error:
+            self.breaker.check()
+        self.assertGreater(error.exception.retry_in, 0)
+        self.assertEqual(self.breaker.stats()['rejected'], 1)
+
+    def test_half_open_lets_one_trial_through(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.opened_at -= 61
+        self.breaker.check()
+        self.assertEqual(self.breaker.state, resilience.HALF_OPEN)
+        with self.assertRaises(resilience.CircuitOpenError):
+            self.breaker.check()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, resilience.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.opened_at -= 61
+        self.breaker.check()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+
+    def test_release_frees_the_trial(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.opened_at -= 61
+        self.breaker.check()
+        self.breaker.release()
+        self.breaker.check()
+        self.assertEqual(self.breaker.state, resilience.HALF_OPEN)
+
+
+@tagged('post_install', '-at_install')
+@patch.object(resilience.time, 'sleep', lambda seconds: None)
+class TestCallWithRetry(BaseCase):
+
+    def setUp(self):
+        super().setUp()
+        self.breaker = resilience.CircuitBreaker('test', failure_threshold=10)
+
+    def _call(self, outcomes, max_retries=2):
+        outcomes = list(outcomes)
+        calls = []
+
+        def func():
+            calls.append(1)
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        result = resilience.call_with_retry(
+            func, self.breaker, lambda e: isinstance(e, Transient), max_retries=max_retries)
+        return result, len(calls)
+
+    def test_transient_errors_are_retried(self):
+        self.assertEqual(self._call([Transient(), Transient(), 'ok']), ('ok', 3))
+        self.assertEqual(self.breaker.failures, 0)
+        self.assertEqual(self.breaker.stats()['failures'], 2)
+
+    def test_retries_are_bounded(self):
+        with self.assertRaises(Transient):
+            self._call([Transient()] * 5, max_retries=1)
+        self.assertEqual(self.breaker.failures, 2)
+
+    def test_other_errors_are_raised_at_once(self):
+        with self.assertRaises(ValueError):
+            self._call([ValueError(), 'ok'])
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_cancelled_call_leaves_the_breaker_alone(self):
+        with self.assertRaises(resilience.CallCancelled):
+            self._call([resilience.CallCancelled(), 'ok'])
+        stats = self.breaker.stats()
+        self.assertEqual((stats['successes'], stats['failures']), (0, 0))
+
+    def test_open_circuit_is_not_called(self):
+        self.breaker.state = resilience.OPEN
+        self.breaker.opened_at = resilience.time.time()
+        with self.assertRaises(resilience.CircuitOpenError):
+            self._call(['ok'])
+
+    def test_shared_breakers(self):
+        breaker = resilience.get_breaker('test.shared', failure_threshold=3)
+        self.assertIs(resilience.get_breaker('test.shared', failure_threshold=3), breaker)
+        self.assertIn('test.shared', resilience.get_stats())
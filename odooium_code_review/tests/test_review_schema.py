@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services import review_schema
+
+COMMENT = {
+    'file_path': 'models/sale.py',
+    'line_number': 12,
+    'comment': 'Missing access rights check',
+    'severity': 'high',
+    'rule': 'sudo-without-check',
+    'rule_category': 'security',
+}
+
+
+@tagged('post_install', '-at_install')
+class TestValidateComment(BaseCase):
+
+    def test_clean_comment_is_kept(self):
+        self.assertEqual(review_schema.validate_comment(COMMENT), COMMENT)
+
+    def test_values_are_coerced(self):
+        comment = review_schema.validate_comment({
+            'file_path': '  ',
+            'line_number': '12-15',
+            'comment': '  Slow loop ',
+            'severity': 'Major',
+            'rule_category': 'speed',
+        })
+        self.assertEqual(comment, {
+            'file_path': 'Unknown',
+            'line_number': 12,
+            'comment': 'Slow loop',
+            'severity': 'high',
+            'rule': '',
+            'rule_category': 'other',
+        })
+        self.assertEqual(review_schema.validate_comment(dict(COMMENT, line_number=-3))['line_number'], 0)
+        self.assertEqual(review_schema.validate_comment(dict(COMMENT, severity='bogus'))['severity'], 'medium')
+
+    def test_unusable_comments(self):
+        self.assertIsNone(review_schema.validate_comment('text'))
+        self.assertIsNone(review_schema.validate_comment(dict(COMMENT, comment='')))
+        self.assertIsNone(review_schema.validate_comment(dict(COMMENT, comment=None)))
+
+
+@tagged('post_install', '-at_install')
+class TestParseReview(BaseCase):
+
+    def test_plain_json(self):
+        result = review_schema.parse_review(json.dumps({'score': 85, 'summary': 'Good', 'comments': [COMMENT]}))
+        self.assertEqual(result, {'score': 85, 'summary': 'Good', 'comments': [COMMENT], 'truncated': False})
+
+    def test_json_inside_prose(self):
+        text = 'Sure! Here is the review:\n```json\n%s\n```' % json.dumps(
+            {'score': '70', 'summary': '', 'comments': [COMMENT, {'comment': ''}]})
+        result = review_schema.parse_review(text)
+        self.assertEqual(result['score'], 70)
+        self.assertEqual(result['summary'], 'No summary provided')
+        self.assertEqual(result['comments'], [COMMENT])
+        self.assertFalse(result['truncated'])
+
+    def test_score_is_clamped(self):
+        self.assertEqual(review_schema.parse_review('{"score": 140, "summary": "x", "comments": []}')['score'], 100)
+        self.assertEqual(review_schema.parse_review('{"score": -5, "summary": "x", "comments": []}')['score'], 0)
+
+    def test_truncated_output_is_recovered(self):
+        text = json.dumps({'score': 60, 'summary': 'Partial', 'comments': [COMMENT, COMMENT]})
+        result = review_schema.parse_review(text[:-40])
+        self.assertTrue(result['truncated'])
+        self.assertEqual(result['score'], 60)
+        self.assertEqual(result['summary'], 'Partial')
+        self.assertEqual(result['comments'], [COMMENT])
+
+    def test_nothing_to_recover(self):
+        with self.assertRaises(ValueError):
+            review_schema.parse_review('I cannot review this diff.')
+        with self.assertRaises(ValueError):
+            review_schema.parse_review(None)
+
+    def test_is_complete(self):
+        text = json.dumps({'score': 90, 'summary': 'Fine', 'comments': []})
+        self.assertTrue(review_schema.is_complete({'text': text}))
+        self.assertFalse(review_schema.is_complete({'text': text[:-10]}))
+        self.assertFalse(review_schema.is_complete({'text': 'no review'}))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo.tests.common import BaseCase, tagged
+
+from ..services.stream_parser import FindingStreamParser
+
+REVIEW = {
+    'score': 80,
+    'summary': 'Looks {mostly} fine',
+    'comments': [
+        {'file_path': 'a.py', 'line_number': 3, 'comment': 'Use "search_count" instead of len(search()) {sic}'},
+        {'file_path': 'b.py', 'line_number': 7, 'comment': 'Escaped quote \\" and brace }', 'extra': {'nested': [1, 2]}},
+    ],
+}
+
+
+@tagged('post_install', '-at_install')
+class TestFindingStreamParser(BaseCase):
+
+    def test_findings_arrive_one_by_one(self):
+        text = json.dumps(REVIEW)
+        parser = FindingStreamParser()
+        found = []
+        for index in range(0, len(text), 7):
+            found.extend(parser.feed(text[index:index + 7]))
+        self.assertEqual(found, REVIEW['comments'])
+        self.assertEqual(parser.text, text)
+
+    def test_finding_is_returned_as_soon_as_it_is_closed(self):
+        text = json.dumps(REVIEW)
+        first = json.dumps(REVIEW['comments'][0])
+        end = text.index(first) + len(first)
+        parser = FindingStreamParser()
+        self.assertEqual(parser.feed(text[:end - 1]), [])
+        self.assertEqual(parser.feed(text[end - 1:end]), [REVIEW['comments'][0]])
+
+    def test_text_before_the_array_is_ignored(self):
+        parser = FindingStreamParser()
+        self.assertEqual(parser.feed('Here is {the} review: {"score": 1, "comm'), [])
+        self.assertEqual(parser.feed('ents": [{"comment": "x"}, '), [{'comment': 'x'}])
+        self.assertEqual(parser.feed('{"comment": "y"}], "tail": [{"comment": "z"}]}'), [{'comment': 'y'}])
+        # Nothing after the end of the array
+        self.assertEqual(parser.feed('{"comment": "w"}'), [])
+
+    def test_cut_off_finding_is_not_returned(self):
+        parser = FindingStreamParser()
+        self.assertEqual(parser.feed('{"comments": [{"comment": "a"}, {"comment": "b'), [{'comment': 'a'}])
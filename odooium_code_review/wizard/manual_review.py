@@ -37,7 +37,8 @@ class ManualReview(models.TransientModel):
             self.pr_id.number,
             self.reviewer_comments,
             [],
-            self.env.user.github_token or self.pr_id.repository_id.access_token
+            self.env.user.github_token or self.pr_id.repository_id.access_token,
+            update_summary=False
         )
         
         # Update PR status